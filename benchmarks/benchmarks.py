@@ -0,0 +1,509 @@
+# Author:  alexn11 (alexn11.gh@gmail.com)
+# Created: 2026-10-19
+# Copyright (C) 2026 Alexandre De Zotti
+# License: MIT License
+
+"""Timings of the drawing routines of mathsvg at increasing sizes.
+
+Usage::
+
+  python benchmarks.py [--max-size N] [--filter TEXT] [--output FILE] [--skip-memory] [--backend BACKEND]
+
+For each benchmark and each size (10, 100, ..., up to ``--max-size``, default 10^6) the results are:
+  * ``time``: time in seconds spent in the timed part of the benchmark
+  * ``peak_memory``: peak of memory allocated by Python during the timed part (measured in a separate run using ``tracemalloc``)
+  * ``output_bytes``: size of the SVG file produced
+  * ``nb_elements``: number of SVG elements in the image
+
+With ``--backend null`` or ``--backend count`` the images are created with this backend (see ``SvgImage``): only the geometry computations are timed. The output sizes are then estimated (``count``) or not given (``null``).
+
+The results are printed as a table and written as JSON into ``--output`` (default: ``benchmark-results.json``).
+"""
+
+import argparse
+import cmath
+import gc
+import json
+import math
+import os
+import platform
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.path.pardir))
+import mathsvg
+import svgwrite
+
+
+all_sizes = [ 10, 100, 1000, 10000, 100000, 1000000 ]
+
+# set from the command line
+image_backend = "svg"
+
+
+def make_image(view_window = ((-1, -1), (1, 1)), pixel_density = 100):
+  return mathsvg.SvgImage(view_window = view_window, pixel_density = pixel_density, backend = image_backend)
+
+
+def make_random_points(n):
+  return [ (random.uniform(-1, 1), random.uniform(-1, 1)) for i in range(n) ]
+
+
+# Each benchmark function takes the size and returns (prepare, run):
+#  prepare() is not timed and returns the image and the arguments of run
+#  run(image, data) is timed
+
+def bench_draw_line_segment(n):
+  def prepare():
+    return make_image(), (make_random_points(n), make_random_points(n))
+  def run(image, data):
+    for start_point, end_point in zip(*data):
+      image.draw_line_segment(start_point, end_point)
+  return prepare, run
+
+def bench_draw_polyline(n):
+  def prepare():
+    return make_image(), make_random_points(n)
+  def run(image, points):
+    image.draw_polyline(points)
+  return prepare, run
+
+def bench_draw_point(n):
+  def prepare():
+    return make_image(), make_random_points(n)
+  def run(image, points):
+    for point in points:
+      image.draw_point(point)
+  return prepare, run
+
+def bench_draw_arrow(n):
+  def prepare():
+    return make_image(), (make_random_points(n), make_random_points(n))
+  def run(image, data):
+    for start_point, end_point in zip(*data):
+      image.draw_arrow(start_point, end_point)
+  return prepare, run
+
+def bench_draw_curved_arrow(n):
+  def prepare():
+    return make_image(), (make_random_points(n), make_random_points(n))
+  def run(image, data):
+    for start_point, end_point in zip(*data):
+      image.draw_curved_arrow(start_point, end_point)
+  return prepare, run
+
+def bench_draw_planar_potato(n):
+  # one potato with n vertexes
+  def prepare():
+    return make_image(), None
+  def run(image, data):
+    image.draw_planar_potato([ 0, 0 ], 0.5, 0.9, n)
+  return prepare, run
+
+def bench_draw_random_wavy_line(n):
+  # one line with about n points
+  def prepare():
+    return make_image(), None
+  def run(image, data):
+    image.draw_random_wavy_line([ -1, 0 ], [ 1, 0 ], 2. / (n + 0.5), 0.1)
+  return prepare, run
+
+def bench_draw_function_graph_polyline(n):
+  def prepare():
+    return make_image(), None
+  def run(image, data):
+    image.draw_function_graph(lambda x : math.sin(20 * x), -1, 1, n, curve_type = "polyline")
+  return prepare, run
+
+def bench_draw_function_graph_autosmooth(n):
+  def prepare():
+    return make_image(), None
+  def run(image, data):
+    image.draw_function_graph(lambda x : math.sin(20 * x), -1, 1, n, curve_type = "autosmooth")
+  return prepare, run
+
+def bench_draw_ellipse_arc(n):
+  def prepare():
+    focuses = [ (p, (- p[0], - p[1])) for p in make_random_points(n) ]
+    angles = [ (random.uniform(0, 6), random.uniform(0, 6)) for i in range(n) ]
+    return make_image(), (focuses, angles)
+  def run(image, data):
+    for focuses, angles in zip(*data):
+      image.draw_ellipse_arc(focuses, 0.1, angles[0], angles[1])
+  return prepare, run
+
+def bench_draw_ellipse_arcs(n):
+  # same arcs as bench_draw_ellipse_arc, drawn in one call
+  def prepare():
+    focuses = [ (p, (- p[0], - p[1])) for p in make_random_points(n) ]
+    angles = [ (random.uniform(0, 6), random.uniform(0, 6)) for i in range(n) ]
+    return make_image(), (focuses, [ a[0] for a in angles ], [ a[1] for a in angles ])
+  def run(image, data):
+    image.draw_ellipse_arcs(data[0], 0.1, data[1], data[2])
+  return prepare, run
+
+def bench_put_text(n):
+  def prepare():
+    return make_image(), make_random_points(n)
+  def run(image, points):
+    for point in points:
+      image.put_text("x", point)
+  return prepare, run
+
+def bench_save(n):
+  # image with n line segments, only the saving is timed
+  def prepare():
+    image = make_image()
+    for start_point, end_point in zip(make_random_points(n), make_random_points(n)):
+      image.draw_line_segment(start_point, end_point)
+    return image, "benchmark-save.svg"
+  def run(image, file_name):
+    image.save(file_name, do_overwrite = True)
+    if(os.path.exists(file_name)):
+      os.remove(file_name)
+  return prepare, run
+
+
+# scaled up versions of the scripts from more-examples
+
+def generate_intermediate_lengths(left_element, right_element, smallest_interval, density):
+  # as in more-examples/cantor-bouquet.py before draw_cantor_bouquet was added
+  lengths = []
+  left_x = left_element[0]
+  left_length = left_element[1]
+  right_x = right_element[0]
+  right_length = right_element[1]
+  width = right_x - left_x
+  next_width = density * width
+  while(abs(next_width) > smallest_interval):
+    next_x = left_x + next_width
+    next_length = (next_width * left_length + (width - next_width) * right_length) / width
+    lengths.append(( next_x, next_length, True ))
+    right_x = next_x
+    right_length = next_length
+    width = next_width
+    next_width = density * width
+  if(width > 0):
+    lengths.reverse()
+  return lengths
+
+def compute_cantor_bouquet_lengths(max_length, smallest_interval, density, max_level = 188):
+  # as in more-examples/cantor-bouquet.py before draw_cantor_bouquet was added
+  level = 0
+  lengths_list = [ (0., max_length, True), (1., max_length, True) ]
+  while(level < max_level):
+    left_index = 0
+    interval_count = 0
+    while(left_index < len(lengths_list) - 1):
+      right_index = left_index + 1
+      left_element = lengths_list[left_index]
+      right_element = lengths_list[right_index]
+      if((not left_element[2]) and (not right_element[2])):
+        left_index = right_index
+      else:
+        interval_count += 1
+        middle_element = (0.5 * (right_element[0] + left_element[0]), 0, True)
+        new_lengths_list = generate_intermediate_lengths(left_element, middle_element, smallest_interval, density)
+        new_lengths_list += generate_intermediate_lengths(right_element, middle_element, smallest_interval, density)
+        if(len(new_lengths_list) == 0):
+          lengths_list[left_index] = (lengths_list[left_index][0], lengths_list[left_index][1], False)
+          lengths_list[right_index] = (lengths_list[right_index][0], lengths_list[right_index][1], False)
+          left_index = right_index
+        else:
+          lengths_list = lengths_list[ : left_index + 1 ] + new_lengths_list + lengths_list[ right_index : ]
+          left_index = right_index + len(new_lengths_list)
+    if(interval_count == 0):
+      break
+  return lengths_list
+
+def bench_cantor_bouquet(n):
+  # compact Cantor bouquet, the smallest interval decreases with n (n = 10^4 gives about 6500 hairs), computing the hairs is timed too
+  def prepare():
+    return make_image(view_window = ((-1.1, -1.1), (1.1, 1.1)), pixel_density = 800), None
+  def run(image, data):
+    for element in compute_cantor_bouquet_lengths(1., 3. / n, 0.5):
+      endpoint = element[1] * cmath.exp(2. * math.pi * element[0] * 1.j)
+      image.draw_line_segment([ 0, 0 ], [ endpoint.real, endpoint.imag ])
+  return prepare, run
+
+def bench_draw_cantor_bouquet(n):
+  # same bouquet as bench_cantor_bouquet, drawn with draw_cantor_bouquet
+  def prepare():
+    return make_image(view_window = ((-1.1, -1.1), (1.1, 1.1)), pixel_density = 800), None
+  def run(image, data):
+    image.draw_cantor_bouquet([ 0, 0 ], smallest_interval = 3. / n)
+  return prepare, run
+
+def bench_selfsim_triforce(n):
+  # about n triangles (the number of levels is rounded up)
+  def prepare():
+    return make_image(view_window = ((-1, -0.75), (1, 1.25)), pixel_density = 400), None
+  def run(image, data):
+    nb_levels = max(1, math.ceil(math.log(n, 3))) + 1
+    turn_direction = cmath.exp(- 2. * math.pi / 12. * 1.j)
+    directions = [ 1.j, - turn_direction.conjugate(), turn_direction ]
+    rescaling_factor = 0.48
+    size = 1.
+    centers = [ 0. ]
+    for level in range(nb_levels - 1):
+      centers = [ center + size * (1 - rescaling_factor) * direction for center in centers for direction in directions ]
+      size *= rescaling_factor
+    image.set_svg_options(fill_color = "lightgreen", stroke_color = "orangered")
+    for center in centers:
+      vertexes = [ center + size * direction for direction in directions ]
+      image.draw_polyline([ (v.real, v.imag) for v in vertexes + [ vertexes[0], ] ])
+  return prepare, run
+
+def bench_selfsim_triforce_transforms(n):
+  # same figure drawn with nested transforms instead of computing the vertexes of each triangle
+  def prepare():
+    return make_image(view_window = ((-1, -0.75), (1, 1.25)), pixel_density = 400), None
+  def run(image, data):
+    nb_levels = max(1, math.ceil(math.log(n, 3))) + 1
+    turn_direction = cmath.exp(- 2. * math.pi / 12. * 1.j)
+    directions = [ 1.j, - turn_direction.conjugate(), turn_direction ]
+    rescaling_factor = 0.48
+    triangle = [ (v.real, v.imag) for v in directions + [ directions[0], ] ]
+    transforms = [ mathsvg.make_affine_transform(translation = ((1 - rescaling_factor) * d.real, (1 - rescaling_factor) * d.imag), scaling = rescaling_factor) for d in directions ]
+    def draw_level(level):
+      if(level == 0):
+        image.draw_polyline(triangle)
+        return
+      for transform in transforms:
+        image.push_transform(transform)
+        draw_level(level - 1)
+        image.pop_transform()
+    image.set_svg_options(fill_color = "lightgreen", stroke_color = "orangered")
+    draw_level(nb_levels - 1)
+  return prepare, run
+
+def bench_place_component(n):
+  # n copies of a potato (with its own 40 points) placed with place_components
+  def prepare():
+    positions = make_random_points(n)
+    rotations = [ random.uniform(0, 6) for i in range(n) ]
+    return make_image(), (positions, rotations)
+  def run(image, data):
+    with image.define_component("potato"):
+      image.draw_planar_potato([ 0, 0 ], 0.1, 0.15, 40)
+    image.place_components("potato", data[0], scales = 0.5, rotations = data[1])
+  return prepare, run
+
+def bench_selfsim_triforce_ifs(n):
+  # same figure drawn with draw_ifs (nested components, the output grows linearly with the depth)
+  def prepare():
+    return make_image(view_window = ((-1, -0.75), (1, 1.25)), pixel_density = 400), None
+  def run(image, data):
+    nb_levels = max(1, math.ceil(math.log(n, 3))) + 1
+    turn_direction = cmath.exp(- 2. * math.pi / 12. * 1.j)
+    directions = [ 1.j, - turn_direction.conjugate(), turn_direction ]
+    rescaling_factor = 0.48
+    maps = [ mathsvg.make_affine_transform(translation = ((1 - rescaling_factor) * d.real, (1 - rescaling_factor) * d.imag), scaling = rescaling_factor) for d in directions ]
+    image.set_svg_options(fill_color = "lightgreen", stroke_color = "orangered")
+    with image.define_component("triangle"):
+      image.draw_polyline([ (v.real, v.imag) for v in directions + [ directions[0], ] ])
+    image.draw_ifs("triangle", maps, nb_levels - 1, min_size = 0.)
+  return prepare, run
+
+def bench_iteration_graph(n):
+  # n iterations of the logistic map
+  def prepare():
+    return make_image(view_window = ((-0.1, -0.1), (1.1, 1.1)), pixel_density = 600), None
+  def run(image, data):
+    eval_map = lambda x : 4. * x * (1 - x)
+    image.draw_arrow((0, 0), (1.05, 0))
+    image.draw_arrow((0, 0), (0, 1.05))
+    image.set_dash_mode("dash")
+    image.draw_line_segment((0, 0), (1, 1))
+    image.set_dash_mode("none")
+    image.draw_function_graph(eval_map, 0, 1, 50)
+    xs = [ 0.10491 ]
+    for i in range(n):
+      xs.append(eval_map(xs[-1]))
+    image.set_dash_mode("dash")
+    image.set_arrow_options(curvature = 0)
+    for x, x_next in zip(xs[ : -1 ], xs[ 1 : ]):
+      image.draw_polyline([ (x, x), (x, x_next), (x_next, x_next) ])
+      mid_value = 0.5 * (x + x_next)
+      if(x_next > x):
+        angles = (0.5 * math.pi, 0)
+      else:
+        angles = (-0.5 * math.pi, math.pi)
+      image.draw_arrow_tip((x, mid_value), angles[0])
+      image.draw_arrow_tip((mid_value, x_next), angles[1])
+  return prepare, run
+
+
+def bench_draw_cobweb(n):
+  # same as bench_iteration_graph, drawn with draw_cobweb
+  def prepare():
+    return make_image(view_window = ((-0.1, -0.1), (1.1, 1.1)), pixel_density = 600), None
+  def run(image, data):
+    eval_map = lambda x : 4. * x * (1 - x)
+    image.draw_arrow((0, 0), (1.05, 0))
+    image.draw_arrow((0, 0), (0, 1.05))
+    image.set_dash_mode("dash")
+    image.draw_line_segment((0, 0), (1, 1))
+    image.set_dash_mode("none")
+    image.draw_function_graph(eval_map, 0, 1, 50)
+    image.set_dash_mode("dash")
+    image.set_arrow_options(curvature = 0)
+    image.draw_cobweb(eval_map, 0.10491, n, arrow_tips = True, is_vectorized = True)
+  return prepare, run
+
+def bench_draw_cobweb_orbits(n):
+  # n orbits of 100 iterations of the logistic map at once
+  def prepare():
+    return make_image(view_window = ((-0.1, -0.1), (1.1, 1.1)), pixel_density = 600), [ random.uniform(0, 1) for i in range(max(1, n // 100)) ]
+  def run(image, data):
+    image.draw_cobweb(lambda x : 4. * x * (1 - x), data, 100, is_vectorized = True)
+  return prepare, run
+
+def bench_draw_orbit_diagram(n):
+  # orbit diagram of the logistic map with n points (1000 parameters), binned by pixels
+  def prepare():
+    return make_image(view_window = ((2.8, -0.05), (4, 1.05)), pixel_density = 400), None
+  def run(image, data):
+    image.draw_orbit_diagram(lambda x, r : r * x * (1 - x), 2.8, 4, 1000, 200, max(1, n // 1000))
+  return prepare, run
+
+def bench_draw_streamlines(n):
+  # trajectories of a damped oscillator from n / 100 random seeds, 100 steps each
+  def prepare():
+    return make_image(), make_random_points(max(1, n // 100))
+  def run(image, data):
+    image.draw_streamlines(lambda x, y : (y, - x - 0.1 * y), data, 0.05, 100)
+  return prepare, run
+
+def bench_draw_implicit_curve(n):
+  # 10 level sets of a cubic polynomial on a grid of n cells
+  def prepare():
+    return make_image(), None
+  def run(image, data):
+    resolution = max(2, int(math.sqrt(n)))
+    image.draw_implicit_curve(lambda x, y : x * x * y - y * y * y + 3 * x, [ 0.8 * k - 3.6 for k in range(10) ], resolution)
+  return prepare, run
+
+def bench_draw_mapped_grid(n):
+  # image of a grid of 100 lines with n points in total under a Joukowski-like map
+  def prepare():
+    return make_image(), None
+  def run(image, data):
+    image.draw_mapped_grid(lambda z : z + 0.1 / z, ((-0.9, 0.05), (0.9, 0.9)), 50, max(2, n // 100))
+  return prepare, run
+
+# (name, benchmark function, largest size)
+benchmarks = [
+  ("draw_line_segment", bench_draw_line_segment, 10**6),
+  ("draw_polyline", bench_draw_polyline, 10**6),
+  ("draw_point", bench_draw_point, 10**6),
+  ("draw_arrow", bench_draw_arrow, 10**6),
+  ("draw_curved_arrow", bench_draw_curved_arrow, 10**6),
+  ("draw_planar_potato", bench_draw_planar_potato, 10**6),
+  ("draw_random_wavy_line", bench_draw_random_wavy_line, 10**6),
+  ("draw_function_graph-polyline", bench_draw_function_graph_polyline, 10**6),
+  ("draw_function_graph-autosmooth", bench_draw_function_graph_autosmooth, 10**6),
+  ("draw_ellipse_arc", bench_draw_ellipse_arc, 10**6),
+  ("draw_ellipse_arcs", bench_draw_ellipse_arcs, 10**6),
+  ("put_text", bench_put_text, 10**6),
+  ("save", bench_save, 10**6),
+  # the hair computation of the original script is quadratic
+  ("cantor-bouquet", bench_cantor_bouquet, 10**5),
+  ("draw_cantor_bouquet", bench_draw_cantor_bouquet, 10**7),
+  ("selfsim-triforce", bench_selfsim_triforce, 10**6),
+  ("selfsim-triforce-transforms", bench_selfsim_triforce_transforms, 10**6),
+  ("place-component", bench_place_component, 10**6),
+  ("selfsim-triforce-ifs", bench_selfsim_triforce_ifs, 10**6),
+  ("iteration-graph", bench_iteration_graph, 10**6),
+  ("draw_cobweb", bench_draw_cobweb, 10**6),
+  ("draw_cobweb-orbits", bench_draw_cobweb_orbits, 10**6),
+  ("draw_orbit_diagram", bench_draw_orbit_diagram, 10**7),
+  ("draw_streamlines", bench_draw_streamlines, 10**7),
+  ("draw_implicit_curve", bench_draw_implicit_curve, 10**7),
+  ("draw_mapped_grid", bench_draw_mapped_grid, 10**7),
+]
+
+
+def run_benchmark(benchmark_function, size, do_measure_memory):
+  prepare, run = benchmark_function(size)
+
+  random.seed(0)
+  image, data = prepare()
+  gc.collect()
+  start_time = time.perf_counter()
+  run(image, data)
+  duration = time.perf_counter() - start_time
+
+  peak_memory = None
+  if(do_measure_memory):
+    random.seed(0)
+    memory_image, data = prepare()
+    gc.collect()
+    tracemalloc.start()
+    run(memory_image, data)
+    peak_memory = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    del memory_image
+
+  if(image_backend == "svg"):
+    output_bytes = sum(len(chunk) for chunk in image.iter_chunks())
+    nb_elements = len(image.svgwrite_object.elements) - 1
+  elif(image_backend == "count"):
+    output_counts = image.output_counts()
+    output_bytes = output_counts["bytes"]
+    nb_elements = sum(output_counts["elements"].values())
+  else:
+    output_bytes = None
+    nb_elements = None
+
+  return {
+    "time": duration,
+    "peak_memory": peak_memory,
+    "output_bytes": output_bytes,
+    "nb_elements": nb_elements,
+  }
+
+
+def parse_command_line():
+  parser = argparse.ArgumentParser(description = "Run the mathsvg benchmarks.")
+  parser.add_argument("--max-size", type = int, default = 10**6, help = "largest size to run (default: 10^6)")
+  parser.add_argument("--filter", default = None, help = "only run the benchmarks whose name contains this text")
+  parser.add_argument("--output", default = "benchmark-results.json", help = "JSON file receiving the results")
+  parser.add_argument("--skip-memory", action = "store_true", help = "do not measure the peak memory (runs twice faster)")
+  parser.add_argument("--backend", choices = [ "svg", "null", "count" ], default = "svg", help = "backend of the images (default: svg)")
+  return parser.parse_args()
+
+
+def main():
+  global image_backend
+  arguments = parse_command_line()
+  image_backend = arguments.backend
+  results = []
+  print(f'{"benchmark":32} {"size":>8} {"time (s)":>10} {"memory (B)":>12} {"output (B)":>12}')
+  for name, benchmark_function, max_size in benchmarks:
+    if((arguments.filter is not None) and (arguments.filter not in name)):
+      continue
+    for size in all_sizes:
+      if(size > min(max_size, arguments.max_size)):
+        break
+      result = run_benchmark(benchmark_function, size, not arguments.skip_memory)
+      result = { "benchmark": name, "size": size, ** result }
+      results.append(result)
+      print(f'{name:32} {size:>8} {result["time"]:>10.4f} {str(result["peak_memory"]):>12} {str(result["output_bytes"]):>12}', flush = True)
+
+  with open(arguments.output, "w") as output_file:
+    json.dump({
+      "python": platform.python_version(),
+      "platform": platform.platform(),
+      "mathsvg": mathsvg.__version__,
+      "svgwrite": svgwrite.version,
+      "backend": image_backend,
+      "results": results,
+    }, output_file, indent = 1)
+
+
+if(__name__ == "__main__"):
+  main()
+
@@ -0,0 +1,82 @@
+# Author:  alexn11 (alexn11.gh@gmail.com)
+# Created: 2026-10-19
+# Copyright (C) 2026 Alexandre De Zotti
+# License: MIT License
+
+"""Import time of mathsvg, compared with a budget.
+
+Usage::
+
+  python import_time.py [--repeat N]
+
+Each statement is run ``N`` times (default: 7) in a new interpreter with ``python -X importtime``, the median of the times is compared with the budget:
+  * ``import mathsvg``: 5 ms (svgwrite and the module mathsvg.mathsvg are not loaded)
+  * ``import mathsvg.mathsvg``: 20 ms (svgwrite is still not loaded)
+  * ``import mathsvg.profile``, ``import mathsvg.compare``: 30 ms (command line tools)
+
+The time until the first image is created (loading svgwrite) is also given, with no budget as it mostly depends on svgwrite.
+The script exits with status 1 if a budget is exceeded.
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+
+package_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.path.pardir)
+
+# (statement, module whose cumulative import time is measured, budget in seconds)
+import_budgets = [
+  ("import mathsvg", "mathsvg", 0.005),
+  ("import mathsvg.mathsvg", "mathsvg.mathsvg", 0.020),
+  ("import mathsvg.profile", "mathsvg.profile", 0.030),
+  ("import mathsvg.compare", "mathsvg.compare", 0.030),
+]
+
+first_image_statement = "import mathsvg ; mathsvg.SvgImage()"
+
+
+def measure_import_time(statement, module_name):
+  # returns the cumulative import time of the module in seconds, as reported by -X importtime
+  environment = dict(os.environ, PYTHONPATH = package_path)
+  process = subprocess.run([ sys.executable, "-X", "importtime", "-c", statement ], capture_output = True, text = True, env = environment, check = True)
+  for line in process.stderr.splitlines():
+    fields = line.split('|')
+    if((len(fields) == 3) and (fields[2].strip() == module_name)):
+      return int(fields[1]) * 1e-6
+  raise Exception(f'No import time found for {module_name}')
+
+
+def measure_first_image_time():
+  environment = dict(os.environ, PYTHONPATH = package_path)
+  code = f'import time ; start_time = time.perf_counter() ; {first_image_statement} ; print(time.perf_counter() - start_time)'
+  process = subprocess.run([ sys.executable, "-c", code ], capture_output = True, text = True, env = environment, check = True)
+  return float(process.stdout)
+
+
+def main():
+  parser = argparse.ArgumentParser(description = "Import time of mathsvg, compared with a budget.")
+  parser.add_argument("--repeat", type = int, default = 7, help = "number of runs of each statement (default: 7)")
+  arguments = parser.parse_args()
+
+  # compile the modules first, otherwise the first run includes the compilation
+  measure_first_image_time()
+  for statement, module_name, budget in import_budgets:
+    measure_import_time(statement, module_name)
+
+  is_over_budget = False
+  print(f'{"statement":40} {"median (ms)":>12} {"budget (ms)":>12}')
+  for statement, module_name, budget in import_budgets:
+    import_time = statistics.median(measure_import_time(statement, module_name) for k in range(arguments.repeat))
+    status = "" if(import_time <= budget) else "  OVER BUDGET"
+    is_over_budget = is_over_budget or (import_time > budget)
+    print(f'{statement:40} {1000 * import_time:>12.2f} {1000 * budget:>12.2f}{status}')
+  first_image_time = statistics.median(measure_first_image_time() for k in range(arguments.repeat))
+  print(f'{first_image_statement:40} {1000 * first_image_time:>12.2f} {"-":>12}')
+  return 1 if(is_over_budget) else 0
+
+
+if(__name__ == "__main__"):
+  sys.exit(main())
@@ -19,6 +19,20 @@ for more details.
 
 __version__ = "0.4.0"
 
-from mathsvg.mathsvg import SvgImage
+# the module mathsvg.mathsvg (and svgwrite) is only imported when one of these names is first used
+_lazy_names = [ "SvgImage", "PathBuilder", "flush_pending_saves", "make_affine_transform" ]
 
+__all__ = _lazy_names[:]
 
+
+def __getattr__(name):
+  if(name not in _lazy_names):
+    raise AttributeError(f"module 'mathsvg' has no attribute '{name}'")
+  import mathsvg.mathsvg
+  value = getattr(mathsvg.mathsvg, name)
+  globals()[name] = value
+  return value
+
+
+def __dir__():
+  return sorted(set(globals()) | set(_lazy_names))
@@ -0,0 +1,159 @@
+# Author:  alexn11 (alexn11.gh@gmail.com)
+# Created: 2026-10-19
+# Copyright (C) 2026 Alexandre De Zotti
+# License: MIT License
+
+
+"""
+Compare the structure and the numbers of two SVG documents.
+
+The two documents are read at the same time, element by element, and the comparison stops at the first difference. The elements are matched by their order in the document. Two matched elements must have the same tag and the same attributes.
+The values of the attributes (and the texts) are cut into numbers and the rest. The numbers are compared with a tolerance, the rest must be identical up to spaces and commas. This way ``d="M 1,2 L 3,4"`` and ``d="M1 2L3.0000001 4"`` are considered equal.
+
+Usage::
+
+  python -m mathsvg.compare [--tolerance TOLERANCE] first.svg second.svg
+
+The command prints the first difference found and exits with status 1 if the documents differ.
+
+Example::
+
+  import mathsvg.compare
+
+  difference = mathsvg.compare.compare_svg("figure.svg", image.to_bytes(), tolerance = 1e-3)
+  if(difference is not None):
+    print(difference)
+"""
+
+
+import argparse
+import io
+import itertools
+import math
+import re
+import sys
+import xml.etree.ElementTree as etree
+
+
+number_re = re.compile(r'[-+]?(?:[0-9]+\.?[0-9]*|\.[0-9]+)(?:[eE][-+]?[0-9]+)?')
+separators_re = re.compile(r'[\s,]+')
+
+
+def _split_value(value):
+  # returns the list of numbers and the list of the pieces of text around them (without separators)
+  numbers = [ float(number) for number in number_re.findall(value) ]
+  texts = [ separators_re.sub(' ', text).strip() for text in number_re.split(value) ]
+  return numbers, texts
+
+
+def _compare_values(value_a, value_b, tolerance):
+  # returns None if the values are equal, otherwise the description of the difference
+  if(value_a == value_b):
+    return None
+  numbers_a, texts_a = _split_value(value_a)
+  numbers_b, texts_b = _split_value(value_b)
+  if(texts_a != texts_b):
+    return "different text or different number of values"
+  for index, (number_a, number_b) in enumerate(zip(numbers_a, numbers_b)):
+    if(not math.isclose(number_a, number_b, rel_tol = tolerance, abs_tol = tolerance)):
+      return f'value number {index + 1} differs: {number_a} != {number_b}'
+  return None
+
+
+def _get_tag_name(tag):
+  return tag.rsplit('}', 1)[-1]
+
+
+def _shorten(value, max_length = 80):
+  return value if(len(value) <= max_length) else (value[ : max_length - 3 ] + '...')
+
+
+def _open_source(source):
+  if(isinstance(source, (bytes, bytearray))):
+    return io.BytesIO(source)
+  if(isinstance(source, str) and source.lstrip().startswith('<')):
+    return io.BytesIO(source.encode('utf-8'))
+  return source
+
+
+def _iter_events(source):
+  # yields (event, element) in document order, the elements are cleared once compared to keep the memory low
+  parent_stack = []
+  for event, element in etree.iterparse(_open_source(source), events = ("start", "end")):
+    if(event == "start"):
+      parent_stack.append(element)
+      yield event, element
+    else:
+      yield event, element
+      parent_stack.pop()
+      if(len(parent_stack) > 0):
+        parent_stack[-1].remove(element)
+      element.clear()
+
+
+def _describe_element(index, element):
+  description = f'element {index} <{_get_tag_name(element.tag)}>'
+  element_id = element.get('id')
+  if(element_id is not None):
+    description += f' (id="{element_id}")'
+  return description
+
+
+def compare_svg(source_a, source_b, tolerance = 1e-6):
+  """Compares two SVG documents and returns ``None`` if they are equal, otherwise a message describing the first difference.
+
+  Args:
+    * ``source_a``, ``source_b``: the documents, given as file names, opened binary files, ``bytes`` or strings starting with ``<``
+    * ``tolerance`` (``float``): numbers ``a`` and ``b`` are equal if ``|a - b| <= tolerance * max(1, |a|, |b|)``
+
+  The elements are numbered from ``0`` (the ``svg`` element) in the order of their opening tags.
+  """
+  index = -1
+  for event_a, event_b in itertools.zip_longest(_iter_events(source_a), _iter_events(source_b), fillvalue = (None, None)):
+    (event_a, element_a), (event_b, element_b) = event_a, event_b
+    if(event_a == "start"):
+      index += 1
+    if(event_a != event_b):
+      if(event_a == "start"):
+        return f'{_describe_element(index, element_a)}: missing in the second document'
+      if(event_b == "start"):
+        return f'element {index + 1} <{_get_tag_name(element_b.tag)}>: missing in the first document'
+      return f'document end differs after element {index}'
+    if(event_a == "start"):
+      if(element_a.tag != element_b.tag):
+        return f'element {index}: different tags <{_get_tag_name(element_a.tag)}> and <{_get_tag_name(element_b.tag)}>'
+      attribute_names = sorted(set(element_a.attrib) | set(element_b.attrib))
+      for name in attribute_names:
+        value_a = element_a.get(name)
+        value_b = element_b.get(name)
+        if((value_a is None) or (value_b is None)):
+          return f'{_describe_element(index, element_a)}: attribute "{_get_tag_name(name)}" only in the {"second" if(value_a is None) else "first"} document'
+        difference = _compare_values(value_a, value_b, tolerance)
+        if(difference is not None):
+          return f'{_describe_element(index, element_a)}: attribute "{_get_tag_name(name)}": {difference} ("{_shorten(value_a)}" and "{_shorten(value_b)}")'
+    else:
+      for name in [ "text", "tail" ]:
+        value_a = (getattr(element_a, name) or '').strip()
+        value_b = (getattr(element_b, name) or '').strip()
+        difference = _compare_values(value_a, value_b, tolerance)
+        if(difference is not None):
+          return f'{_describe_element(index, element_a)}: {name}: {difference} ("{_shorten(value_a)}" and "{_shorten(value_b)}")'
+  return None
+
+
+def main(arguments = None):
+  """Entry point of ``python -m mathsvg.compare``, ``arguments`` defaults to ``sys.argv[1:]``. Returns the exit status."""
+  parser = argparse.ArgumentParser(prog = "python -m mathsvg.compare", description = "Compare the structure and the numbers of two SVG files.")
+  parser.add_argument("--tolerance", type = float, default = 1e-6, help = "tolerance on the numbers (default: 1e-6)")
+  parser.add_argument("first_file")
+  parser.add_argument("second_file")
+  arguments = parser.parse_args(sys.argv[1:] if arguments is None else arguments)
+  difference = compare_svg(arguments.first_file, arguments.second_file, tolerance = arguments.tolerance)
+  if(difference is None):
+    return 0
+  print(difference)
+  return 1
+
+
+if(__name__ == "__main__"):
+  sys.exit(main())
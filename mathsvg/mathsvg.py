@@ -13,18 +13,934 @@
 """
 
 
+import atexit
+import codecs
+import collections.abc
+import contextlib
+import copy
+import functools
+import importlib.util
+import io
+import itertools
 import math
 import cmath
 import os
 import random
-
-import svgwrite
+import sys
+import threading
+import time
+import types
+import weakref
+
+
+def _import_lazily(module_name):
+  # the module is only executed when one of its attributes is first used
+  if(module_name in sys.modules):
+    return sys.modules[module_name]
+  spec = importlib.util.find_spec(module_name)
+  spec.loader = importlib.util.LazyLoader(spec.loader)
+  module = importlib.util.module_from_spec(spec)
+  sys.modules[module_name] = module
+  spec.loader.exec_module(module)
+  parent_name, _, child_name = module_name.rpartition('.')
+  if(parent_name != ''):
+    setattr(sys.modules[parent_name], child_name, module)
+  return module
+
+
+def _import_numpy():
+  # numpy is only needed by the methods drawing batches of shapes
+  try:
+    import numpy
+  except ImportError:
+    raise Exception("numpy is needed to draw batches of shapes (it can be installed with: pip install numpy)")
+  return numpy
+
+
+# svgwrite (with its validation tables) takes most of the import time, it is loaded when the first image is created
+# the modules only needed when saving, for the render cache or for embedded images are imported in the functions using them
+svgwrite = _import_lazily("svgwrite")
 
 
 # The Fundamental Constant of the mathematical universe:
 the_tau = 2 * math.pi
 
 
+# shared by all the images: saves are written one after the other in a single background thread
+_save_executor = None
+_save_executor_lock = threading.Lock()
+_pending_saves = []
+
+
+def _get_save_executor():
+  global _save_executor
+  with _save_executor_lock:
+    if(_save_executor is None):
+      import concurrent.futures
+      _save_executor = concurrent.futures.ThreadPoolExecutor(max_workers = 1, thread_name_prefix = "mathsvg-save")
+    return _save_executor
+
+
+def flush_pending_saves():
+  """Wait until all the files scheduled for saving with ``SvgImage.save_async`` have been written.
+
+  Errors are not raised here, they are reported by the futures returned by ``save_async``.
+  This function is automatically called when the Python interpreter exits.
+  """
+  with _save_executor_lock:
+    pending_saves = _pending_saves[:]
+    _pending_saves.clear()
+  if(len(pending_saves) > 0):
+    import concurrent.futures
+    concurrent.futures.wait(pending_saves)
+
+
+atexit.register(flush_pending_saves)
+
+
+class _SharedList(collections.abc.MutableSequence):
+  # list made of the beginning of another list followed by its own items
+  # the other list should only be appended to: then creating or copying a _SharedList is O(1)
+  # any other modification of a _SharedList copies its whole content first
+
+  def __init__(self, base, base_length = None):
+    self._base = base
+    self._base_length = len(base) if base_length is None else base_length
+    self._own = []
+
+  def __len__(self):
+    return self._base_length + len(self._own)
+
+  def __iter__(self):
+    return itertools.chain(itertools.islice(self._base, self._base_length), self._own)
+
+  def __getitem__(self, index):
+    if(isinstance(index, slice)):
+      start, stop, step = index.indices(len(self))
+      if(step != 1):
+        return list(self)[index]
+      items = []
+      if(start < self._base_length):
+        items.extend(self._base[ start : min(stop, self._base_length) ])
+      items.extend(self._own[ max(start - self._base_length, 0) : max(stop - self._base_length, 0) ])
+      return items
+    if(index < 0):
+      index += len(self)
+    if(not (0 <= index < len(self))):
+      raise IndexError("_SharedList index out of range")
+    if(index < self._base_length):
+      return self._base[index]
+    return self._own[index - self._base_length]
+
+  def __copy__(self):
+    return _SharedList(self)
+
+  def append(self, item):
+    self._own.append(item)
+
+  def _unshare(self):
+    self._own = list(self)
+    self._base = []
+    self._base_length = 0
+
+  def __setitem__(self, index, item):
+    self._unshare()
+    self._own[index] = item
+
+  def __delitem__(self, index):
+    self._unshare()
+    del self._own[index]
+
+  def insert(self, index, item):
+    self._unshare()
+    self._own.insert(index, item)
+
+
+_scalar_types = (str, int, float, bool, type(None))
+
+
+def _estimate_object_size(value):
+  # long sequences are estimated from their first items, dict keys are attribute names shared by all the elements
+  value_type = type(value)
+  if(value_type in _scalar_types):
+    return sys.getsizeof(value)
+  size = sys.getsizeof(value)
+  if(value_type is dict):
+    value = list(value.values())
+  elif(not isinstance(value, (list, tuple))):
+    return size
+  nb_items = len(value)
+  if(nb_items > 16):
+    return size + sum(map(_estimate_object_size, value[ : 8 ])) * nb_items // 8
+  return size + sum(map(_estimate_object_size, value))
+
+
+def _estimate_svgwrite_element_size(element):
+  # the attributes of svgwrite elements are numbers or strings
+  attributes = element.__dict__
+  size = sys.getsizeof(element) + sys.getsizeof(attributes) + sys.getsizeof(element.attribs) + sum(map(sys.getsizeof, element.attribs.values()))
+  for name, value in attributes.items():
+    if(name in ('attribs', '_parameter')):
+      # the svgwrite parameters are shared by all the elements of a drawing
+      continue
+    if(name == 'elements'):
+      size += sys.getsizeof(value) + sum(map(_estimate_svgwrite_element_size, value))
+    else:
+      size += _estimate_object_size(value)
+  return size
+
+
+def _estimate_serialized_size(element):
+  # approximate number of characters of the XML form of an element (without the escaping of special characters)
+  tag_length = len(element.elementname)
+  size = tag_length + 4
+  for name, value in element.attribs.items():
+    size += len(name) + len(str(value)) + 4
+  commands = element.__dict__.get('commands')
+  if(commands):
+    size += 5 + sum(len(str(command)) + 1 for command in commands)
+  points = element.__dict__.get('points')
+  if(points):
+    size += 10 + sum(len(str(point[0])) + len(str(point[1])) + 2 for point in points)
+  text = element.__dict__.get('text')
+  children = element.__dict__.get('elements')
+  if(text or children):
+    size += tag_length + 3 + len(text or '') + sum(map(_estimate_serialized_size, children or []))
+  return size
+
+
+class _NullBackend:
+  # the elements are built as usual and then dropped
+
+  name = "null"
+
+  def add_element(self, element):
+    pass
+
+  def copy(self):
+    return self
+
+
+class _CountingBackend:
+  # the elements are built as usual, counted and dropped
+
+  name = "count"
+
+  def __init__(self):
+    self.elements = collections.Counter()
+    self.nb_bytes = 0
+
+  def add_element(self, element):
+    self.elements[element.elementname] += 1
+    self.nb_bytes += _estimate_serialized_size(element)
+
+  def copy(self):
+    backend = _CountingBackend()
+    backend.elements = self.elements.copy()
+    backend.nb_bytes = self.nb_bytes
+    return backend
+
+
+# the "svg" backend is the image itself
+_backends = { "null": _NullBackend,
+              "count": _CountingBackend }
+
+
+class _SpillFile:
+  # temporary file where serialized elements are moved to when an image uses too much memory
+  # it is only appended to and can be shared by forked images, it is closed when no image and no _SpilledElements uses it anymore
+
+  def __init__(self):
+    import tempfile
+    self._file = tempfile.TemporaryFile(prefix = "mathsvg-spill-")
+    self._lock = threading.Lock()
+    self.size = 0
+    self._finalizer = weakref.finalize(self, self._file.close)
+
+  def close(self):
+    self._finalizer()
+
+  def append(self, pieces):
+    with self._lock:
+      offset = self.size
+      self._file.seek(offset)
+      for piece in pieces:
+        self._file.write(piece.encode('utf-8'))
+      self.size = self._file.tell()
+      return offset, self.size - offset
+
+  def iter_region(self, offset, length, chunk_size = 1 << 20):
+    decoder = codecs.getincrementaldecoder('utf-8')()
+    end = offset + length
+    while(offset < end):
+      with self._lock:
+        self._file.seek(offset)
+        data = self._file.read(min(chunk_size, end - offset))
+      offset += len(data)
+      yield decoder.decode(data, final = (offset >= end))
+
+
+class _SpilledElements:
+  # stands for a sequence of elements whose serialized form is in a _SpillFile
+
+  def __init__(self, spill_file, offset, length, nb_elements):
+    self.spill_file = spill_file
+    self.offset = offset
+    self.length = length
+    self.nb_elements = nb_elements
+
+  def iter_pieces(self):
+    return self.spill_file.iter_region(self.offset, self.length)
+
+  def get_xml(self):
+    raise Exception("Some elements of the image have been moved to disk (see memory_limit), use the SvgImage methods to get the SVG document.")
+
+
+
+_library_source_hash = None
+
+
+def _get_library_source_hash():
+  # any change in the library may change the output
+  global _library_source_hash
+  if(_library_source_hash is None):
+    import hashlib
+    with open(__file__, 'rb') as source_file:
+      _library_source_hash = hashlib.sha256(source_file.read()).hexdigest()
+  return _library_source_hash
+
+
+class _NotCacheableError(Exception):
+  # raised when an argument of a drawing call cannot be identified, the image is then not cached
+  pass
+
+
+def _is_plain_value(value):
+  # values identified by their content, see _make_call_argument_key
+  if((value is None) or isinstance(value, (bool, int, float, complex, str, bytes))):
+    return True
+  if(isinstance(value, (list, tuple))):
+    return all(_is_plain_value(v) for v in value)
+  if(isinstance(value, dict)):
+    return all(_is_plain_value(v) for v in value.values())
+  return hasattr(value, 'tobytes') and hasattr(value, 'dtype') and (value.dtype != object)
+
+
+# modules whose functions give different results at each call
+_random_module_names = ("random", "numpy.random", "secrets")
+
+_library_paths = None
+
+
+def _is_library_module(module):
+  # built-in modules, the standard library, the installed packages and mathsvg: their attributes are not expected to change
+  global _library_paths
+  if(_library_paths is None):
+    paths = { sys.prefix, sys.exec_prefix, sys.base_prefix, sys.base_exec_prefix, os.path.dirname(os.__file__), os.path.dirname(__file__) }
+    _library_paths = tuple(os.path.join(os.path.abspath(path), '') for path in paths)
+  module_file = getattr(module, '__file__', None)
+  if(module_file is None):
+    return module.__name__ in sys.builtin_module_names
+  return os.path.abspath(module_file).startswith(_library_paths)
+
+
+def _make_call_argument_key(value, seen_codes = ()):
+  # reduces an argument of a drawing call into something whose repr identifies it
+  # seen_codes: code of the functions whose key is being made (functions using each other)
+  if((value is None) or isinstance(value, (bool, int, float, complex, str, bytes))):
+    return value
+  if(isinstance(value, (list, tuple))):
+    return (type(value).__name__, tuple(_make_call_argument_key(v) for v in value))
+  if(isinstance(value, dict)):
+    return ('dict', tuple(sorted((repr(k), _make_call_argument_key(v)) for k, v in value.items())))
+  if(hasattr(value, 'tobytes') and hasattr(value, 'dtype')):
+    # numpy arrays
+    return ('array', str(value.dtype), value.shape, value.tobytes())
+  if(isinstance(value, PathBuilder)):
+    return ('path', value.units, _make_call_argument_key(value._commands), _make_call_argument_key(value._points))
+  if(isinstance(value, functools.partial)):
+    return ('partial', _make_call_argument_key(value.func, seen_codes), _make_call_argument_key(value.args), _make_call_argument_key(value.keywords))
+  if(hasattr(value, '__self__') and hasattr(value, '__func__')):
+    # bound methods depend on the state of their object
+    raise _NotCacheableError(f'method {value.__qualname__}')
+  if(hasattr(value, '__code__')):
+    # functions and lambdas: their code, default values, the values they capture and the global variables they use
+    if(value.__code__ in seen_codes):
+      return ('function', value.__qualname__)
+    seen_codes = seen_codes + (value.__code__,)
+    closure = value.__closure__ or ()
+    return ('function',
+            _make_code_key(value.__code__),
+            _make_call_argument_key(value.__defaults__),
+            tuple(_make_call_argument_key(cell.cell_contents) for cell in closure),
+            _make_globals_key(value.__code__, value.__globals__, seen_codes))
+  if(callable(value) and hasattr(value, '__qualname__')):
+    # built-in functions such as math.sin, but not the methods of built-in objects (such as random.random, a method of a random generator)
+    if(not isinstance(getattr(value, '__self__', None), (types.ModuleType, type(None)))):
+      raise _NotCacheableError(f'method {value.__qualname__}')
+    return ('callable', getattr(value, '__module__', None), value.__qualname__)
+  # the repr of other objects does not necessarily show their state
+  raise _NotCacheableError(f'object of type {type(value).__name__}')
+
+
+def _make_code_key(code):
+  consts = tuple(_make_code_key(c) if hasattr(c, 'co_code') else _make_call_argument_key(c) for c in code.co_consts)
+  return (code.co_code, consts, code.co_names)
+
+
+def _make_globals_key(code, global_values, seen_codes):
+  # values of the global variables used by a function (and by the functions defined in it)
+  # raises _NotCacheableError when one of them is not a plain value, a library module or a function, and for random numbers
+  names = set()
+  codes = [ code ]
+  while(len(codes) > 0):
+    current_code = codes.pop()
+    names.update(current_code.co_names)
+    codes += [ c for c in current_code.co_consts if hasattr(c, 'co_code') ]
+  # co_names also contains the names of attributes, they are ignored when there is no global variable with the same name
+  key = []
+  for name in sorted(names):
+    if(name not in global_values):
+      continue
+    value = global_values[name]
+    if(isinstance(value, types.ModuleType)):
+      # the attributes of the modules of the script could be changed by the script, the random modules are not followed (numpy.random being used as an attribute of numpy)
+      if(not _is_library_module(value)):
+        raise _NotCacheableError(f'module "{name}" used by {code.co_name}')
+      if((value.__name__ in _random_module_names) or (("random" in names) and isinstance(getattr(value, "random", None), types.ModuleType))):
+        raise _NotCacheableError(f'random numbers used by {code.co_name}')
+      key.append((name, 'module', value.__name__))
+    elif(_is_plain_value(value)):
+      key.append((name, _make_call_argument_key(value)))
+    elif(isinstance(value, (types.FunctionType, types.BuiltinFunctionType, functools.partial))):
+      key.append((name, _make_call_argument_key(value, seen_codes)))
+    else:
+      raise _NotCacheableError(f'global variable "{name}" of {code.co_name}')
+  return tuple(key)
+
+
+class _CallRecorder:
+  # running hash of the calls made to the methods of an image, used as a key for the render cache
+
+  def __init__(self, cache_dir, configuration):
+    import hashlib
+    self.cache_dir = cache_dir
+    self.hasher = hashlib.sha256(_get_library_source_hash().encode('ascii'))
+    self.depth = 0
+    # false once a call could not be identified
+    self.is_cacheable = True
+    self.record('__init__', configuration, {})
+
+  def record(self, method_name, args, kwargs, uses_random = False):
+    if(not self.is_cacheable):
+      return
+    try:
+      call_key = (method_name, _make_call_argument_key(args), _make_call_argument_key(kwargs))
+    except(_NotCacheableError):
+      self.is_cacheable = False
+      return
+    if(uses_random):
+      call_key += (random.getstate(),)
+    self.hasher.update(repr(call_key).encode('utf-8'))
+
+  def copy(self):
+    recorder_copy = copy.copy(self)
+    recorder_copy.hasher = self.hasher.copy()
+    return recorder_copy
+
+  def get_cached_file_path(self):
+    if(not self.is_cacheable):
+      return None
+    key = self.hasher.hexdigest()
+    return os.path.join(self.cache_dir, key[ : 2 ], key + '.svg')
+
+
+# internal methods timed by the instrumentation (see SvgImage.enable_stats), grouped by stage
+_instrumented_stages = { "projection": ("project_point_to_canvas", "_project_points_to_canvas", "project_complex_point_to_canvas", "project_vector_to_canvas", "project_complex_vector_to_canvas"),
+                         "autosmooth": ("_compute_autosmooth_control_vectors",),
+                         "path_string": ("_make_svg_path_M_command", "_make_svg_path_L_command", "_make_svg_path_C_command", "_make_svg_path_M_and_C_command", "_make_svg_path_Z_command", "_make_svg_path_d_string"),
+                         "style_string": ("_make_svg_style_string",),
+                         "serialization": ("_serialize_svgwrite_element",),
+                         "file_writing": ("_write_svg_file",) }
+
+# functions given by the user, timed in the "user_callbacks" stage
+_instrumented_callback_arguments = { "draw_function_graph": 0,
+                                     "draw_parametric_graph": 0,
+                                     "draw_cobweb": 0,
+                                     "draw_orbit_diagram": 0,
+                                     "draw_streamlines": 0,
+                                     "draw_implicit_curve": 0,
+                                     "draw_mapped_grid": 0 }
+
+
+class _Instrumentation:
+  # counters and timers of an image, the timing is done by wrappers set as attributes of the image, hiding its methods
+
+  def __init__(self, image, callback):
+    self.callback = callback
+    self.method_calls = collections.Counter()
+    self.method_times = collections.Counter()
+    self.stage_calls = collections.Counter()
+    self.stage_times = collections.Counter()
+    self.elements = collections.Counter()
+    # the points are counted by the image (also the points projected in batches)
+    self.image = image
+    self.initial_nb_projected_points = image._nb_projected_points
+    self.nb_bytes = 0
+    self.active_stages = set()
+    self.method_depth = 0
+    self.wrapped_method_names = []
+    for method_name in dir(type(image)):
+      if((not method_name.startswith("_")) and (method_name.startswith(("draw_", "put_", "insert_", "save", "to_")) or method_name == "write")):
+        self._wrap(image, method_name, self._wrap_public_method)
+    for stage, method_names in _instrumented_stages.items():
+      for method_name in method_names:
+        self._wrap(image, method_name, lambda method, method_name, stage = stage : self._wrap_stage_method(method, stage))
+    self._wrap(image, "_add_svgwrite_element", self._wrap_add_element)
+    self._wrap(image, "_iter_encoded_chunks", self._wrap_encoded_chunks)
+
+  def _wrap(self, image, method_name, make_wrapper):
+    setattr(image, method_name, make_wrapper(getattr(image, method_name), method_name))
+    self.wrapped_method_names.append(method_name)
+
+  def uninstall(self, image):
+    for method_name in self.wrapped_method_names:
+      image.__dict__.pop(method_name, None)
+
+  def _time_stage(self, stage, function, args, kwargs):
+    if(stage in self.active_stages):
+      # nested call from the same stage
+      return function(*args, **kwargs)
+    self.active_stages.add(stage)
+    start_time = time.perf_counter()
+    try:
+      return function(*args, **kwargs)
+    finally:
+      self.stage_times[stage] += time.perf_counter() - start_time
+      self.stage_calls[stage] += 1
+      self.active_stages.discard(stage)
+
+  def _wrap_stage_method(self, method, stage):
+    def timed_method(*args, **kwargs):
+      return self._time_stage(stage, method, args, kwargs)
+    return timed_method
+
+  def _wrap_callback(self, callback):
+    def timed_callback(*args, **kwargs):
+      return self._time_stage("user_callbacks", callback, args, kwargs)
+    return timed_callback
+
+  def _wrap_public_method(self, method, method_name):
+    callback_index = _instrumented_callback_arguments.get(method_name)
+
+    def timed_method(*args, **kwargs):
+      if((callback_index is not None) and (len(args) > callback_index)):
+        args = list(args)
+        args[callback_index] = self._wrap_callback(args[callback_index])
+      self.method_depth += 1
+      start_time = time.perf_counter()
+      try:
+        return method(*args, **kwargs)
+      finally:
+        duration = time.perf_counter() - start_time
+        self.method_depth -= 1
+        self.method_calls[method_name] += 1
+        self.method_times[method_name] += duration
+        if((self.callback is not None) and (self.method_depth == 0)):
+          self.callback(method_name, duration)
+    return timed_method
+
+  def _wrap_add_element(self, method, method_name):
+    def counting_method(element):
+      self.elements[element.elementname] += 1
+      return method(element)
+    return counting_method
+
+  def _wrap_encoded_chunks(self, method, method_name):
+    def counting_method(*args, **kwargs):
+      for chunk in method(*args, **kwargs):
+        self.nb_bytes += len(chunk)
+        yield chunk
+    return counting_method
+
+  def get_stats(self):
+    return { "methods": { name: { "calls": self.method_calls[name], "time": self.method_times[name] } for name in self.method_calls },
+             "stages": { name: { "calls": self.stage_calls[name], "time": self.stage_times[name] } for name in self.stage_calls },
+             "elements": dict(self.elements),
+             "points": self.image._nb_projected_points - self.initial_nb_projected_points,
+             "bytes": self.nb_bytes }
+
+
+def _recorded_call(uses_random = False):
+  # decorator for the methods that have an effect on the image content
+  # the calls are recorded when the render cache is in use, calls made from inside another recorded method are not
+  def decorator(method):
+    @functools.wraps(method)
+    def recorded_method(self, *args, **kwargs):
+      recorder = self._call_recorder
+      if((recorder is None) or (recorder.depth > 0)):
+        return method(self, *args, **kwargs)
+      recorder.record(method.__name__, args, kwargs, uses_random)
+      recorder.depth += 1
+      try:
+        return method(self, *args, **kwargs)
+      finally:
+        recorder.depth -= 1
+    return recorded_method
+  return decorator
+
+
+def _make_affine_matrix(matrix):
+  # accepts 2x3 and 3x3 matrices (the last row of 3x3 matrices is ignored), returns ((a, b, e), (c, d, f)) for x' = a x + b y + e, y' = c x + d y + f
+  rows = [ [ float(value) for value in row ] for row in matrix ]
+  if((len(rows) not in [ 2, 3 ]) or any(len(row) != 3 for row in rows)):
+    raise Exception("Affine transform: expected a 2x3 or 3x3 matrix")
+  return (tuple(rows[0]), tuple(rows[1]))
+
+
+def _compose_affine_matrices(first_matrix, second_matrix):
+  # returns the matrix of the transform applying second_matrix then first_matrix
+  (a1, b1, e1), (c1, d1, f1) = first_matrix
+  (a2, b2, e2), (c2, d2, f2) = second_matrix
+  return ((a1 * a2 + b1 * c2, a1 * b2 + b1 * d2, a1 * e2 + b1 * f2 + e1),
+          (c1 * a2 + d1 * c2, c1 * b2 + d1 * d2, c1 * e2 + d1 * f2 + f1))
+
+
+def _get_affine_matrix_norm(matrix):
+  # largest singular value of the linear part: the largest factor by which lengths are multiplied
+  (a, b, e), (c, d, f) = matrix
+  square_norm = a * a + b * b + c * c + d * d
+  determinant = a * d - b * c
+  return math.sqrt(0.5 * (square_norm + math.sqrt(max(square_norm * square_norm - 4. * determinant * determinant, 0.))))
+
+
+def _invert_affine_matrix(matrix):
+  (a, b, e), (c, d, f) = matrix
+  determinant = a * d - b * c
+  if(determinant == 0):
+    raise Exception("Affine transform: the matrix is not invertible")
+  a, b, c, d = d / determinant, - b / determinant, - c / determinant, a / determinant
+  return ((a, b, - a * e - b * f), (c, d, - c * e - d * f))
+
+
+def make_affine_transform(translation = (0., 0.), rotation = 0., scaling = 1.):
+  """Returns the 3x3 matrix of the transform that scales, then rotates, then translates the points, to be used with ``SvgImage.push_transform``.
+
+  Args:
+    * ``translation`` (``tuple``): translation vector
+    * ``rotation`` (``float``): rotation angle in radians (counterclockwise)
+    * ``scaling`` (``float`` or ``tuple``): scaling factor, or the scaling factors along each axis
+
+  Example::
+
+    matrix = mathsvg.make_affine_transform(translation = (1, 2), rotation = math.pi / 6, scaling = 0.5)
+  """
+  scaling_x, scaling_y = (scaling, scaling) if(isinstance(scaling, (int, float))) else scaling
+  cos_rotation = math.cos(rotation)
+  sin_rotation = math.sin(rotation)
+  return [ [ scaling_x * cos_rotation, - scaling_y * sin_rotation, translation[0] ],
+           [ scaling_x * sin_rotation, scaling_y * cos_rotation, translation[1] ],
+           [ 0., 0., 1. ] ]
+
+
+def _compute_brush_hairs(numpy, smallest_interval, density):
+  # hairs of a straight brush on [0, 1]: returns the positions and the lengths (at most 1) sorted by position
+  # between two hairs, hairs are added at distances density^k * (half of the interval) from each of them, with lengths going to 0 in the middle,
+  # then the same is done between all the consecutive hairs, until the distances are smaller than smallest_interval
+  if(not (0. < density < 1.)):
+    raise Exception("Brush: the density should be between 0 and 1")
+  if(smallest_interval <= 0.):
+    raise Exception("Brush: the smallest interval should be positive")
+  left_positions = numpy.array([ 0. ])
+  right_positions = numpy.array([ 1. ])
+  left_lengths = numpy.array([ 1. ])
+  right_lengths = numpy.array([ 1. ])
+  positions = [ numpy.array([ 0., 1. ]) ]
+  lengths = [ numpy.array([ 1., 1. ]) ]
+  log_density = math.log(density)
+  while(len(left_positions) > 0):
+    half_widths = 0.5 * (right_positions - left_positions)
+    # number of hairs on each side: the number of k >= 1 such that density^k * half_width > smallest_interval
+    with numpy.errstate(divide = 'ignore'):
+      nb_hairs = numpy.ceil(numpy.log(smallest_interval / half_widths) / log_density) - 1
+    nb_hairs = numpy.maximum(nb_hairs, 0).astype(int)
+    is_refined = nb_hairs > 0
+    left_positions, right_positions, left_lengths, right_lengths, half_widths, nb_hairs = [ values[is_refined] for values in (left_positions, right_positions, left_lengths, right_lengths, half_widths, nb_hairs) ]
+    if(len(nb_hairs) == 0):
+      break
+    interval_indexes = numpy.repeat(numpy.arange(len(nb_hairs)), nb_hairs)
+    first_indexes = numpy.cumsum(nb_hairs) - nb_hairs
+    hair_indexes = numpy.arange(len(interval_indexes)) - first_indexes[interval_indexes]
+    # k = n, ..., 1 on the left side and k = 1, ..., n on the right side: the positions are increasing
+    right_k = hair_indexes + 1
+    left_k = nb_hairs[interval_indexes] - hair_indexes
+    new_left_positions = left_positions[interval_indexes] + density ** left_k * half_widths[interval_indexes]
+    new_left_lengths = left_lengths[interval_indexes] * (1. - (1. - density) ** left_k)
+    new_right_positions = right_positions[interval_indexes] - density ** right_k * half_widths[interval_indexes]
+    new_right_lengths = right_lengths[interval_indexes] * (1. - (1. - density) ** right_k)
+    positions += [ new_left_positions, new_right_positions ]
+    lengths += [ new_left_lengths, new_right_lengths ]
+    # next intervals: between the consecutive hairs of each [ left end, left hairs, right hairs, right end ]
+    group_sizes = 2 * nb_hairs + 2
+    group_starts = numpy.cumsum(group_sizes) - group_sizes
+    group_ends = group_starts + group_sizes - 1
+    left_hair_indexes = group_starts[interval_indexes] + 1 + hair_indexes
+    right_hair_indexes = left_hair_indexes + nb_hairs[interval_indexes]
+    sequence_positions = numpy.empty(group_sizes.sum())
+    sequence_lengths = numpy.empty(group_sizes.sum())
+    for values, left_values, new_left_values, new_right_values, right_values in [ (sequence_positions, left_positions, new_left_positions, new_right_positions, right_positions),
+                                                                                  (sequence_lengths, left_lengths, new_left_lengths, new_right_lengths, right_lengths) ]:
+      values[group_starts] = left_values
+      values[left_hair_indexes] = new_left_values
+      values[right_hair_indexes] = new_right_values
+      values[group_ends] = right_values
+    is_interval_start = numpy.ones(len(sequence_positions) - 1, dtype = bool)
+    is_interval_start[group_ends[ : -1 ]] = False
+    left_positions = sequence_positions[ : -1 ][is_interval_start]
+    right_positions = sequence_positions[1 : ][is_interval_start]
+    left_lengths = sequence_lengths[ : -1 ][is_interval_start]
+    right_lengths = sequence_lengths[1 : ][is_interval_start]
+  positions = numpy.concatenate(positions)
+  order = numpy.argsort(positions, kind = 'stable')
+  return positions[order], numpy.concatenate(lengths)[order]
+
+
+def _simplify_polylines(numpy, points, starts, ends, tolerance):
+  # Ramer-Douglas-Peucker simplification of all the polylines at once, polyline k is points[starts[k] : ends[k] + 1]
+  # returns the mask of the points kept: the points farther than tolerance from the simplified polylines are kept
+  is_kept = numpy.zeros(len(points), dtype = bool)
+  is_kept[starts] = True
+  is_kept[ends] = True
+  x_values = numpy.ascontiguousarray(points[:, 0])
+  y_values = numpy.ascontiguousarray(points[:, 1])
+  segment_starts = numpy.asarray(starts)
+  segment_ends = numpy.asarray(ends)
+  while(len(segment_starts) > 0):
+    nb_inner_points = segment_ends - segment_starts - 1
+    has_inner_points = nb_inner_points > 0
+    segment_starts = segment_starts[has_inner_points]
+    segment_ends = segment_ends[has_inner_points]
+    nb_inner_points = nb_inner_points[has_inner_points]
+    if(len(segment_starts) == 0):
+      break
+    offsets = numpy.cumsum(nb_inner_points) - nb_inner_points
+    point_indexes = numpy.arange(nb_inner_points.sum()) + numpy.repeat(segment_starts + 1 - offsets, nb_inner_points)
+    start_x_values = x_values[segment_starts]
+    start_y_values = y_values[segment_starts]
+    segment_x_values = x_values[segment_ends] - start_x_values
+    segment_y_values = y_values[segment_ends] - start_y_values
+    point_x_values = x_values[point_indexes] - numpy.repeat(start_x_values, nb_inner_points)
+    point_y_values = y_values[point_indexes] - numpy.repeat(start_y_values, nb_inner_points)
+    # distance to the line of the segment times the length of the segment, or distance to the start if both ends are the same
+    values = numpy.abs(numpy.repeat(segment_x_values, nb_inner_points) * point_y_values - numpy.repeat(segment_y_values, nb_inner_points) * point_x_values)
+    segment_lengths = numpy.hypot(segment_x_values, segment_y_values)
+    is_loop = segment_lengths == 0
+    if(is_loop.any()):
+      is_in_loop = numpy.repeat(is_loop, nb_inner_points)
+      values[is_in_loop] = numpy.hypot(point_x_values[is_in_loop], point_y_values[is_in_loop])
+      segment_lengths[is_loop] = 1.
+    max_values = numpy.maximum.reduceat(values, offsets)
+    # the segments are cut at their farthest point (the first one if there are several)
+    is_farthest = values == numpy.repeat(max_values, nb_inner_points)
+    cut_indexes = numpy.minimum.reduceat(numpy.where(is_farthest, point_indexes, len(points)), offsets)
+    is_cut = max_values > tolerance * segment_lengths
+    cut_indexes = cut_indexes[is_cut]
+    is_kept[cut_indexes] = True
+    segment_starts, segment_ends = numpy.concatenate([ segment_starts[is_cut], cut_indexes ]), numpy.concatenate([ cut_indexes, segment_ends[is_cut] ])
+  return is_kept
+
+
+# marching squares: for each case (bit k set when corner k of the cell is above the level, corners: bottom left, bottom right, top right, top left),
+# the two pairs of sides of the cell joined by the curve (sides: bottom, right, top, left), -1 when there is no segment
+# the saddle cases 5 and 10 are for a center below the level, when it is above the segments of the other saddle case are used
+_marching_squares_sides = [ [ [ -1, -1 ], [ -1, -1 ] ], [ [ 3, 0 ], [ -1, -1 ] ], [ [ 0, 1 ], [ -1, -1 ] ], [ [ 3, 1 ], [ -1, -1 ] ],
+                            [ [ 1, 2 ], [ -1, -1 ] ], [ [ 3, 0 ], [ 1, 2 ] ], [ [ 0, 2 ], [ -1, -1 ] ], [ [ 2, 3 ], [ -1, -1 ] ],
+                            [ [ 2, 3 ], [ -1, -1 ] ], [ [ 0, 2 ], [ -1, -1 ] ], [ [ 0, 1 ], [ 2, 3 ] ], [ [ 1, 2 ], [ -1, -1 ] ],
+                            [ [ 3, 1 ], [ -1, -1 ] ], [ [ 0, 1 ], [ -1, -1 ] ], [ [ 3, 0 ], [ -1, -1 ] ], [ [ -1, -1 ], [ -1, -1 ] ] ]
+
+
+def _compute_contour_segments(numpy, values, level):
+  # segments of the level set by marching squares on a grid of values of shape (nb_rows + 1, nb_columns + 1), all the cells at once
+  # a segment is given by the indexes of the two edges of the grid where it ends:
+  #  edge i * nb_columns + j joins the nodes (i, j) and (i, j + 1), edge nb_horizontal_edges + i * (nb_columns + 1) + j joins (i, j) and (i + 1, j)
+  nb_columns = values.shape[1] - 1
+  nb_horizontal_edges = values.shape[0] * nb_columns
+  is_above = (values > level).astype(numpy.int8)
+  cases = is_above[ : -1, : -1 ] + 2 * is_above[ : -1, 1 : ] + 4 * is_above[1 : , 1 : ] + 8 * is_above[1 : , : -1 ]
+  is_finite = numpy.isfinite(values)
+  is_finite_cell = is_finite[ : -1, : -1 ] & is_finite[ : -1, 1 : ] & is_finite[1 : , 1 : ] & is_finite[1 : , : -1 ]
+  cases[~ is_finite_cell] = 0
+  cell_indexes = numpy.flatnonzero((cases != 0) & (cases != 15))
+  cell_cases = cases.reshape(-1)[cell_indexes]
+  rows, columns = numpy.divmod(cell_indexes, nb_columns)
+  is_saddle = (cell_cases == 5) | (cell_cases == 10)
+  if(is_saddle.any()):
+    saddle_rows = rows[is_saddle]
+    saddle_columns = columns[is_saddle]
+    centers = 0.25 * (values[saddle_rows, saddle_columns] + values[saddle_rows, saddle_columns + 1] + values[saddle_rows + 1, saddle_columns + 1] + values[saddle_rows + 1, saddle_columns])
+    cell_cases[is_saddle] = numpy.where(centers > level, 15 - cell_cases[is_saddle], cell_cases[is_saddle])
+  bottom_edges = rows * nb_columns + columns
+  left_edges = nb_horizontal_edges + rows * (nb_columns + 1) + columns
+  side_edges = numpy.stack([ bottom_edges, left_edges + 1, bottom_edges + nb_columns, left_edges ], axis = -1)
+  sides = numpy.array(_marching_squares_sides)[cell_cases]
+  segments = numpy.take_along_axis(side_edges, sides.reshape(-1, 4) % 4, axis = 1).reshape(-1, 2, 2)
+  return numpy.concatenate([ segments[:, 0], segments[:, 1][sides[:, 1, 0] >= 0] ])
+
+
+def _join_segments(numpy, segments):
+  # joins the segments having a common end into lines, segments: array of shape (n, 2) of end keys, each key being the end of at most two segments
+  # returns the list of the lines as lists of keys, the first and last keys of a closed line are the same
+  # end number 2 * k + e is the end e of segment k, partners[end] is the other end with the same key (or -1)
+  nb_ends = 2 * len(segments)
+  keys = segments.reshape(-1)
+  order = numpy.argsort(keys, kind = 'stable')
+  is_joined = keys[order[1 : ]] == keys[order[ : -1 ]]
+  partners = numpy.full(nb_ends, -1)
+  partners[order[1 : ][is_joined]] = order[ : -1 ][is_joined]
+  partners[order[ : -1 ][is_joined]] = order[1 : ][is_joined]
+  keys = keys.tolist()
+  partners = partners.tolist()
+  is_done = [ False ] * len(segments)
+  # the open lines start from a free end, the closed lines from any end
+  free_ends = [ end for end in range(nb_ends) if(partners[end] < 0) ]
+  lines = []
+  for start_end in free_ends + list(range(0, nb_ends, 2)):
+    if(is_done[start_end // 2]):
+      continue
+    line = [ keys[start_end] ]
+    end = start_end
+    while(True):
+      is_done[end // 2] = True
+      line.append(keys[end ^ 1])
+      end = partners[end ^ 1]
+      if((end < 0) or is_done[end // 2]):
+        break
+    lines.append(line)
+  return lines
+
+
+def _encode_png_mask(numpy, mask):
+  # PNG image (as bytes) of a boolean array: white and opaque where the array is True, transparent elsewhere
+  import struct
+  import zlib
+  height, width = mask.shape
+  pixels = numpy.zeros((height, 1 + 2 * width), dtype = numpy.uint8)
+  # the first byte of each row is the filter type (0: none), then grey and alpha values
+  pixels[:, 1 : ] = numpy.repeat(numpy.where(mask, 255, 0).astype(numpy.uint8), 2, axis = 1)
+
+  def make_chunk(chunk_type, data):
+    return struct.pack('>I', len(data)) + chunk_type + data + struct.pack('>I', zlib.crc32(chunk_type + data) & 0xffffffff)
+  header = struct.pack('>IIBBBBB', width, height, 8, 4, 0, 0, 0)
+  return b'\x89PNG\r\n\x1a\n' + make_chunk(b'IHDR', header) + make_chunk(b'IDAT', zlib.compress(pixels.tobytes(), 9)) + make_chunk(b'IEND', b'')
+
+
+class PathBuilder:
+  """Builds a path made of line segments, Bézier curves and elliptic arcs, drawn as one SVG path element by ``SvgImage.draw_path``.
+
+  The methods follow the commands of the SVG paths and return the builder, so that the calls can be chained. The methods taking points accept any number of them at once.
+  All the points of the path are projected onto the canvas in one pass when it is drawn, and the path string is joined at once.
+
+  Args:
+    * ``units`` (default: ``'math'``): units of the coordinates, ``'math'`` for math coordinates (projected onto the canvas), ``'svg'`` for coordinates on the canvas
+
+  Example::
+
+    image = mathsvg.SvgImage(pixel_density = 20, view_window = (( -4, -4 ), ( 4, 4 )))
+    path = mathsvg.PathBuilder()
+    path.move_to((-3, 0)).line_to((-2, 1), (-1, 0))
+    path.curve_to((0, 2), (1, -2), (2, 0))
+    path.arc_to((3, 0), (0.5, 0.5), counterclockwise = False)
+    image.draw_path(path)
+    image.save("draw-path-example.svg")
+  """
+
+  def __init__(self, units = 'math'):
+    if(units not in [ 'math', 'svg' ]):
+      raise Exception(f'Unknown units: "{units}" (expected "math" or "svg")')
+    self.units = units
+    # list of [ command letter, number of points, arc parameters ], the points of all the commands are in one list
+    self._commands = []
+    self._points = []
+
+  def _add_command(self, letter, points, nb_points_per_segment = 1, arc_parameters = None):
+    if(len(points) % nb_points_per_segment != 0):
+      raise Exception(f'{letter} command: the number of points should be a multiple of {nb_points_per_segment}')
+    if(len(points) == 0):
+      return self
+    if((len(self._commands) == 0) and (letter != 'M')):
+      raise Exception("A path should start with move_to")
+    last_command = self._commands[-1] if(len(self._commands) > 0) else None
+    if((last_command is not None) and (last_command[0] == letter) and (letter in 'LCQ')):
+      # consecutive commands of the same kind are merged
+      last_command[1] += len(points)
+    else:
+      self._commands.append([ letter, len(points), arc_parameters ])
+    self._points.extend(points)
+    return self
+
+  def move_to(self, point):
+    """Starts a new subpath at the given point."""
+    return self._add_command('M', [ point ])
+
+  def line_to(self, *points):
+    """Adds line segments joining the current point to each of the points in turn."""
+    return self._add_command('L', points)
+
+  def curve_to(self, *points):
+    """Adds cubic Bézier curves, each one given by three points: the two control points and the end point."""
+    return self._add_command('C', points, nb_points_per_segment = 3)
+
+  def quad_to(self, *points):
+    """Adds quadratic Bézier curves, each one given by two points: the control point and the end point."""
+    return self._add_command('Q', points, nb_points_per_segment = 2)
+
+  def arc_to(self, end_point, radiuses, rotation = 0., large_arc = False, counterclockwise = True):
+    """Adds an arc of ellipse from the current point to ``end_point``.
+
+    Args:
+      * ``end_point`` (``tuple``): coordinates of the end of the arc
+      * ``radiuses`` (``tuple``): the two radiuses of the ellipse (in the units of the builder)
+      * ``rotation`` (``float``): angle (in radians) between the first axis of the ellipse and the horizontal axis
+      * ``large_arc`` (``bool``): whether to take the largest of the two possible arcs
+      * ``counterclockwise`` (``bool``): direction of the arc (in math coordinates)
+    """
+    return self._add_command('A', [ end_point ], arc_parameters = (radiuses[0], radiuses[1], rotation, bool(large_arc), bool(counterclockwise)))
+
+  def close(self):
+    """Closes the current subpath with a line segment to its first point."""
+    if(len(self._commands) == 0):
+      raise Exception("A path should start with move_to")
+    self._commands.append([ 'Z', 0, None ])
+    return self
+
+  def _make_d_string(self, image):
+    if(self.units == 'math'):
+      points = image._project_points_to_canvas(self._points)
+      length_scale = image.rescaling * image._transform_scaling
+    else:
+      points = self._points
+      length_scale = 1
+      image._extend_bounding_box(points)
+    pieces = []
+    point_index = 0
+    for letter, nb_points, arc_parameters in self._commands:
+      pieces.append(letter)
+      if(arc_parameters is None):
+        pieces += [ f'{point[0]}, {point[1]}' for point in points[ point_index : point_index + nb_points ] ]
+      else:
+        # the y axis is flipped on the canvas: angles and directions are reversed
+        x_radius, y_radius, rotation, large_arc, counterclockwise = arc_parameters
+        if(self.units == 'math'):
+          rotation = image._transform_angle(rotation)
+          counterclockwise = counterclockwise != image._is_transform_reflecting
+        end_point = points[point_index]
+        # the arc stays closer to its end point than the diameter of the ellipse
+        image._extend_bounding_box([ end_point ], 2 * length_scale * max(x_radius, y_radius))
+        pieces.append(f'{length_scale * x_radius}, {length_scale * y_radius} {0. - math.degrees(rotation)} {int(large_arc)} {int(not counterclockwise)} {end_point[0]}, {end_point[1]}')
+      point_index += nb_points
+    return ' '.join(pieces)
+
+
 # note: not checking any of the parameters
 
 class SvgImage:
@@ -37,14 +953,82 @@ class SvgImage:
     * ``view_window`` (``tuple``): is a tuple of tuple values characterizing the drawing area.
                                    The first tuple contains the minima values for x and y and the last one the corresponding maxima.
     * ``pixel_density`` (``float``): number of pixels per unit length. Coordinates in the SVG file are rescaled accordingly.
+    * ``render_cache_dir`` (``str``): directory of the render cache (default is the value of the environment variable ``MATHSVG_RENDER_CACHE_DIR`` if set, otherwise the cache is not used).
+    * ``memory_limit`` (``int``): approximate number of bytes the drawn elements are allowed to use (default is ``None``: no limit), see ``memory_usage``.
+    * ``backend`` (``str``): what to do with the drawings, one of ``"svg"`` (the default: make a SVG document), ``"null"`` (discard them) or ``"count"`` (only count them, see ``output_counts``).
+    * ``auto_fit`` (``boolean``): if ``True`` the drawing area is chosen when saving so that it contains all the drawings (default is ``False``), see ``fitted_view_window``.
+    * ``fit_padding`` (``float``): with ``auto_fit``, size of the empty margin around the drawings in math units (default is ``0``).
     * ``_svgwrite_debug`` (``boolean``): to create the svgwrite object with a specific debug mode (default is ``False``).
+
+  Render cache: when enabled, the image keeps a hash of the configuration and of all the calls made to its drawing and option methods, together with their arguments.
+  When saving, if a file with the same hash has already been produced, it is copied from the cache directory instead of being serialized again.
+  Functions passed as arguments (for example to ``draw_function_graph``) are identified by their code, the values they capture and the values of the global variables they use.
+  The image is not cached when an argument (or a value captured by a function, or a global variable it uses) is not a number, a string, a list, a tuple, a dict or an array of such values, a function or a module of the standard library or of an installed package, or when a function uses the ``random`` or ``numpy.random`` modules.
+  The cache key also includes the state of the ``random`` module for the drawings that use random numbers.
+  Changes made directly to ``svgwrite_object`` are not taken into account.
+
+  Memory limit: when the estimated memory used by the elements drawn exceeds ``memory_limit``, these elements are serialized and moved to a temporary file.
+  They are copied back in place when saving, so that the SVG document is the same as without limit. The only difference is that they are no longer available in ``svgwrite_object`` as svgwrite objects.
+
+  Backends: with the ``"null"`` and ``"count"`` backends, the drawings go through the same computations as with the ``"svg"`` backend (projection, path and style strings, creation of the svgwrite elements) but the elements are not kept.
+  Nothing is written by ``save`` and ``save_async`` (the file name is still checked) and the other output methods return an empty SVG document.
+  This allows a dry run of a script to know the time spent on the geometry, and with the ``"count"`` backend the size of the output.
+
+  Transforms: ``push_transform`` (or ``transform``) applies an affine transform to everything drawn until the matching ``pop_transform``.
+
+  Components: drawings made inside ``define_component`` are stored once in the SVG document, ``place_component`` and ``place_components`` then draw copies of them for the size of a reference each. ``draw_ifs`` draws self-similar figures made of copies of a component.
+
+  Automatic fitting: with ``auto_fit = True``, the image keeps the bounding box of everything drawn (including the width of the strokes, the size of the points and of the arrow tips, texts being estimated from their font size).
+  When the image is saved (or converted with ``to_string``, ``write``...), the view box of the SVG document is set to this bounding box (plus ``fit_padding``), whatever the ``view_window``.
+  The drawings are projected as usual, ``view_window`` still gives the scale (with ``pixel_density``) and the default sizes of the dashes and arrows. Paths given directly in SVG coordinates with ``insert_svg_path_command`` are not taken into account.
+  ``draw_orbit_diagram`` cannot be used with ``auto_fit``, since it only keeps the points inside the view window, and the ``domain`` of ``draw_implicit_curve`` has to be given.
   """
 
-  def __init__(self, view_window = (( -1, -1 ), ( 1, 1 )), pixel_density = 100., _svgwrite_debug = False):
+  def __init__(self, view_window = (( -1, -1 ), ( 1, 1 )), pixel_density = 100., render_cache_dir = None, memory_limit = None, backend = "svg", auto_fit = False, fit_padding = 0., _svgwrite_debug = False):
 
+    self._call_recorder = None
+    self._instrumentation = None
     self.image_file_name = None
     self.svgwrite_object = svgwrite.Drawing(filename = None, debug = _svgwrite_debug)
 
+    self._serialization_lock = threading.Lock()
+    self._last_save = None
+
+    self.memory_limit = memory_limit
+    # element name -> [ number of elements, estimated bytes ]
+    self._memory_usage = {}
+    self._spill_file = None
+    self._nb_spilled_elements = 0
+
+    if((backend != "svg") and (backend not in _backends)):
+      raise Exception(f'Unknown backend "{backend}" (should be one of: "svg", {", ".join(f"{name!r}" for name in _backends)})')
+    self._backend = _backends[backend]() if(backend != "svg") else None
+    self._nb_projected_points = 0
+
+    # bounding box of the drawings on the canvas: [ x_min, y_min, x_max, y_max ] (only kept with auto_fit)
+    self._auto_fit = auto_fit
+    self._bounding_box = [ math.inf, math.inf, - math.inf, - math.inf ] if(auto_fit) else None
+    # largest half stroke width used
+    self._bounding_box_margin = 0.
+    self.fit_padding = fit_padding
+
+    # entries: (transforms before the push, group element or None, saved bounding box, group matrix on the canvas)
+    self._transform_stack = []
+    # groups and symbols receiving the elements drawn (the last one)
+    self._open_groups = []
+    # name -> (symbol, canvas matrix when it was defined, bounding box), and the definitions in progress
+    self._components = {}
+    # for the identifiers of the masks (see draw_orbit_diagram)
+    self._nb_masks = 0
+    self._component_stack = []
+    # composition of the transforms that are not groups (None: identity) and the same followed by the projection onto the canvas
+    self._math_transform = None
+    self._canvas_transform = None
+    # scaling of the lengths (radiuses), exact for similarities
+    self._transform_scaling = 1.
+    # whether the transform is a reflection (negative determinant): the directions of the arcs are reversed
+    self._is_transform_reflecting = False
+
     self.rescaling = pixel_density
     self.view_window = view_window
     self.window_size = [ self.view_window[1][i] - self.view_window[0][i] for i in (0, 1) ]
@@ -63,6 +1047,11 @@ class SvgImage:
 
     self.set_dash_mode("none")
 
+    if(render_cache_dir is None):
+      render_cache_dir = os.environ.get('MATHSVG_RENDER_CACHE_DIR') or None
+    if(render_cache_dir is not None):
+      self._call_recorder = _CallRecorder(render_cache_dir, (view_window, pixel_density, auto_fit, fit_padding, _svgwrite_debug))
+
   def _convert_length_to_svg(self, unit_name, s):
     if(unit_name == 'svg'):
       return s
@@ -70,11 +1059,13 @@ class SvgImage:
       return self._rescale_length(s)
     raise Exception(f'Invalid unit name {unit_name}')
 
+  @_recorded_call()
   def reset_font_options(self):
     """Reset the font size to the default value (depends on the size of the window)
     """
     self.font_size_svgpx = 3 * self._rescale_length(self._compute_a_smallish_size_in_math_units())
 
+  @_recorded_call()
   def set_font_options(self, font_size = None, units = 'math'):
     """Set some font options, so far only the font size.
 
@@ -85,6 +1076,7 @@ class SvgImage:
     if(font_size is not None):
       self.font_size_svgpx = self._convert_length_to_svg(units, font_size)
 
+  @_recorded_call()
   def set_point_size(self, point_size, units = 'math'):
     """Set the size of points, pluses and crosses.
 
@@ -94,9 +1086,11 @@ class SvgImage:
     """
     self.point_size_svgpx = self._convert_length_to_svg(units, point_size)
 
+  @_recorded_call()
   def reset_point_size(self):
     self.point_size_svgpx = 6 * self.stroke_width
 
+  @_recorded_call()
   def set_dash_mode(self, mode):
     """Choose the type of stroke.
 
@@ -129,6 +1123,7 @@ class SvgImage:
     self.svgwrite_object.viewbox(width = view_box[0], height = view_box[1])
     self.view_box = view_box
 
+  @_recorded_call()
   def set_dash_dash_structure(self, black_len, white_len, units = 'math'):
     """Sets the size of the dashes and space for the dash mode
 
@@ -143,6 +1138,7 @@ class SvgImage:
     self.dash_dasharray_svgpx = (black_len, white_len)
 
 
+  @_recorded_call()
   def set_dash_dot_structure(self, dot_sep, units = 'math'):
     """Sets the separations between dots for dotted stroke
 
@@ -154,6 +1150,7 @@ class SvgImage:
     self.dot_dasharray_svgpx = (self.stroke_width, self._convert_length_to_svg(units, dot_sep))
 
 
+  @_recorded_call()
   def reset_svg_options(self):
     """Sets the stroke color to ``"black"``, the stroke width to ``1`` pixel and the fill color to ``"none"``."""
 
@@ -173,6 +1170,7 @@ class SvgImage:
   def _compute_a_smallish_size_in_math_units(self):
     return min(self.window_size) / 50
 
+  @_recorded_call()
   def reset_dash_and_dot_structures(self):
     """Sets the dash, dot and dasharray structures to default values depending on the size of the canvas."""
 
@@ -184,6 +1182,7 @@ class SvgImage:
     self.dasharray_dasharray_svgpx = [ dash_len_px, 1 ]
 
 
+  @_recorded_call()
   def reset_arrow_options(self):
     """Sets the width, opening angle and curvature of arrows to default values depending eventually on the size of the canvas."""
 
@@ -191,6 +1190,7 @@ class SvgImage:
     self.arrow_opening_angle = 0.12 * math.pi
     self.arrow_curvature = 0.14
 
+  @_recorded_call()
   def set_arrow_options(self, width = None, opening_angle = None, curvature = None, units = 'math'):
     """Sets some values governing the shape and geometry of the arrows.
 
@@ -225,6 +1225,7 @@ class SvgImage:
       self.arrow_curvature = curvature
 
 
+  @_recorded_call()
   def set_svg_options(self,
                       stroke_color = None,
                       stroke_width = None,
@@ -274,8 +1275,47 @@ class SvgImage:
          * ``file_name`` (``str``): name of the file to save.
          * ``do_overwrite``: optional boolean to allow overwrite over already existing file (default value is ``False``), raise an exception if this is ``False`` and the file already exists.
 
+       The elements are serialized only once: saving again after some more drawings only serializes the new elements.
+       When saving again into the same file (with ``do_overwrite = True``) and this file has not been modified in between, the new elements are appended in place to the file.
+
         See an example in :ref:`multiple-save.py`"""
 
+    file_name = self._check_save_file_name(file_name, do_overwrite)
+    self._fit_drawing(self.svgwrite_object)
+    self._save_drawing(self.svgwrite_object, file_name, self._get_render_cache_file_path())
+
+
+  def save_async(self, file_name, do_overwrite=False):
+    """Save the drawings into a SVG file in a background thread.
+
+       The current content of the image is recorded immediately, further drawings will not appear in the saved file.
+       Writing the file happens in a thread shared by all the images, so that the script can go on with its computations.
+
+       Args:
+         * ``file_name`` (``str``): name of the file to save.
+         * ``do_overwrite``: optional boolean to allow overwrite over already existing file (default value is ``False``).
+
+       Returns a ``concurrent.futures.Future`` whose result is the name of the saved file. Errors (for example if the file already exists and ``do_overwrite`` is ``False``) are raised by the ``result()`` method of the future.
+       Call ``mathsvg.flush_pending_saves()`` to wait for all the saves to complete.
+
+       Example::
+
+         image = mathsvg.SvgImage(pixel_density = 100, view_window = (( -1, -1 ), ( 1, 1 )))
+         image.draw_circle([0, 0], 0.5)
+         saved = image.save_async("save-async-example.svg")
+         image.draw_circle([0, 0], 0.8)  # not in the first file
+         saved.result()
+    """
+
+    snapshot = self._make_svgwrite_snapshot()
+    future = _get_save_executor().submit(self._save_snapshot, snapshot, file_name, do_overwrite, self._get_render_cache_file_path())
+    with _save_executor_lock:
+      _pending_saves[:] = [ f for f in _pending_saves if not f.done() ]
+      _pending_saves.append(future)
+    return future
+
+
+  def _check_save_file_name(self, file_name, do_overwrite):
     if(file_name is None):
       if(self.image_file_name is None):
         raise Exception("Save: no file name given!")
@@ -283,9 +1323,789 @@ class SvgImage:
 
     if((not do_overwrite) and os.path.exists(file_name)):
       raise Exception(f'File {file_name} already exists (set do_overwrite to True to allow overwrite).')
-    
-    self.svgwrite_object.saveas(file_name)
 
+    return file_name
+
+
+  def fork(self):
+    """Create a copy of the image which can then be modified independently from the original image.
+
+    The drawings and options of the image are shared with the copy instead of being duplicated, so forking takes the same time whatever the size of the image.
+    The serialized forms of the shared elements are also shared: those already saved by one image are not serialized again when saving the other.
+
+    Example::
+
+      base_image = mathsvg.SvgImage(pixel_density = 100, view_window = (( -1, -1 ), ( 1, 1 )))
+      base_image.draw_function_graph(math.sin, -1, 1, 10000)
+      for i in range(3):
+        image = base_image.fork()
+        image.put_text(str(i), (0.5, 0.5))
+        image.save(f'fork-{i}.svg')
+    """
+
+    if(len(self._open_groups) > 0):
+      raise Exception("Cannot fork an image while a group transform is pushed or a component is being defined")
+    forked_image = copy.copy(self)
+    forked_image.svgwrite_object = self._make_svgwrite_snapshot()
+    forked_image._serialization_lock = threading.Lock()
+    forked_image._memory_usage = { name : usage[:] for name, usage in self._memory_usage.items() }
+    if(self._bounding_box is not None):
+      forked_image._bounding_box = self._bounding_box[:]
+    forked_image._transform_stack = self._transform_stack[:]
+    forked_image._components = dict(self._components)
+    forked_image._open_groups = []
+    if(self._backend is not None):
+      forked_image._backend = self._backend.copy()
+    if(self._call_recorder is not None):
+      forked_image._call_recorder = self._call_recorder.copy()
+    if(self._instrumentation is not None):
+      # the counters of the fork start from zero
+      self._instrumentation.uninstall(forked_image)
+      forked_image._instrumentation = None
+      forked_image.enable_stats(self._instrumentation.callback)
+    return forked_image
+
+
+  def enable_stats(self, callback = None):
+    """Starts counting and timing what the image does (calls, elements, points, bytes and time spent in each internal stage), see ``stats``.
+
+    There is no cost when the statistics are disabled (the default). When enabled, the timing itself adds some overhead to each call.
+    Calling this function again resets the statistics.
+
+    Args:
+      * ``callback`` (optional): function called with the name of the method and the time it took (in seconds) after each call to a drawing or saving method (nested calls excluded)
+
+    Example::
+
+      image = mathsvg.SvgImage(pixel_density = 100, view_window = (( -1, -1 ), ( 1, 1 )))
+      image.enable_stats()
+      image.draw_function_graph(math.sin, -1, 1, 1000, curve_type = "autosmooth")
+      print(image.stats()["stages"])
+    """
+    self.disable_stats()
+    self._instrumentation = _Instrumentation(self, callback)
+
+
+  def disable_stats(self):
+    """Stops collecting statistics (and forget those collected so far)."""
+    if(self._instrumentation is not None):
+      self._instrumentation.uninstall(self)
+      self._instrumentation = None
+
+
+  def stats(self):
+    """Returns the statistics collected since ``enable_stats`` was called, as a ``dict`` with the following entries:
+      * ``"methods"``: for each public method called, a ``dict`` with the number of ``"calls"`` and the total ``"time"`` (in seconds, nested calls are included in the time of the calling method)
+      * ``"stages"``: same for each internal stage: ``"user_callbacks"`` (functions given to ``draw_function_graph``, ``draw_parametric_graph``, ``draw_cobweb``, ``draw_orbit_diagram``, ``draw_streamlines``, ``draw_implicit_curve`` and ``draw_mapped_grid``), ``"projection"``, ``"autosmooth"`` (control vectors of smooth curves), ``"path_string"``, ``"style_string"``, ``"serialization"`` (conversion of the elements into XML) and ``"file_writing"`` (includes the serialization)
+      * ``"elements"``: number of SVG elements created for each type (tag)
+      * ``"points"``: number of points projected onto the canvas
+      * ``"bytes"``: number of bytes of SVG produced
+
+    Raises an exception if the statistics are not enabled.
+    """
+    if(self._instrumentation is None):
+      raise Exception("Statistics are not enabled (call enable_stats first)")
+    return self._instrumentation.get_stats()
+
+
+  def _make_svgwrite_snapshot(self):
+    # elements are never modified once added, copying the containers is enough
+    snapshot = copy.copy(self.svgwrite_object)
+    snapshot.attribs = dict(self.svgwrite_object.attribs)
+    snapshot.elements = _SharedList(self.svgwrite_object.elements)
+    snapshot._stylesheets = self.svgwrite_object._stylesheets[:]
+    self._fit_drawing(snapshot)
+    return snapshot
+
+
+  def _save_snapshot(self, snapshot, file_name, do_overwrite, cached_file_path):
+    file_name = self._check_save_file_name(file_name, do_overwrite)
+    self._save_drawing(snapshot, file_name, cached_file_path)
+    return file_name
+
+
+  def _get_render_cache_file_path(self):
+    if(self._call_recorder is None):
+      return None
+    return self._call_recorder.get_cached_file_path()
+
+
+  def _save_drawing(self, drawing, file_name, cached_file_path):
+    if(self._backend is not None):
+      return
+    if(cached_file_path is None):
+      self._write_svg_file(drawing, file_name)
+      return
+    import shutil
+    if(os.path.exists(cached_file_path)):
+      shutil.copyfile(cached_file_path, file_name)
+      with self._serialization_lock:
+        self._last_save = None
+      return
+    self._write_svg_file(drawing, file_name)
+    os.makedirs(os.path.dirname(cached_file_path), exist_ok = True)
+    # the file appears in the cache only once complete
+    temporary_file_path = f'{cached_file_path}.{os.getpid()}-{threading.get_ident()}.tmp'
+    shutil.copyfile(file_name, temporary_file_path)
+    os.replace(temporary_file_path, cached_file_path)
+
+
+  def to_string(self):
+    """Returns the content of the SVG file as a string, without saving any file."""
+    self._fit_drawing(self.svgwrite_object)
+    return ''.join(self._iter_svg_document_pieces(self.svgwrite_object))
+
+
+  def to_bytes(self, encoding = 'utf-8'):
+    """Returns the content of the SVG file as bytes, without saving any file.
+
+    Args:
+      * ``encoding`` (default: ``'utf-8'``): encoding of the XML document (characters that cannot be encoded are replaced by XML character references)
+    """
+    return b''.join(self.iter_chunks(encoding = encoding))
+
+
+  def write(self, file_object, encoding = 'utf-8', chunk_size = 65536):
+    """Writes the content of the SVG file into an already opened file or stream.
+
+    Args:
+      * ``file_object``: binary stream (for example a file opened in ``'wb'`` mode or an ``io.BytesIO``). Text streams are also accepted, in which case ``encoding`` is only used for the XML declaration.
+      * ``encoding`` (default: ``'utf-8'``): encoding of the XML document
+      * ``chunk_size`` (default: ``65536``): approximate number of bytes written at once
+
+    Contrary to ``save``, there is no checking whether a file is being overwritten.
+    """
+    if(isinstance(file_object, io.TextIOBase)):
+      self._fit_drawing(self.svgwrite_object)
+      for piece in self._iter_svg_document_pieces(self.svgwrite_object, encoding = encoding):
+        file_object.write(piece)
+    else:
+      for chunk in self.iter_chunks(chunk_size, encoding = encoding):
+        file_object.write(chunk)
+
+
+  def iter_chunks(self, chunk_size = 65536, encoding = 'utf-8'):
+    """Returns an iterator over the content of the SVG file cut into pieces of bytes.
+
+    All the chunks have exactly ``chunk_size`` bytes except the last one. The content is the one of the image at the time of the call, later drawings are ignored.
+    Only a few chunks are kept in memory at once, making it suitable for streaming large images (for example as an HTTP response).
+
+    Args:
+      * ``chunk_size`` (default: ``65536``): number of bytes in each chunk
+      * ``encoding`` (default: ``'utf-8'``): encoding of the XML document
+
+    Example::
+
+      image = mathsvg.SvgImage(pixel_density = 100, view_window = (( -1, -1 ), ( 1, 1 )))
+      image.draw_circle([0, 0], 0.5)
+      with open("iter-chunks-example.svg", "wb") as svg_file:
+        for chunk in image.iter_chunks(1024):
+          svg_file.write(chunk)
+    """
+    pieces = self._iter_svg_document_pieces(self._make_svgwrite_snapshot(), encoding = encoding)
+    return self._iter_encoded_chunks(pieces, chunk_size, encoding)
+
+
+  def _iter_encoded_chunks(self, pieces, chunk_size, encoding):
+    buffer = bytearray()
+    for piece in pieces:
+      buffer += piece.encode(encoding, 'xmlcharrefreplace')
+      while(len(buffer) >= chunk_size):
+        yield bytes(buffer[ : chunk_size ])
+        del buffer[ : chunk_size ]
+    if(len(buffer) > 0):
+      yield bytes(buffer)
+
+
+  def _iter_svg_document_pieces(self, drawing, encoding = 'utf-8'):
+    yield self._make_svg_document_head(drawing, encoding)
+    yield from self._iter_serialized_elements(drawing.elements, self._serialize_svgwrite_element(drawing.defs))
+    yield self._make_svg_document_tail()
+
+
+  def _make_svg_document_head(self, drawing, encoding = 'utf-8'):
+    # same output as svgwrite.Drawing.write up to the opening svg tag included
+    head = f'<?xml version="1.0" encoding="{encoding}" ?>\n'
+    for stylesheet in drawing._stylesheets:
+      head += '<?xml-stylesheet href="%s" type="text/css" title="%s" alternate="%s" media="%s"?>\n' % stylesheet
+    import xml.etree.ElementTree as etree
+    root = copy.copy(drawing)
+    root.elements = []
+    root_tag = etree.tostring(root.get_xml(), encoding = 'unicode', short_empty_elements = False)
+    return head + root_tag[ : - len(self._make_svg_document_tail()) ]
+
+
+  def _add_svgwrite_element(self, element):
+    if(self._bounding_box is not None):
+      self._bounding_box_margin = max(self._bounding_box_margin, 0.5 * self.stroke_width)
+    if(len(self._open_groups) > 0):
+      # the group is added to the image once complete (see pop_transform)
+      self._open_groups[-1].add(element)
+      return
+    if(self._backend is not None):
+      self._backend.add_element(element)
+      return
+    self.svgwrite_object.add(element)
+    usage = self._memory_usage.get(element.elementname)
+    if(usage is None):
+      usage = self._memory_usage[element.elementname] = [ 0, 0 ]
+    usage[0] += 1
+    usage[1] += _estimate_svgwrite_element_size(element)
+    if((self.memory_limit is not None) and (sum(usage[1] for usage in self._memory_usage.values()) > self.memory_limit)):
+      self._spill_elements()
+
+
+  def _spill_elements(self):
+    # replace each run of elements by a _SpilledElements (the list is replaced, not modified, because of the snapshots sharing it)
+    with self._serialization_lock:
+      if(self._spill_file is None):
+        self._spill_file = _SpillFile()
+      drawing = self.svgwrite_object
+      elements = []
+      run = []
+      for element in itertools.chain(drawing.elements, [ None ]):
+        if((element is not None) and (element is not drawing.defs) and not isinstance(element, _SpilledElements)):
+          run.append(element)
+          continue
+        if(len(run) > 0):
+          pieces = ( element.__dict__.get('_mathsvg_serialized') or self._serialize_svgwrite_element(element) for element in run )
+          offset, length = self._spill_file.append(pieces)
+          elements.append(_SpilledElements(self._spill_file, offset, length, len(run)))
+          self._nb_spilled_elements += len(run)
+          run = []
+        if(element is not None):
+          elements.append(element)
+      drawing.elements = elements
+      self._memory_usage = {}
+      # the file cant be completed in place anymore since the elements have been renumbered
+      self._last_save = None
+
+
+  def output_counts(self):
+    """Returns what would have been written into the SVG document, as a ``dict`` with the following entries (only available with the ``"count"`` backend):
+      * ``"elements"``: number of SVG elements for each type (tag)
+      * ``"vertices"``: number of points projected onto the canvas
+      * ``"bytes"``: estimated size of the SVG document
+
+    Example::
+
+      image = mathsvg.SvgImage(pixel_density = 100, view_window = (( -1, -1 ), ( 1, 1 )), backend = "count")
+      image.draw_function_graph(math.sin, -1, 1, 10000)
+      print(image.output_counts())
+    """
+    if(not isinstance(self._backend, _CountingBackend)):
+      raise Exception('Output counts are only available with the "count" backend')
+    self._fit_drawing(self.svgwrite_object)
+    document_size = len(self._make_svg_document_head(self.svgwrite_object)) + len(self._make_svg_document_tail()) + len(self._serialize_svgwrite_element(self.svgwrite_object.defs))
+    return { "elements" : dict(self._backend.elements),
+             "vertices" : self._nb_projected_points,
+             "bytes" : document_size + self._backend.nb_bytes }
+
+
+  def memory_usage(self):
+    """Returns an estimate of the memory used by the elements drawn, as a ``dict`` with the following entries:
+      * ``"elements"``: for each type (tag) of SVG element in memory, a ``dict`` with the number of elements (``"count"``) and the estimated number of ``"bytes"`` they use
+      * ``"bytes"``: the total estimated number of bytes used by the elements in memory
+      * ``"spilled_elements"``: the number of elements moved to disk because of the memory limit
+      * ``"spilled_bytes"``: the size of their serialized form on disk (the temporary file may be shared with forked images)
+
+    The estimate does not include the serialized form of the elements, which is kept in memory once the image has been saved.
+
+    Example::
+
+      image = mathsvg.SvgImage(pixel_density = 100, view_window = (( -1, -1 ), ( 1, 1 )), memory_limit = 10 ** 8)
+      for k in range(10000):
+        image.draw_circle([0, 0], k / 10000)
+      print(image.memory_usage()["bytes"])
+    """
+    elements = { name : { "count" : usage[0], "bytes" : usage[1] } for name, usage in self._memory_usage.items() }
+    return { "elements" : elements,
+             "bytes" : sum(usage["bytes"] for usage in elements.values()),
+             "spilled_elements" : self._nb_spilled_elements,
+             "spilled_bytes" : 0 if(self._spill_file is None) else self._spill_file.size }
+
+
+  def _make_svg_document_tail(self):
+    return '</svg>'
+
+
+  def _serialize_svgwrite_element(self, element):
+    import xml.etree.ElementTree as etree
+    return etree.tostring(element.get_xml(), encoding = 'unicode')
+
+
+  def _iter_serialized_elements(self, elements, defs_piece):
+    # the serialized form of an element is kept in the element itself (elements are shared between forked images)
+    # the defs container is the only element that can still change after being added, it is never cached
+    defs = self.svgwrite_object.defs
+    for element in elements:
+      if(element is defs):
+        yield defs_piece
+        continue
+      if(isinstance(element, _SpilledElements)):
+        yield from element.iter_pieces()
+        continue
+      serialized = element.__dict__.get('_mathsvg_serialized')
+      if(serialized is None):
+        serialized = self._serialize_svgwrite_element(element)
+        element._mathsvg_serialized = serialized
+      yield serialized
+
+
+  def _write_svg_file(self, drawing, file_name):
+    with self._serialization_lock:
+      head = self._make_svg_document_head(drawing)
+      defs_piece = self._serialize_svgwrite_element(drawing.defs)
+      elements = drawing.elements
+      nb_elements = len(elements)
+      tail = self._make_svg_document_tail()
+      file_path = os.path.abspath(file_name)
+
+      nb_saved_elements = self._find_nb_elements_saved_in_file(file_path, head, defs_piece, elements)
+      if(nb_saved_elements is None):
+        pieces = itertools.chain([ head ], self._iter_serialized_elements(elements, defs_piece), [ tail ])
+        file_mode = 'wb'
+      else:
+        # only rewrite the closing tag
+        pieces = itertools.chain(self._iter_serialized_elements(elements[ nb_saved_elements : ], defs_piece), [ tail ])
+        file_mode = 'r+b'
+      with open(file_path, file_mode) as svg_file:
+        if(nb_saved_elements is not None):
+          svg_file.seek(- len(tail.encode('utf-8')), os.SEEK_END)
+        for chunk in self._iter_encoded_chunks(pieces, 65536, 'utf-8'):
+          svg_file.write(chunk)
+        svg_file.truncate()
+
+      file_stat = os.stat(file_path)
+      self._last_save = (file_path, head, defs_piece, nb_elements, elements[nb_elements - 1], file_stat.st_size, file_stat.st_mtime_ns)
+
+
+  def _find_nb_elements_saved_in_file(self, file_path, head, defs_piece, elements):
+    # returns None if the file cant be completed in place
+    if(self._last_save is None):
+      return None
+    last_file_path, last_head, last_defs_piece, nb_saved_elements, last_saved_element, file_size, file_mtime = self._last_save
+    if((last_file_path != file_path) or (last_head != head) or (last_defs_piece != defs_piece) or (nb_saved_elements > len(elements))):
+      return None
+    # the elements may have been moved to disk since (see _spill_elements)
+    if(elements[nb_saved_elements - 1] is not last_saved_element):
+      return None
+    try:
+      file_stat = os.stat(file_path)
+    except(OSError):
+      return None
+    if((file_stat.st_size != file_size) or (file_stat.st_mtime_ns != file_mtime)):
+      return None
+    return nb_saved_elements
+
+
+
+  def _compute_canvas_point(self, point):
+    # projection of a point, without counting it
+    if(self._canvas_transform is None):
+      return self._flip_point(self._rescale_vector(self._shift_point(point)))
+    (a, b, e), (c, d, f) = self._canvas_transform
+    return [ a * point[0] + b * point[1] + e, c * point[0] + d * point[1] + f ]
+
+  def _get_canvas_matrix(self):
+    # matrix of project_point_to_canvas
+    if(self._canvas_transform is not None):
+      return self._canvas_transform
+    return ((self.rescaling, 0., self.rescaling * self.shift[0]), (0., - self.rescaling, self.view_box[1] - self.rescaling * self.shift[1]))
+
+  def _compute_visible_domain(self):
+    # smallest rectangle ((x_min, y_min), (x_max, y_max)) containing the points drawn inside the view window through the current transforms (and groups), None with auto_fit
+    if(self._auto_fit):
+      return None
+    if(len(self._transform_stack) == 0):
+      return self.view_window
+    matrix = self._get_canvas_matrix()
+    for saved_transforms, group, bounding_box, group_matrix in reversed(self._transform_stack):
+      if(group_matrix is not None):
+        matrix = _compose_affine_matrices(group_matrix, matrix)
+    (a, b, e), (c, d, f) = _invert_affine_matrix(matrix)
+    canvas_corners = [ (self.rescaling * (x + self.shift[0]), self.view_box[1] - self.rescaling * (y + self.shift[1])) for x in (self.view_window[0][0], self.view_window[1][0]) for y in (self.view_window[0][1], self.view_window[1][1]) ]
+    corners = [ (a * x + b * y + e, c * x + d * y + f) for x, y in canvas_corners ]
+    return ((min(x for x, y in corners), min(y for x, y in corners)), (max(x for x, y in corners), max(y for x, y in corners)))
+
+  def _transform_direction(self, vector, inverse = False):
+    # image of a vector by the linear part of the current transform (works on numpy arrays)
+    matrix = self._math_transform if(not inverse) else _invert_affine_matrix(self._math_transform)
+    (a, b, e), (c, d, f) = matrix
+    return [ a * vector[0] + b * vector[1], c * vector[0] + d * vector[1] ]
+
+  def _transform_angle(self, angle, inverse = False):
+    # angle of the image of the direction given by angle
+    if(self._math_transform is None):
+      return angle
+    direction = self._transform_direction([ math.cos(angle), math.sin(angle) ], inverse = inverse)
+    return math.atan2(direction[1], direction[0])
+
+  @_recorded_call()
+  def push_transform(self, matrix, as_group = False):
+    """Applies an affine transform to all the drawings until the matching call to ``pop_transform``, the transforms pushed successively are composed.
+
+    By default the transform is applied to the points when they are projected onto the canvas: it is combined with the projection into a single matrix, so that the projection of each point costs the same with or without transform.
+    The points, lines, curves and graphs are transformed exactly. The radiuses of the circles and ellipses are multiplied by the square root of the determinant and their axes are rotated, which is exact for rotations, reflections, translations and uniform scalings (the arcs drawn through a reflection go in the opposite direction).
+    The sizes of the points, arrow tips and texts, the widths of the strokes and the dashes are not transformed.
+
+    With ``as_group = True`` the drawings are put into a SVG group with a ``transform`` attribute instead, their coordinates are not transformed at all and everything (including the widths of the strokes) is transformed by the SVG renderer.
+    The group is added to the image by ``pop_transform``: the drawings made after ``push_transform`` are not saved before that.
+
+    Args:
+      * ``matrix``: 2x3 or 3x3 matrix (list of rows or ``numpy`` array) of the affine transform ``(x, y) -> (a x + b y + e, c x + d y + f)`` given as ``[ [ a, b, e ], [ c, d, f ] ]``, see ``mathsvg.make_affine_transform``
+      * ``as_group`` (``bool``): whether to use a SVG group
+
+    Example::
+
+      image = mathsvg.SvgImage(pixel_density = 100, view_window = (( -2, -2 ), ( 2, 2 )))
+      for k in range(6):
+        image.push_transform(mathsvg.make_affine_transform(rotation = k * math.pi / 3, scaling = 0.5 + 0.1 * k))
+        image.draw_polygon([ [ 1, 0 ], [ 2, 0 ], [ 1.5, 0.5 ] ])
+        image.pop_transform()
+      image.save("push-transform-example.svg")
+    """
+    matrix = _make_affine_matrix(matrix)
+    saved_transforms = (self._math_transform, self._canvas_transform, self._transform_scaling, self._is_transform_reflecting)
+    if(as_group):
+      # same transform expressed on the canvas
+      canvas_matrix = self._get_canvas_matrix()
+      group_matrix = _compose_affine_matrices(_compose_affine_matrices(canvas_matrix, matrix), _invert_affine_matrix(canvas_matrix))
+      group = self.svgwrite_object.g(transform = self._make_svg_matrix_string(group_matrix))
+      self._transform_stack.append((saved_transforms, group, self._bounding_box, group_matrix))
+      self._open_groups.append(group)
+      if(self._bounding_box is not None):
+        self._bounding_box = [ math.inf, math.inf, - math.inf, - math.inf ]
+    else:
+      self._transform_stack.append((saved_transforms, None, None, None))
+      # composed with the current transforms (not computed again from the whole stack)
+      self._canvas_transform = _compose_affine_matrices(self._get_canvas_matrix(), matrix)
+      self._math_transform = matrix if(self._math_transform is None) else _compose_affine_matrices(self._math_transform, matrix)
+      (a, b, e), (c, d, f) = matrix
+      self._transform_scaling *= math.sqrt(abs(a * d - b * c))
+      self._is_transform_reflecting = self._is_transform_reflecting != (a * d - b * c < 0)
+
+  @_recorded_call()
+  def pop_transform(self):
+    """Removes the last transform pushed with ``push_transform``."""
+    if(len(self._transform_stack) == 0):
+      raise Exception("pop_transform: no transform to remove")
+    saved_transforms, group, bounding_box, group_matrix = self._transform_stack.pop()
+    self._math_transform, self._canvas_transform, self._transform_scaling, self._is_transform_reflecting = saved_transforms
+    if(group is None):
+      return
+    self._open_groups.pop()
+    if(bounding_box is not None):
+      group_bounding_box = self._bounding_box
+      self._bounding_box = bounding_box
+      self._extend_bounding_box_with_box(group_bounding_box, group_matrix)
+    self._add_svgwrite_element(group)
+
+  @contextlib.contextmanager
+  def transform(self, matrix, as_group = False):
+    """Context manager calling ``push_transform`` and then ``pop_transform`` at the end of the ``with`` block.
+
+    Example::
+
+      image = mathsvg.SvgImage(pixel_density = 100, view_window = (( -2, -2 ), ( 2, 2 )))
+      with image.transform(mathsvg.make_affine_transform(translation = (1, 1), scaling = 0.5), as_group = True):
+        image.draw_circle([ 0, 0 ], 1)
+      image.save("transform-example.svg")
+    """
+    self.push_transform(matrix, as_group = as_group)
+    try:
+      yield self
+    finally:
+      self.pop_transform()
+
+  def _make_svg_matrix_string(self, matrix):
+    # the order of the coefficients in SVG is: first column, second column, translation
+    (a, b, e), (c, d, f) = matrix
+    return f'matrix({a},{c},{b},{d},{e},{f})'
+
+  @_recorded_call()
+  def _begin_component(self, name):
+    if((name in self._components) or any(name == component[0] for component in self._component_stack)):
+      raise Exception(f'Component "{name}" is already defined')
+    symbol = self.svgwrite_object.symbol(id = name, overflow = "visible")
+    self._component_stack.append((name, symbol, self._get_canvas_matrix(), self._bounding_box))
+    self._open_groups.append(symbol)
+    # the bounding box of a component is always kept (see draw_ifs)
+    self._bounding_box = [ math.inf, math.inf, - math.inf, - math.inf ]
+
+  @_recorded_call()
+  def _end_component(self):
+    name, symbol, canvas_matrix, bounding_box = self._component_stack.pop()
+    if(self._open_groups[-1] is not symbol):
+      raise Exception(f'Component "{name}": a group transform pushed in the definition has not been popped')
+    self._open_groups.pop()
+    component_bounding_box = self._bounding_box
+    self._bounding_box = bounding_box
+    self._components[name] = (symbol, canvas_matrix, component_bounding_box)
+    # in new defs at the current position: the elements already serialized (and saved) stay valid
+    defs = svgwrite.container.Defs()
+    defs.add(symbol)
+    self._add_svgwrite_element(defs)
+
+  @contextlib.contextmanager
+  def define_component(self, name):
+    """Context manager recording the drawings made in the ``with`` block into a component, that is not displayed but can be placed any number of times with ``place_component`` and ``place_components``.
+
+    The drawings are stored once, in a SVG ``<symbol>``, and each placement is a ``<use>`` element referring to it: the size of the document and the time to draw depend on the number of copies, not on the size of the component.
+    The component is drawn around the origin ``(0, 0)`` in math coordinates, the placement moves this origin to the given position. The styles are those at the time of the definition.
+
+    Args:
+      * ``name`` (``str``): name of the component, also used as its identifier in the SVG document (should be unique in the document)
+
+    Example::
+
+      image = mathsvg.SvgImage(pixel_density = 100, view_window = (( -4, -4 ), ( 4, 4 )))
+      with image.define_component("flower"):
+        for k in range(6):
+          image.draw_circle([ 0.2 * math.cos(k * math.pi / 3), 0.2 * math.sin(k * math.pi / 3) ], 0.1)
+      for k in range(20):
+        image.place_component("flower", [ -3.5 + 0.35 * k, math.sin(k) ], scale = 1 + 0.05 * k, rotation = 0.1 * k)
+      image.save("define-component-example.svg")
+    """
+    self._begin_component(name)
+    try:
+      yield self
+    finally:
+      self._end_component()
+
+  def _get_component(self, name):
+    component = self._components.get(name)
+    if(component is None):
+      raise Exception(f'Unknown component "{name}" (see define_component)')
+    return component
+
+  @_recorded_call()
+  def place_component(self, name, position, scale = 1., rotation = 0.):
+    """Draws a copy of a component defined with ``define_component``.
+
+    Args:
+      * ``name`` (``str``): name of the component
+      * ``position`` (``tuple``): where the origin of the component is moved
+      * ``scale`` (``float``): scaling factor
+      * ``rotation`` (``float``): rotation angle in radians (counterclockwise)
+
+    The current transform (see ``push_transform``) also applies to the copy. Examples: see ``define_component``.
+    """
+    self._place_component_with_matrix(name, _make_affine_matrix(make_affine_transform(translation = position, rotation = rotation, scaling = scale)))
+
+  def _get_use_matrix(self, name, matrix):
+    # on the canvas: back to math coordinates as when the component was defined, transform, then project
+    symbol, definition_matrix, component_bounding_box = self._get_component(name)
+    return _compose_affine_matrices(_compose_affine_matrices(self._get_canvas_matrix(), matrix), _invert_affine_matrix(definition_matrix))
+
+  def _place_component_with_matrix(self, name, matrix):
+    use_matrix = self._get_use_matrix(name, matrix)
+    self._add_svgwrite_element(self.svgwrite_object.use('#' + name, transform = self._make_svg_matrix_string(use_matrix)))
+    self._extend_bounding_box_with_box(self._components[name][2], use_matrix)
+
+  @_recorded_call()
+  def place_components(self, name, positions, scales = 1., rotations = 0.):
+    """Draws many copies of a component at once (same as calling ``place_component`` for each of them), the computations are done with numpy (which has to be installed).
+
+    Args:
+      * ``name`` (``str``): name of the component
+      * ``positions`` (``list`` or ``numpy.ndarray``): where the origin of the component is moved for each copy, of shape ``(n, 2)``
+      * ``scales`` (``float``, ``list`` or ``numpy.ndarray``): scaling factor of each copy (or one value for all of them)
+      * ``rotations`` (``float``, ``list`` or ``numpy.ndarray``): rotation angle of each copy in radians (or one value for all of them)
+
+    Example::
+
+      image = mathsvg.SvgImage(pixel_density = 100, view_window = (( -4, -4 ), ( 4, 4 )))
+      with image.define_component("square"):
+        image.draw_polygon([ [ -0.1, -0.1 ], [ 0.1, -0.1 ], [ 0.1, 0.1 ], [ -0.1, 0.1 ] ])
+      angles = [ 0.1 * k for k in range(60) ]
+      image.place_components("square", [ [ 0.05 * k * math.cos(k), 0.05 * k * math.sin(k) ] for k in range(60) ], rotations = angles)
+      image.save("place-components-example.svg")
+    """
+    numpy = _import_numpy()
+    self._get_component(name)
+    positions = numpy.asarray(positions, dtype = float).reshape(-1, 2)
+    nb_copies = len(positions)
+    if(nb_copies == 0):
+      return
+    scales = numpy.broadcast_to(numpy.asarray(scales, dtype = float), (nb_copies,))
+    rotations = numpy.broadcast_to(numpy.asarray(rotations, dtype = float), (nb_copies,))
+    cos_rotations = scales * numpy.cos(rotations)
+    sin_rotations = scales * numpy.sin(rotations)
+    linear_parts = numpy.stack([ numpy.stack([ cos_rotations, - sin_rotations ], axis = -1), numpy.stack([ sin_rotations, cos_rotations ], axis = -1) ], axis = 1)
+    self._place_component_with_matrices(numpy, name, linear_parts, positions)
+
+  def _compute_use_matrices(self, numpy, name, linear_parts, translations):
+    # same composition as in _get_use_matrix for arrays of matrices (linear parts of shape (n, 2, 2) and translations of shape (n, 2))
+    symbol, definition_matrix, component_bounding_box = self._get_component(name)
+    canvas_matrix = numpy.array(self._get_canvas_matrix())
+    inverse_definition_matrix = numpy.array(_invert_affine_matrix(definition_matrix))
+    use_linear_parts = canvas_matrix[:, : 2] @ linear_parts @ inverse_definition_matrix[:, : 2]
+    use_translations = ((linear_parts @ inverse_definition_matrix[:, 2]) + translations) @ canvas_matrix[:, : 2].T + canvas_matrix[:, 2]
+    return use_linear_parts, use_translations
+
+  def _place_component_with_matrices(self, numpy, name, linear_parts, translations):
+    use_linear_parts, use_translations = self._compute_use_matrices(numpy, name, linear_parts, translations)
+    href = '#' + name
+    for (a, b), (c, d), (e, f) in zip(use_linear_parts[:, 0].tolist(), use_linear_parts[:, 1].tolist(), use_translations.tolist()):
+      self._add_svgwrite_element(self.svgwrite_object.use(href, transform = f'matrix({a},{c},{b},{d},{e},{f})'))
+    x_min, y_min, x_max, y_max = self._components[name][2]
+    if((self._bounding_box is not None) and (x_min <= x_max)):
+      corners = numpy.array([ [ x_min, y_min ], [ x_min, y_max ], [ x_max, y_min ], [ x_max, y_max ] ])
+      self._extend_bounding_box(corners @ use_linear_parts.transpose(0, 2, 1) + use_translations[:, None, :])
+
+  def _get_component_size(self, name):
+    # size of the component on the canvas when it was defined (in pixels), 0 if empty
+    x_min, y_min, x_max, y_max = self._components[name][2]
+    return max(x_max - x_min, y_max - y_min, 0.)
+
+  @_recorded_call()
+  def draw_ifs(self, motif, maps, depth, nested = True, min_size = 1.):
+    """Draws the self-similar figure obtained by applying the maps of an iterated function system (IFS) ``depth`` times to a motif.
+
+    The figure at depth ``0`` is the motif, the figure at depth ``n + 1`` is the union of the images of the figure at depth ``n`` by each of the maps.
+    The motif is a component (see ``define_component``), its copies are ``<use>`` elements.
+
+    There are two ways of building the figure:
+      * ``nested = True``: one component is defined for each depth, made of one copy of the previous one for each map. The size of the output grows linearly with the depth.
+      * ``nested = False``: the transform of each copy of the motif is computed (with numpy, which has to be installed) and the copies are placed directly. The size of the output grows exponentially with the depth, but each branch stops as soon as it is small enough (see ``min_size``).
+
+    Args:
+      * ``motif`` (``str``): name of the component used as motif
+      * ``maps`` (``list``): affine transforms in math coordinates, given as 2x3 or 3x3 matrices (see ``push_transform`` and ``make_affine_transform``)
+      * ``depth`` (``int``): maximal number of times the maps are applied
+      * ``nested`` (``boolean``): how the figure is built (see above)
+      * ``min_size`` (``float``): copies of the motif smaller than this size (in pixels) are not replaced by smaller copies, with ``nested = True`` the same depth is used for all the copies: the depth is lowered until no copy is smaller than ``min_size``
+
+    Example::
+
+      image = mathsvg.SvgImage(pixel_density = 400, view_window = (( -1, -0.75 ), ( 1, 1.25 )))
+      with image.define_component("triangle"):
+        image.draw_polygon([ [ 0, 1 ], [ -0.866, -0.5 ], [ 0.866, -0.5 ] ])
+      maps = [ mathsvg.make_affine_transform(translation = (0.52 * x, 0.52 * y), scaling = 0.48) for x, y in [ (0, 1), (-0.866, -0.5), (0.866, -0.5) ] ]
+      image.draw_ifs("triangle", maps, 8)
+      image.save("draw-ifs-example.svg")
+    """
+    maps = [ _make_affine_matrix(matrix) for matrix in maps ]
+    self._get_component(motif)
+    min_size = max(min_size, 0.)
+    if(nested):
+      self._draw_nested_ifs(motif, maps, depth, min_size)
+    else:
+      self._draw_flat_ifs(_import_numpy(), motif, maps, depth, min_size)
+
+  def _draw_nested_ifs(self, motif, maps, depth, min_size):
+    # size of the copies at depth n: at most motif size * (norm of the use matrix) * ratio^n
+    ratio = max([ _get_affine_matrix_norm(matrix) for matrix in maps ] + [ 0. ])
+    size = self._get_component_size(motif) * _get_affine_matrix_norm(self._get_use_matrix(motif, ((1., 0., 0.), (0., 1., 0.))))
+    level_component = motif
+    for level in range(depth):
+      if(size < min_size):
+        break
+      size *= ratio
+      level_name = f'{motif}-{level + 1}'
+      index = 1
+      while((level_name in self._components) or any(level_name == component[0] for component in self._component_stack)):
+        index += 1
+        level_name = f'{motif}-{level + 1}-{index}'
+      with self.define_component(level_name):
+        for matrix in maps:
+          self._place_component_with_matrix(level_component, matrix)
+      level_component = level_name
+    self._place_component_with_matrix(level_component, ((1., 0., 0.), (0., 1., 0.)))
+
+  def _draw_flat_ifs(self, numpy, motif, maps, depth, min_size):
+    # transforms of the copies as arrays: linear parts of shape (n, 2, 2) and translations of shape (n, 2)
+    map_linear_parts = numpy.array([ [ row[ : 2 ] for row in matrix ] for matrix in maps ]).reshape(-1, 2, 2)
+    map_translations = numpy.array([ [ row[2] for row in matrix ] for matrix in maps ]).reshape(-1, 2)
+    linear_parts = numpy.eye(2)[None, :, :]
+    translations = numpy.zeros((1, 2))
+    motif_size = self._get_component_size(motif)
+    leaves = []
+    for level in range(depth):
+      use_linear_parts = self._compute_use_matrices(numpy, motif, linear_parts, translations)[0]
+      is_small = motif_size * numpy.linalg.norm(use_linear_parts, ord = 2, axis = (1, 2)) < min_size
+      leaves.append((linear_parts[is_small], translations[is_small]))
+      linear_parts = linear_parts[~ is_small]
+      translations = translations[~ is_small]
+      if(len(linear_parts) == 0):
+        break
+      # images by each map of each copy
+      translations = (map_linear_parts[:, None, :, :] @ translations[None, :, :, None])[..., 0] + map_translations[:, None, :]
+      linear_parts = map_linear_parts[:, None, :, :] @ linear_parts[None, :, :, :]
+      linear_parts = linear_parts.reshape(-1, 2, 2)
+      translations = translations.reshape(-1, 2)
+    leaves.append((linear_parts, translations))
+    linear_parts = numpy.concatenate([ leaf[0] for leaf in leaves ])
+    if(len(linear_parts) > 0):
+      self._place_component_with_matrices(numpy, motif, linear_parts, numpy.concatenate([ leaf[1] for leaf in leaves ]))
+
+  def _extend_bounding_box_with_box(self, box, matrix):
+    # extends with the image of a bounding box by an affine transform of the canvas
+    x_min, y_min, x_max, y_max = box
+    if((self._bounding_box is not None) and (x_min <= x_max)):
+      (a, b, e), (c, d, f) = matrix
+      corners = [ [ x, y ] for x in (x_min, x_max) for y in (y_min, y_max) ]
+      self._extend_bounding_box([ [ a * x + b * y + e, c * x + d * y + f ] for x, y in corners ])
+
+  def _extend_bounding_box(self, points, margin = 0.):
+    # points on the canvas (list of points or numpy array), margin: distance around the points that is also drawn
+    box = self._bounding_box
+    if((box is None) or (len(points) == 0)):
+      return
+    if(hasattr(points, 'dtype')):
+      points = points.reshape(-1, 2)
+      x_min, y_min = points.min(axis = 0).tolist()
+      x_max, y_max = points.max(axis = 0).tolist()
+    else:
+      x_values = [ point[0] for point in points ]
+      y_values = [ point[1] for point in points ]
+      x_min, y_min, x_max, y_max = min(x_values), min(y_values), max(x_values), max(y_values)
+    box[0] = min(box[0], x_min - margin)
+    box[1] = min(box[1], y_min - margin)
+    box[2] = max(box[2], x_max + margin)
+    box[3] = max(box[3], y_max + margin)
+
+  def _extend_bounding_box_with_disk(self, center, radius):
+    # disk containing an ellipse or an arc, in math units
+    if(self._bounding_box is not None):
+      self._extend_bounding_box([ self._compute_canvas_point(center) ], self._rescale_length(self._transform_scaling * radius))
+
+  def _compute_fitted_view_box(self):
+    # returns the view box [ x_min, y_min, width, height ] on the canvas, None if nothing has been drawn
+    x_min, y_min, x_max, y_max = self._bounding_box
+    if(x_min > x_max):
+      return None
+    margin = self._bounding_box_margin + self._rescale_length(self.fit_padding)
+    return [ x_min - margin, y_min - margin, x_max - x_min + 2 * margin, y_max - y_min + 2 * margin ]
+
+  def _fit_drawing(self, drawing):
+    # the drawings keep their coordinates, only the view box moves
+    if(self._bounding_box is None):
+      return
+    view_box = self._compute_fitted_view_box()
+    if(view_box is not None):
+      drawing.viewbox(*view_box)
+
+  def fitted_view_window(self):
+    """Returns the view window of the image in the same form as the argument ``view_window`` of the constructor.
+
+    With ``auto_fit``, this is the smallest window containing all the drawings (plus ``fit_padding``), that is used when saving. Otherwise this is ``view_window``.
+
+    Example::
+
+      image = mathsvg.SvgImage(pixel_density = 100, auto_fit = True, fit_padding = 0.1)
+      image.draw_circle([ 3, 2 ], 0.5)
+      print(image.fitted_view_window())
+      image.save("auto-fit-example.svg")
+    """
+    view_box = None if(self._bounding_box is None) else self._compute_fitted_view_box()
+    if(view_box is None):
+      return self.view_window
+    x_min, y_min, width, height = view_box
+    # inverse of project_point_to_canvas
+    return ((x_min / self.rescaling - self.shift[0], (self.view_box[1] - y_min - height) / self.rescaling - self.shift[1]),
+            ((x_min + width) / self.rescaling - self.shift[0], (self.view_box[1] - y_min) / self.rescaling - self.shift[1]))
 
 
   def _flip_point(self, point):
@@ -312,7 +2132,30 @@ class SvgImage:
 
   def project_point_to_canvas(self, point):
     """Compute the coordinate of a point on the SVG canvas."""
-    return self._flip_point( self._rescale_vector(self._shift_point(point)))
+    self._nb_projected_points += 1
+    if(self._canvas_transform is None):
+      canvas_point = self._flip_point( self._rescale_vector(self._shift_point(point)))
+    else:
+      (a, b, e), (c, d, f) = self._canvas_transform
+      canvas_point = [ a * point[0] + b * point[1] + e, c * point[0] + d * point[1] + f ]
+    if(self._bounding_box is not None):
+      self._extend_bounding_box([ canvas_point ])
+    return canvas_point
+
+  def _project_points_to_canvas(self, points):
+    # same computation as project_point_to_canvas, done for all the points at once
+    self._nb_projected_points += len(points)
+    if(self._canvas_transform is None):
+      rescaling = self.rescaling
+      shift_x, shift_y = self.shift
+      height = self.view_box[1]
+      canvas_points = [ [ rescaling * (point[0] + shift_x), height - rescaling * (point[1] + shift_y) ] for point in points ]
+    else:
+      (a, b, e), (c, d, f) = self._canvas_transform
+      canvas_points = [ [ a * point[0] + b * point[1] + e, c * point[0] + d * point[1] + f ] for point in points ]
+    if(self._bounding_box is not None):
+      self._extend_bounding_box(canvas_points)
+    return canvas_points
 
 
   def project_complex_point_to_canvas(self, z):
@@ -321,6 +2164,9 @@ class SvgImage:
 
   def project_vector_to_canvas(self, vector):
     """Compute the coordinates of a vector attached at 0 on the SVG canvas (rescaling without translation)."""
+    if(self._canvas_transform is not None):
+      (a, b, e), (c, d, f) = self._canvas_transform
+      return [ a * vector[0] + b * vector[1], c * vector[0] + d * vector[1] ]
     return self._flip_vector(self._rescale_vector(vector))
 
   def project_complex_vector_to_canvas(self, dz):
@@ -332,45 +2178,46 @@ class SvgImage:
     return f'{point[0]}, {point[1]}'
 
   def _make_svg_path_M_command(self, points):
-    path_command = 'M'
-    for point in points:
-      path_command += ' ' + self._convert_point_to_svg_string(point)
-    return path_command
+    return ' '.join([ 'M' ] + [ self._convert_point_to_svg_string(point) for point in points ])
 
   def _make_svg_path_L_command(self, points):
-    path_command = 'L'
-    for point in points:
-      path_command += ' ' + self._convert_point_to_svg_string(point)
-    return path_command
+    return ' '.join([ 'L' ] + [ self._convert_point_to_svg_string(point) for point in points ])
 
 
   def _make_svg_path_C_command(self, points, control_vectors):
+    # joined at once (adding the pieces one by one to the string is quadratic)
+    pieces = [ 'C' ]
+    for point_index, point in enumerate(points):
+      pieces.append(self._convert_point_to_svg_string(control_vectors[2 * point_index]))
+      pieces.append(self._convert_point_to_svg_string(control_vectors[2 * point_index + 1]))
+      pieces.append(self._convert_point_to_svg_string(point))
+    return ' '.join(pieces)
 
-    nb_points = len(points)
-
-    path_command = 'C'
 
-    control_vector_index = 0
-    for point_index in range(nb_points):
-      path_command += ' ' + self._convert_point_to_svg_string(control_vectors[control_vector_index])
-      control_vector_index += 1
-      path_command += ' ' + self._convert_point_to_svg_string(control_vectors[control_vector_index])
-      control_vector_index += 1
-      path_command += ' ' + self._convert_point_to_svg_string(points[point_index])
+  def _make_svg_path_M_and_C_command(self, points, control_vectors):
+    return self._make_svg_path_M_command(points[ 0 : 1 ]) + ' ' + self._make_svg_path_C_command(points[ 1 : ], control_vectors)
 
-    return path_command
 
+  def _make_svg_path_Z_command(self):
+    return 'Z'
 
-  def _make_svg_path_M_and_C_command(self, points, control_vectors):
 
-    path_command = self._make_svg_path_M_command(points[ 0 : 1 ])
-    path_command += ' ' + self._make_svg_path_C_command(points[ 1 : ], control_vectors)
+  def _make_svg_path_d_string(self, path):
+    return path._make_d_string(self)
 
-    return path_command
 
-
-  def _make_svg_path_Z_command(self):
-    return 'Z'
+  def _make_smooth_path(self, points, control_vectors, is_path_closed = False):
+    # points on the canvas and the control vectors given by _compute_autosmooth_control_vectors (two for each curve)
+    path = PathBuilder(units = 'svg')
+    path.move_to(points[0])
+    end_points = points[ 1 : ] + [ points[0] ] if(is_path_closed) else points[ 1 : ]
+    curve_points = []
+    for point_index, point in enumerate(end_points):
+      curve_points += [ control_vectors[2 * point_index], control_vectors[2 * point_index + 1], point ]
+    path.curve_to(*curve_points)
+    if(is_path_closed):
+      path.close()
+    return path
 
 
   def _make_svg_dasharray_string(self, dash_mode = None):
@@ -410,12 +2257,13 @@ class SvgImage:
       dash_mode = self.dash_mode
     style = ""
     style += "fill : " + str(fill_color) + "; "
-    style += "stroke : " + str(self.stroke_color) + "; "
-    style += "stroke-width : " + str(self.stroke_width) + "; "
+    style += "stroke : " + str(stroke_color) + "; "
+    style += "stroke-width : " + str(stroke_width) + "; "
     style += self._make_svg_dasharray_string(dash_mode)
     return style
 
 
+  @_recorded_call()
   def draw_arrow_tip(self, tip, arrow_direction_angle):
     """Draws the tip of an arrow.
 
@@ -427,7 +2275,20 @@ class SvgImage:
     """
 
     tip_position = self.project_point_to_canvas(tip)
+    self._extend_bounding_box([ tip_position ], self.arrow_width_svgpx)
+
+    path_command = self._make_arrow_tip_d_string(self._compute_arrow_tip_shape())
+    path = self.svgwrite_object.path(d = path_command,
+                                     style = self._make_svg_style_string(fill_color = self.stroke_color, dash_mode = "none"))
+    # be wary of that featured bug that reverse the order of the transformations
+    path.translate(tip_position)
+    path.rotate(math.degrees(math.pi - self._transform_angle(arrow_direction_angle)), center = [ 0, 0 ])  # also: angles are negative
+    #
+    self._add_svgwrite_element(path)
+
 
+  def _compute_arrow_tip_shape(self):
+    # points of the path of an arrow tip on the canvas, with the tip at (0, 0) and pointing to the left
     size = self.arrow_width_svgpx
     opening_angle = self.arrow_opening_angle
     curvature = self.arrow_curvature
@@ -442,17 +2303,36 @@ class SvgImage:
     control_vector_top = [ inner_coordinate, control_height ]
     control_vector_bottom = [ inner_coordinate, - control_height ]
     tip_point = [ 0, 0 ]
-    path_command = self._make_svg_path_M_command([ top_point, tip_point, bottom_point ] )
-    path_command += ' ' + self._make_svg_path_C_command([ middle_point, top_point ],
-                                                  [ bottom_point, control_vector_bottom, control_vector_top, top_point ])
+    # M, then the C command from the bottom back to the top
+    return [ top_point, tip_point, bottom_point, bottom_point, control_vector_bottom, middle_point, control_vector_top, top_point, top_point ]
+
+  def _make_arrow_tip_d_string(self, shape_points):
+    path_command = self._make_svg_path_M_command(shape_points[ : 3 ])
+    path_command += ' ' + self._make_svg_path_C_command(shape_points[5 : : 3], shape_points[3 : 5] + shape_points[6 : 8])
     path_command += ' ' + self._make_svg_path_Z_command()
-    path = self.svgwrite_object.path(d = path_command,
+    return path_command
+
+  def _draw_arrow_tip_batch(self, numpy, tips, arrow_direction_angles):
+    # all the tips in one path element, tips: array of shape (n, 2), arrow_direction_angles: array of shape (n,)
+    if(len(tips) == 0):
+      return
+    tip_positions = self._project_array_to_canvas(numpy, tips)
+    self._extend_bounding_box(tip_positions, self.arrow_width_svgpx)
+    if(self._math_transform is not None):
+      arrow_direction_angles = numpy.arctan2(*self._transform_direction([ numpy.cos(arrow_direction_angles), numpy.sin(arrow_direction_angles) ])[ : : -1 ])
+    # same as the transform of draw_arrow_tip: translation to the tip after the rotation (of the opposite angle, the y axis is flipped)
+    rotations = math.pi - arrow_direction_angles
+    cos_rotations = numpy.cos(rotations)[:, None]
+    sin_rotations = numpy.sin(rotations)[:, None]
+    shape = numpy.array(self._compute_arrow_tip_shape())
+    x_values = tip_positions[:, 0 : 1] + cos_rotations * shape[:, 0] - sin_rotations * shape[:, 1]
+    y_values = tip_positions[:, 1 : 2] + sin_rotations * shape[:, 0] + cos_rotations * shape[:, 1]
+    # same string as _make_arrow_tip_d_string
+    d_template = self._make_arrow_tip_d_string([ ('{}', '{}') ] * len(shape))
+    d_string = ' '.join([ d_template.format(*coordinates) for coordinates in numpy.stack([ x_values, y_values ], axis = -1).reshape(len(tips), -1).tolist() ])
+    path = self.svgwrite_object.path(d = d_string,
                                      style = self._make_svg_style_string(fill_color = self.stroke_color, dash_mode = "none"))
-    # be wary of that featured bug that reverse the order of the transformations
-    path.translate(tip_position)
-    path.rotate(math.degrees(math.pi - arrow_direction_angle), center = [ 0, 0 ])  # also: angles are negative
-    #
-    self.svgwrite_object.add(path)
+    self._add_svgwrite_element(path)
 
 
   def _compute_line_angle(self, start_point, end_point):
@@ -460,6 +2340,7 @@ class SvgImage:
     return cmath.phase(direction)
 
 
+  @_recorded_call()
   def draw_straight_arrow(self, start_point, end_point):
     """Draws an arrow as a straight line segment between two points and an arrow tip at the last point.
 
@@ -485,6 +2366,7 @@ class SvgImage:
 
 
 
+  @_recorded_call()
   def draw_curved_arrow(self, start_point, end_point, curvedness = 0.25, asymmetry = 0.):
     """Draws an arrow as a curved line joining two points with an arrow tip at the last point.
 
@@ -513,16 +2395,17 @@ class SvgImage:
     middle_point = [ (0.5 - asymmetry) * start_point[i] + (0.5 + asymmetry) * end_point[i] for i in range(2) ]
     intermediate_point = [ middle_point[i] + curvedness * orthogonal_direction[i] for i in range(2) ]
 
-    arrow_body_point_list = [ self.project_point_to_canvas(p) for p in ( start_point, intermediate_point, end_point ) ]
+    arrow_body_point_list = self._project_points_to_canvas([ start_point, intermediate_point, end_point ])
     control_vectors = self._compute_curved_arrow_control_vectors(arrow_body_point_list)
-    path_command = self._make_svg_path_M_and_C_command(arrow_body_point_list, control_vectors)
-    self.insert_svg_path_command(path_command)
-    arrow_direction_angle = self._compute_curved_arrow_endpoint_tangent(arrow_body_point_list, control_vectors)
+    self.draw_path(self._make_smooth_path(arrow_body_point_list, control_vectors))
+    # computed on the canvas: already transformed
+    arrow_direction_angle = self._transform_angle(self._compute_curved_arrow_endpoint_tangent(arrow_body_point_list, control_vectors), inverse = True)
     # note: here we need conformal projection
     self.draw_arrow_tip(end_point, arrow_direction_angle)
     return
 
 
+  @_recorded_call()
   def draw_arrow(self, start_point, end_point, curvedness = 0., asymmetry = 0.):
     """Draws either a straight or curved arrow.
 
@@ -543,6 +2426,7 @@ class SvgImage:
 
 
 
+  @_recorded_call()
   def draw_point(self, position):
     """Draws a small circle.
 
@@ -552,12 +2436,15 @@ class SvgImage:
     Examples: see :ref:`points-crosses-circles-ellipses.py`
     """
 
-    point = svgwrite.shapes.Circle(self.project_point_to_canvas(position),
+    center = self.project_point_to_canvas(position)
+    self._extend_bounding_box([ center ], self.point_size_svgpx)
+    point = svgwrite.shapes.Circle(center,
                                    r = self.point_size_svgpx,
                                    style = self._make_svg_style_string(fill_color = self.stroke_color, dash_mode = "none"))
-    self.svgwrite_object.add(point)
+    self._add_svgwrite_element(point)
 
 
+  @_recorded_call()
   def draw_cross(self, position):
     """Draws a small X cross.
 
@@ -568,17 +2455,19 @@ class SvgImage:
     """
 
     center = self.project_point_to_canvas(position)
+    self._extend_bounding_box([ center ], self.point_size_svgpx)
     x_min = center[0] - self.point_size_svgpx
     x_max = center[0] + self.point_size_svgpx
     y_min = center[1] - self.point_size_svgpx
     y_max = center[1] + self.point_size_svgpx
     style_string = self._make_svg_style_string(dash_mode = "none")
     line = self.svgwrite_object.line([x_min, y_min], [x_max, y_max], style = style_string)
-    self.svgwrite_object.add(line)
+    self._add_svgwrite_element(line)
     line = self.svgwrite_object.line([x_max, y_min], [x_min, y_max], style = style_string)
-    self.svgwrite_object.add(line)
+    self._add_svgwrite_element(line)
 
 
+  @_recorded_call()
   def draw_plus(self, position):
     """Draws a small + cross.
 
@@ -589,19 +2478,21 @@ class SvgImage:
     """
 
     center = self.project_point_to_canvas(position)
+    self._extend_bounding_box([ center ], self.point_size_svgpx)
     x_min = center[0] - self.point_size_svgpx
     x_max = center[0] + self.point_size_svgpx
     y_min = center[1] - self.point_size_svgpx
     y_max = center[1] + self.point_size_svgpx
     style_string = self._make_svg_style_string(dash_mode = "none")
     line = self.svgwrite_object.line([x_min, center[1]], [x_max, center[1]], style = style_string)
-    self.svgwrite_object.add(line)
+    self._add_svgwrite_element(line)
     line = self.svgwrite_object.line([center[0], y_min], [center[0], y_max], style = style_string)
-    self.svgwrite_object.add(line)
+    self._add_svgwrite_element(line)
 
 
 
 
+  @_recorded_call()
   def draw_line_segment(self, start_point, end_point):
     """Draws the line segment between two points.
 
@@ -616,7 +2507,7 @@ class SvgImage:
     line = self.svgwrite_object.line(self.project_point_to_canvas(start_point),
                                      self.project_point_to_canvas(end_point),
                                      style = self._make_svg_style_string())
-    self.svgwrite_object.add(line)
+    self._add_svgwrite_element(line)
 
 
   def _draw_svg_arc(self, start_point, end_point, start_angle, end_angle, major_axis_angle, radiuses):
@@ -628,6 +2519,8 @@ class SvgImage:
       angle_difference = - angle_difference
     else:
       arc_orientation = "-"
+    if(self._is_transform_reflecting):
+      arc_orientation = "+" if(arc_orientation == "-") else "-"
     is_a_large_arc = (angle_difference >= math.pi)
 
     x_axis_rotation = - math.degrees(major_axis_angle)
@@ -644,9 +2537,10 @@ class SvgImage:
                   angle_dir = arc_orientation,
                   absolute = True)
 
-    self.svgwrite_object.add(path)
+    self._add_svgwrite_element(path)
 
 
+  @_recorded_call()
   def draw_circle_arc(self, center, radius, start_angle, end_angle):
     """Draws an of a circle (in anticlockwise direction).
 
@@ -663,7 +2557,8 @@ class SvgImage:
                                                      center[1] + radius * math.sin(start_angle) ])
     arc_end_point = self.project_point_to_canvas([ center[0] + radius * math.cos(end_angle),
                                                    center[1] + radius * math.sin(end_angle) ])
-    radiuses_on_canvas = self._rescale_vector([ radius, radius ])
+    radiuses_on_canvas = self._rescale_ellipse_radiuses([ radius, radius ])
+    self._extend_bounding_box_with_disk(center, radius)
 
     self._draw_svg_arc(arc_start_point, arc_end_point, start_angle, end_angle, 0, radiuses_on_canvas)
 
@@ -671,8 +2566,9 @@ class SvgImage:
 
 
   def _rescale_ellipse_radiuses(self, ellipse_radiuses):
-    return [ self._rescale_length(r) for r in ellipse_radiuses ]
+    return [ self._rescale_length(self._transform_scaling * r) for r in ellipse_radiuses ]
 
+  @_recorded_call()
   def draw_ellipse_arc(self, focuses, semi_minor_axis, start_angle, end_angle):
     """Draws an arc of an ellipse (in anticlockwise direction) with axis parallel to the x and y axis. The ellipse is parametrised in the form *"c + (a cos t, b sin t)"* where *t* varies from ``start_angle`` to ``end_angle`` (*a*, *b* and *c* are the parameters of the ellipse computed from the coordinates of the focuses and the semi minor axis).
 
@@ -716,11 +2612,13 @@ class SvgImage:
     radiuses_on_canvas = self._rescale_ellipse_radiuses([semi_major_axis, semi_minor_axis])
     arc_start_point = self.project_complex_point_to_canvas(start_point)
     arc_end_point = self.project_complex_point_to_canvas(end_point)
+    self._extend_bounding_box_with_disk([ middle_point.real, middle_point.imag ], semi_major_axis)
 
-    self._draw_svg_arc(arc_start_point, arc_end_point, start_angle, end_angle, cmath.phase(major_axis_direction), radiuses_on_canvas)
+    self._draw_svg_arc(arc_start_point, arc_end_point, start_angle, end_angle, self._transform_angle(cmath.phase(major_axis_direction)), radiuses_on_canvas)
 
 
 
+  @_recorded_call()
   def draw_ellipse(self, focuses, semi_minor_axis):
     """Draws an ellipse with axis parallel to the x and y axis.
 
@@ -754,16 +2652,18 @@ class SvgImage:
 
     center_on_canvas = self.project_complex_point_to_canvas(middle_point)
     radiuses_on_canvas = self._rescale_ellipse_radiuses([semi_major_axis, semi_minor_axis])
+    self._extend_bounding_box([ center_on_canvas ], radiuses_on_canvas[0])
 
     ellipse = svgwrite.shapes.Ellipse(center_on_canvas,
                                       radiuses_on_canvas,
                                       style = self._make_svg_style_string())
-    ellipse.rotate(- math.degrees(cmath.phase(major_axis_direction)), center = center_on_canvas)
+    ellipse.rotate(- math.degrees(self._transform_angle(cmath.phase(major_axis_direction))), center = center_on_canvas)
 
-    self.svgwrite_object.add(ellipse)
+    self._add_svgwrite_element(ellipse)
 
 
 
+  @_recorded_call()
   def draw_circle(self, center, radius):
     """Draws a circle.
 
@@ -775,14 +2675,187 @@ class SvgImage:
     """
 
     center_on_canvas = self.project_point_to_canvas(center)
-    radius_on_canvas = self._rescale_vector([ radius, radius ])
+    radius_on_canvas = self._rescale_ellipse_radiuses([ radius, radius ])
+    self._extend_bounding_box([ center_on_canvas ], radius_on_canvas[0])
     ellipse = svgwrite.shapes.Ellipse(center_on_canvas,
                                       radius_on_canvas,
                                       style = self._make_svg_style_string())
-    self.svgwrite_object.add(ellipse)
+    self._add_svgwrite_element(ellipse)
+
+
+  def _project_array_to_canvas(self, numpy, points):
+    # same computation as project_point_to_canvas for an array of points (last dimension: the coordinates)
+    points = numpy.asarray(points, dtype = float)
+    self._nb_projected_points += points.size // 2
+    projected_points = self._compute_canvas_points_array(numpy, points)
+    if(self._bounding_box is not None):
+      self._extend_bounding_box(projected_points)
+    return projected_points
+
+  def _compute_canvas_points_array(self, numpy, points):
+    # projection of an array of points, without counting them
+    if(self._canvas_transform is not None):
+      canvas_transform = numpy.array(self._canvas_transform)
+      return points @ canvas_transform[:, : 2].T + canvas_transform[:, 2]
+    projected_points = numpy.empty_like(points)
+    projected_points[..., 0] = self.rescaling * (points[..., 0] + self.shift[0])
+    projected_points[..., 1] = self.view_box[1] - self.rescaling * (points[..., 1] + self.shift[1])
+    return projected_points
+
+  def _draw_ellipse_arc_batch(self, numpy, centers, radiuses, rotations, start_angles = None, end_angles = None, merge = True):
+    # centers: (n, 2), radiuses: (n, 2) semi-axes (along the first axis, along the second one), rotations: (n,) angles of the first axes
+    # start_angles, end_angles: (n,) parameters of the arcs, or None for whole ellipses
+    if(len(centers) == 0):
+      return
+    first_axes = numpy.stack([ numpy.cos(rotations), numpy.sin(rotations) ], axis = -1)
+    second_axes = numpy.stack([ - first_axes[:, 1], first_axes[:, 0] ], axis = -1)
+    if(start_angles is None):
+      start_points = centers + radiuses[:, 0 : 1] * first_axes
+      end_points = centers - radiuses[:, 0 : 1] * first_axes
+      large_arc_flags = numpy.zeros(len(centers), dtype = int)
+    else:
+      start_points = centers + radiuses[:, 0 : 1] * numpy.cos(start_angles)[:, None] * first_axes + radiuses[:, 1 : 2] * numpy.sin(start_angles)[:, None] * second_axes
+      end_points = centers + radiuses[:, 0 : 1] * numpy.cos(end_angles)[:, None] * first_axes + radiuses[:, 1 : 2] * numpy.sin(end_angles)[:, None] * second_axes
+      large_arc_flags = (numpy.mod(end_angles - start_angles, the_tau) >= math.pi).astype(int)
+    canvas_points = self._project_array_to_canvas(numpy, numpy.stack([ start_points, end_points ], axis = 1))
+    canvas_radiuses = (self.rescaling * self._transform_scaling) * radiuses
+    if(self._math_transform is not None):
+      rotations = numpy.arctan2(*self._transform_direction([ numpy.cos(rotations), numpy.sin(rotations) ])[ : : -1 ])
+    if(self._bounding_box is not None):
+      canvas_centers = self._compute_canvas_points_array(numpy, centers)
+      largest_radiuses = canvas_radiuses.max(axis = 1)[:, None]
+      self._extend_bounding_box(numpy.concatenate([ canvas_centers - largest_radiuses, canvas_centers + largest_radiuses ]))
+    # the y axis is flipped on the canvas: the rotations are reversed, and sweep flag 0 is the anticlockwise direction
+    x_axis_rotations = 0. - numpy.degrees(rotations)
+    sweep_flag = int(self._is_transform_reflecting)
+
+    rows = zip(canvas_points[:, 0].tolist(), canvas_points[:, 1].tolist(), canvas_radiuses.tolist(), x_axis_rotations.tolist(), large_arc_flags.tolist())
+    if(start_angles is None):
+      subpaths = [ f'M {x0}, {y0} A {rx}, {ry} {rotation} 0 {sweep_flag} {x1}, {y1} A {rx}, {ry} {rotation} 0 {sweep_flag} {x0}, {y0} Z'
+                   for (x0, y0), (x1, y1), (rx, ry), rotation, large_arc in rows ]
+    else:
+      subpaths = [ f'M {x0}, {y0} A {rx}, {ry} {rotation} {large_arc} {sweep_flag} {x1}, {y1}'
+                   for (x0, y0), (x1, y1), (rx, ry), rotation, large_arc in rows ]
+
+    style_string = self._make_svg_style_string()
+    if(merge):
+      subpaths = [ ' '.join(subpaths) ]
+    for d_string in subpaths:
+      self._add_svgwrite_element(self.svgwrite_object.path(d = d_string, style = style_string))
+
+  def _compute_ellipse_parameters(self, numpy, focuses_array, semi_minor_axes):
+    # returns the centers, the semi-axes and the rotations of the ellipses
+    focuses_array = numpy.asarray(focuses_array, dtype = float).reshape(-1, 2, 2)
+    semi_minor_axes = numpy.broadcast_to(numpy.asarray(semi_minor_axes, dtype = float), (len(focuses_array),))
+    major_axis_directions = focuses_array[:, 1] - focuses_array[:, 0]
+    half_distances_between_the_focuses = 0.5 * numpy.hypot(major_axis_directions[:, 0], major_axis_directions[:, 1])
+    semi_major_axes = numpy.sqrt(semi_minor_axes * semi_minor_axes + half_distances_between_the_focuses * half_distances_between_the_focuses)
+    centers = 0.5 * (focuses_array[:, 0] + focuses_array[:, 1])
+    rotations = numpy.arctan2(major_axis_directions[:, 1], major_axis_directions[:, 0])
+    return centers, numpy.stack([ semi_major_axes, semi_minor_axes ], axis = -1), rotations
+
+  def _compute_circle_parameters(self, numpy, centers, radiuses):
+    centers = numpy.asarray(centers, dtype = float).reshape(-1, 2)
+    radiuses = numpy.broadcast_to(numpy.asarray(radiuses, dtype = float), (len(centers),))
+    return centers, numpy.stack([ radiuses, radiuses ], axis = -1), numpy.zeros(len(centers))
+
+  def _broadcast_angles(self, numpy, nb_arcs, start_angles, end_angles):
+    return (numpy.broadcast_to(numpy.asarray(start_angles, dtype = float), (nb_arcs,)),
+            numpy.broadcast_to(numpy.asarray(end_angles, dtype = float), (nb_arcs,)))
+
+
+  @_recorded_call()
+  def draw_ellipses(self, focuses_array, semi_minor_axes, merge = True):
+    """Draws many ellipses at once (same as calling ``draw_ellipse`` for each of them), the computations are done with numpy (which has to be installed).
+
+    Each ellipse is drawn as two arcs (``A`` path commands).
+
+    Args:
+      * ``focuses_array`` (``list`` or ``numpy.ndarray``): the focuses of the ellipses, of shape ``(n, 2, 2)`` (two points for each ellipse)
+      * ``semi_minor_axes`` (``float``, ``list`` or ``numpy.ndarray``): semi minor axis of each ellipse (or one value for all of them)
+      * ``merge`` (``bool``): if ``True`` all the ellipses are drawn in one SVG path, otherwise in one path each (the dash patterns and the transparencies can look different)
+
+    Example::
+
+      image = mathsvg.SvgImage(pixel_density = 20, view_window = (( -4, -4 ), ( 4, 4 )))
+      focuses_array = [ [ [ -0.1 * k, 0 ], [ 0.1 * k, 0 ] ] for k in range(1, 20) ]
+      image.draw_ellipses(focuses_array, 1.)
+      image.save("draw-ellipses-example.svg")
+    """
+    numpy = _import_numpy()
+    centers, radiuses, rotations = self._compute_ellipse_parameters(numpy, focuses_array, semi_minor_axes)
+    self._draw_ellipse_arc_batch(numpy, centers, radiuses, rotations, merge = merge)
+
+
+  @_recorded_call()
+  def draw_ellipse_arcs(self, focuses_array, semi_minor_axes, start_angles, end_angles, merge = True):
+    """Draws many arcs of ellipses at once (same as calling ``draw_ellipse_arc`` for each of them), the computations are done with numpy (which has to be installed).
+
+    Args:
+      * ``focuses_array`` (``list`` or ``numpy.ndarray``): the focuses of the ellipses, of shape ``(n, 2, 2)`` (two points for each ellipse)
+      * ``semi_minor_axes`` (``float``, ``list`` or ``numpy.ndarray``): semi minor axis of each ellipse (or one value for all of them)
+      * ``start_angles`` (``float``, ``list`` or ``numpy.ndarray``): angles where the arcs start in radians (or one value for all of them)
+      * ``end_angles`` (``float``, ``list`` or ``numpy.ndarray``): angles where the arcs end in radians (or one value for all of them)
+      * ``merge`` (``bool``): if ``True`` all the arcs are drawn in one SVG path, otherwise in one path each
+
+    Example::
+
+      image = mathsvg.SvgImage(pixel_density = 20, view_window = (( -4, -4 ), ( 4, 4 )))
+      focuses_array = [ [ [ -0.1 * k, 0 ], [ 0.1 * k, 0 ] ] for k in range(1, 20) ]
+      image.draw_ellipse_arcs(focuses_array, 1., 0., [ 0.3 * k for k in range(1, 20) ])
+      image.save("draw-ellipse-arcs-example.svg")
+    """
+    numpy = _import_numpy()
+    centers, radiuses, rotations = self._compute_ellipse_parameters(numpy, focuses_array, semi_minor_axes)
+    start_angles, end_angles = self._broadcast_angles(numpy, len(centers), start_angles, end_angles)
+    self._draw_ellipse_arc_batch(numpy, centers, radiuses, rotations, start_angles, end_angles, merge = merge)
+
+
+  @_recorded_call()
+  def draw_circles(self, centers, radiuses, merge = True):
+    """Draws many circles at once (same as calling ``draw_circle`` for each of them), the computations are done with numpy (which has to be installed).
+
+    Args:
+      * ``centers`` (``list`` or ``numpy.ndarray``): coordinates of the centers, of shape ``(n, 2)``
+      * ``radiuses`` (``float``, ``list`` or ``numpy.ndarray``): radius of each circle (or one value for all of them)
+      * ``merge`` (``bool``): if ``True`` all the circles are drawn in one SVG path, otherwise in one path each
+
+    Example::
+
+      image = mathsvg.SvgImage(pixel_density = 20, view_window = (( -4, -4 ), ( 4, 4 )))
+      image.draw_circles([ [ 0.1 * k - 2, 0 ] for k in range(40) ], [ 0.05 * k for k in range(40) ])
+      image.save("draw-circles-example.svg")
+    """
+    numpy = _import_numpy()
+    centers, radiuses, rotations = self._compute_circle_parameters(numpy, centers, radiuses)
+    self._draw_ellipse_arc_batch(numpy, centers, radiuses, rotations, merge = merge)
+
+
+  @_recorded_call()
+  def draw_circle_arcs(self, centers, radiuses, start_angles, end_angles, merge = True):
+    """Draws many arcs of circles at once (same as calling ``draw_circle_arc`` for each of them), the computations are done with numpy (which has to be installed).
+
+    Args:
+      * ``centers`` (``list`` or ``numpy.ndarray``): coordinates of the centers, of shape ``(n, 2)``
+      * ``radiuses`` (``float``, ``list`` or ``numpy.ndarray``): radius of each circle (or one value for all of them)
+      * ``start_angles`` (``float``, ``list`` or ``numpy.ndarray``): angles where the arcs start in radians (or one value for all of them)
+      * ``end_angles`` (``float``, ``list`` or ``numpy.ndarray``): angles where the arcs end in radians (or one value for all of them)
+      * ``merge`` (``bool``): if ``True`` all the arcs are drawn in one SVG path, otherwise in one path each
+
+    Example::
+
+      image = mathsvg.SvgImage(pixel_density = 20, view_window = (( -4, -4 ), ( 4, 4 )))
+      image.draw_circle_arcs([ 0, 0 ], [ 0.2 * k for k in range(1, 20) ], 0., [ 0.3 * k for k in range(1, 20) ])
+      image.save("draw-circle-arcs-example.svg")
+    """
+    numpy = _import_numpy()
+    centers, radiuses, rotations = self._compute_circle_parameters(numpy, centers, radiuses)
+    start_angles, end_angles = self._broadcast_angles(numpy, len(centers), start_angles, end_angles)
+    self._draw_ellipse_arc_batch(numpy, centers, radiuses, rotations, start_angles, end_angles, merge = merge)
 
 
 
+  @_recorded_call()
   def draw_polyline(self, point_list):
     """Draws a sequence of connected lins segments.
 
@@ -801,8 +2874,9 @@ class SvgImage:
 
     polyline = svgwrite.shapes.Polyline(points = points,
                                         style = self._make_svg_style_string())
-    self.svgwrite_object.add(polyline)
+    self._add_svgwrite_element(polyline)
 
+  @_recorded_call()
   def draw_polygon(self, point_list):
     """Draws a polygon using straight lines.
 
@@ -821,9 +2895,10 @@ class SvgImage:
 
     polygon = svgwrite.shapes.Polygon(points = points,
                                       style = self._make_svg_style_string())
-    self.svgwrite_object.add(polygon)
+    self._add_svgwrite_element(polygon)
 
 
+  @_recorded_call()
   def draw_rectangle(self, top, left, bottom, right):
     """Draws a rectangle.
 
@@ -835,6 +2910,7 @@ class SvgImage:
     """
     self.draw_polygon([ (left, top), (left, bottom), (right, bottom), (right, top), (left, top) ])
 
+  @_recorded_call()
   def draw_square(self, center, side_length):
     """Draws a square.
 
@@ -851,6 +2927,7 @@ class SvgImage:
 
 
 
+  @_recorded_call()
   def draw_function_graph(self, eval_function, x_start, x_end, nb_x, * function_params, curve_type = "polyline"):
     """Draws the graph of a function *f*, that is, an interpolation of a set of ``nb_x`` points *(x, y)* with *y = f (x)* and with *x* between ``x_start`` and ``x_end``. The default interpolation is by straight lines. It is also possible to have some type of smooth interpolation. The ``nb_x`` points have regularly spaced *x* coordinates starting from ``x_start`` and ending at ``x_end``.
 
@@ -889,6 +2966,7 @@ class SvgImage:
 
 
 
+  @_recorded_call()
   def draw_parametric_graph(self, eval_point, t_start, t_end, nb_t, *function_params, curve_type = 'polyline', is_closed = False):
     """Draws a parametric graph given by the functions *x(t)* and *y(t)*, that is, an interpolation of a set of ``nb_t`` points *(x, y)* with *x = x(t)* and *y = y(t)* and with *t* between ``t_start`` and ``t_end``. The default interpolation is by straight lines. It is also possible to have some type of smooth interpolation. The ``nb_t`` parameters are regularly spaced starting from ``t_start`` and ending at ``t_end``.
 
@@ -937,6 +3015,369 @@ If ``is_closed`` is set to ``True`` the two endpoints of the curve will be joine
     return
 
 
+  @_recorded_call()
+  def draw_cobweb(self, eval_map, x0, nb_iterations, *map_params, from_axis = True, arrow_tips = False, is_vectorized = False):
+    """Draws the cobweb diagram (or iteration graph) of the orbits of a map *f* of the real line: the staircase going from *(x, x)* to *(x, f(x))* then to *(f(x), f(x))*, and so on. The orbits are computed with numpy (which has to be installed) and drawn as one SVG path.
+
+    The diagram only contains the orbits, the graph of *f* and the diagonal are drawn with ``draw_function_graph`` and ``draw_line_segment``.
+
+    Args:
+      * ``eval_map``: a function (or lambda) that takes *x* as an argument and returns *f (x)*. The function will be called with ``eval_map (x, * map_params)``.
+      * ``x0`` (``float`` or ``list``): initial point, or list (or numpy array) of initial points
+      * ``nb_iterations`` (``int``): number of iterations of the map
+      * ``map_params`` (variadic arguments): optionally, arguments to pass to ``eval_map`` in addition to the value for *x*
+      * ``from_axis`` (``boolean``): if ``True`` the orbits start on the horizontal axis, at *(x0, 0)*, otherwise they start on the diagonal
+      * ``arrow_tips`` (``boolean``): if ``True`` an arrow tip is drawn in the middle of each step (see ``set_arrow_options``)
+      * ``is_vectorized`` (``boolean``): if ``True``, ``eval_map`` is called once for each iteration with the numpy array of all the points, otherwise it is called for each point
+
+    Example::
+
+      image = mathsvg.SvgImage(pixel_density = 600, view_window = (( -0.1, -0.1 ), ( 1.1, 1.1 )))
+      logistic_map = lambda x, r : r * x * (1 - x)
+      image.draw_function_graph(logistic_map, 0, 1, 50, 4.)
+      image.draw_line_segment((0, 0), (1, 1))
+      image.set_dash_mode("dash")
+      image.draw_cobweb(logistic_map, 0.10491, 6, 4., arrow_tips = True, is_vectorized = True)
+      image.save("draw-cobweb-example.svg")
+    """
+    numpy = _import_numpy()
+    orbit = [ numpy.asarray(x0, dtype = float).reshape(-1) ]
+    if(is_vectorized):
+      for iteration_index in range(nb_iterations):
+        orbit.append(numpy.asarray(eval_map(orbit[-1], *map_params), dtype = float).reshape(-1))
+    else:
+      points = orbit[0].tolist()
+      for iteration_index in range(nb_iterations):
+        points = [ eval_map(x, *map_params) for x in points ]
+        orbit.append(numpy.array(points, dtype = float))
+    # shape (nb_iterations + 1, nb_orbits)
+    orbit = numpy.stack(orbit)
+    if((nb_iterations == 0) or (orbit.shape[1] == 0)):
+      return
+    starts = orbit[ : -1 ]
+    ends = orbit[1 : ]
+
+    # corners of the staircases: (x0, x0), (x0, x1), (x1, x1), (x1, x2)...
+    x_values = numpy.repeat(starts, 2, axis = 0)
+    y_values = numpy.stack([ starts, ends ], axis = 1).reshape(-1, orbit.shape[1])
+    if(from_axis):
+      x_values = numpy.concatenate([ orbit[0 : 1], x_values ])
+      y_values = numpy.concatenate([ numpy.zeros((1, orbit.shape[1])), y_values ])
+    canvas_points = self._project_array_to_canvas(numpy, numpy.stack([ x_values.T, y_values.T ], axis = -1))
+    self._add_svgwrite_element(self.svgwrite_object.path(d = self._make_polylines_d_string(canvas_points), style = self._make_svg_style_string()))
+
+    if(arrow_tips):
+      # in the middle of the vertical segments, and of the horizontal ones except the last
+      is_increasing = ends > starts
+      middles = 0.5 * (starts + ends)
+      vertical_tips = numpy.stack([ starts, middles ], axis = -1).reshape(-1, 2)
+      vertical_angles = numpy.where(is_increasing, 0.5 * math.pi, - 0.5 * math.pi).reshape(-1)
+      horizontal_tips = numpy.stack([ middles[ : -1 ], ends[ : -1 ] ], axis = -1).reshape(-1, 2)
+      horizontal_angles = numpy.where(is_increasing[ : -1 ], 0., math.pi).reshape(-1)
+      self._draw_arrow_tip_batch(numpy, numpy.concatenate([ vertical_tips, horizontal_tips ]), numpy.concatenate([ vertical_angles, horizontal_angles ]))
+
+
+  @_recorded_call()
+  def draw_orbit_diagram(self, eval_map, parameter_start, parameter_end, nb_parameters, nb_transient_iterations, nb_kept_iterations, x0 = 0.5, as_image = False, chunk_size = 10000):
+    """Draws the orbit diagram (or bifurcation diagram) of a family of maps *f_p* of the real line: for regularly spaced parameters *p*, the points *(p, x)* for *x* in the orbit of ``x0`` under *f_p*, after some transient iterations.
+
+    All the parameters are iterated at once with numpy (which has to be installed), by chunks of ``chunk_size`` parameters to limit the memory used.
+    The points are gathered by pixel of the canvas, and each pixel containing at least one point is filled with the stroke color (see ``set_svg_options``): the size of the output depends on the number of pixels, not on the number of points. The points out of the canvas are not drawn, and the image cannot use ``auto_fit``.
+    The pixels are drawn as one path made of horizontal runs of pixels, or as one embedded PNG image (with ``as_image = True``) which is smaller when many pixels are filled.
+
+    Args:
+      * ``eval_map``: a function (or lambda) that takes the numpy arrays of the points *x* and of the parameters *p* as arguments and returns the array of the *f_p (x)*
+      * ``parameter_start`` (``float``): first parameter (on the horizontal axis)
+      * ``parameter_end`` (``float``): last parameter
+      * ``nb_parameters`` (``int``): number of parameters
+      * ``nb_transient_iterations`` (``int``): number of iterations before the points are drawn
+      * ``nb_kept_iterations`` (``int``): number of points drawn for each parameter
+      * ``x0`` (``float``): initial point, for all the parameters
+      * ``as_image`` (``boolean``): if ``True`` the pixels are drawn as an image instead of a path
+      * ``chunk_size`` (``int``): number of parameters iterated at the same time
+
+    Example::
+
+      image = mathsvg.SvgImage(pixel_density = 200, view_window = (( 2.8, -0.05 ), ( 4, 1.05 )))
+      image.draw_orbit_diagram(lambda x, r : r * x * (1 - x), 2.8, 4, 2000, 500, 300)
+      image.save("orbit-diagram-example.svg")
+    """
+    if(self._auto_fit):
+      raise Exception("draw_orbit_diagram: cannot be used with auto_fit (only the points inside the view window are drawn)")
+    numpy = _import_numpy()
+    parameters = numpy.linspace(parameter_start, parameter_end, nb_parameters)
+    # pixel (i, j) is encoded as j * 2^32 + (i + 2^31) so that sorting the keys sorts the pixels by row
+    pixel_keys = numpy.empty(0, dtype = numpy.int64)
+    for chunk_start in range(0, nb_parameters, chunk_size):
+      chunk_parameters = parameters[chunk_start : chunk_start + chunk_size]
+      x_values = numpy.full(len(chunk_parameters), float(x0))
+      for iteration_index in range(nb_transient_iterations):
+        x_values = eval_map(x_values, chunk_parameters)
+      chunk_keys = [ pixel_keys ]
+      for iteration_index in range(nb_kept_iterations):
+        x_values = numpy.asarray(eval_map(x_values, chunk_parameters), dtype = float)
+        # the points out of the canvas (escaping orbits, zoomed diagrams) are dropped before the conversion to pixels, the points on its sides are kept
+        self._nb_projected_points += len(x_values)
+        canvas_points = self._compute_canvas_points_array(numpy, numpy.stack([ chunk_parameters, x_values ], axis = -1))
+        is_inside = (canvas_points[:, 0] >= 0) & (canvas_points[:, 0] <= self.view_box[0]) & (canvas_points[:, 1] >= 0) & (canvas_points[:, 1] <= self.view_box[1])
+        canvas_points = numpy.floor(canvas_points[is_inside]).astype(numpy.int64)
+        chunk_keys.append(canvas_points[:, 1] * 2**32 + (canvas_points[:, 0] + 2**31))
+      pixel_keys = numpy.unique(numpy.concatenate(chunk_keys))
+    if(len(pixel_keys) == 0):
+      return
+    pixel_rows = pixel_keys // 2**32
+    pixel_columns = pixel_keys % 2**32 - 2**31
+    self._extend_bounding_box([ [ pixel_columns.min(), pixel_rows.min() ], [ pixel_columns.max() + 1, pixel_rows.max() + 1 ] ])
+    style_string = self._make_svg_style_string(fill_color = self.stroke_color, stroke_color = "none", stroke_width = 0, dash_mode = "none")
+    if(as_image):
+      self._draw_pixel_mask(numpy, pixel_columns, pixel_rows, style_string)
+      return
+    # runs of consecutive pixels on the same row
+    run_starts = numpy.flatnonzero(numpy.diff(pixel_keys, prepend = pixel_keys[0] - 2) != 1)
+    run_lengths = numpy.diff(run_starts, append = len(pixel_keys))
+    d_string = ' '.join([ f'M {x}, {y} h {length} v 1 h -{length} Z' for x, y, length in zip(pixel_columns[run_starts].tolist(), pixel_rows[run_starts].tolist(), run_lengths.tolist()) ])
+    self._add_svgwrite_element(self.svgwrite_object.path(d = d_string, style = style_string))
+
+  @_recorded_call()
+  def draw_streamlines(self, eval_field, seeds, step, nb_steps, *field_params, both_directions = False, tolerance = 0.25, domain = None):
+    """Draws the streamlines (or trajectories) of a vector field starting from some points (the seeds), all of them in one SVG path.
+
+    The trajectories are computed with the Runge-Kutta method of order 4 at the same time for all the seeds, with numpy (which has to be installed). A trajectory stops when it leaves the domain (by default the part of the plane drawn inside the view window), or when it stalls (moves by less than a thousandth of a pixel in a step).
+    The lines are simplified before being drawn: points are removed as long as the lines do not move by more than ``tolerance``.
+
+    Args:
+      * ``eval_field``: a function (or lambda) that takes the arrays of the *x* and *y* coordinates of the points and returns the coordinates of the vectors, as a pair of arrays (or numbers). The function will be called with ``eval_field (x, y, * field_params)``.
+      * ``seeds`` (``list``): starting points, or numpy array of shape ``(n, 2)``
+      * ``step`` (``float``): time step of the integration
+      * ``nb_steps`` (``int``): maximal number of steps of each trajectory
+      * ``field_params`` (variadic arguments): optionally, arguments to pass to ``eval_field`` in addition to the coordinates
+      * ``both_directions`` (``boolean``): if ``True`` the trajectories are also followed backwards in time
+      * ``tolerance`` (``float``): largest distance (in pixels) between the computed lines and the lines drawn
+      * ``domain`` (``tuple``): the rectangle outside of which the trajectories stop, given as ``((x_min, y_min), (x_max, y_max))``. By default this is the smallest rectangle containing the points drawn inside the view window (through the transforms pushed with ``push_transform``), and with ``auto_fit`` the trajectories are not stopped by a domain.
+
+    Example::
+
+      image = mathsvg.SvgImage(pixel_density = 100, view_window = (( -3, -3 ), ( 3, 3 )))
+      pendulum = lambda x, y : (y, - numpy.sin(x))
+      seeds = [ [ 0, 0.2 * k ] for k in range(1, 15) ]
+      image.draw_streamlines(pendulum, seeds, 0.01, 2000, both_directions = True)
+      image.save("draw-streamlines-example.svg")
+    """
+    numpy = _import_numpy()
+    seeds = numpy.asarray(seeds, dtype = float).reshape(-1, 2)
+    domain = self._compute_visible_domain() if(domain is None) else domain
+    # the points of all the trajectories, with the index of the seed and the (signed) index of the step
+    points = [ seeds ]
+    seed_indexes = [ numpy.arange(len(seeds)) ]
+    step_indexes = [ numpy.zeros(len(seeds), dtype = int) ]
+    for direction in ([ 1, -1 ] if(both_directions) else [ 1 ]):
+      for step_index, (trajectory_points, trajectory_seed_indexes) in self._integrate_streamlines(numpy, eval_field, seeds, direction * step, nb_steps, field_params, domain):
+        points.append(trajectory_points)
+        seed_indexes.append(trajectory_seed_indexes)
+        step_indexes.append(numpy.full(len(trajectory_seed_indexes), direction * step_index))
+    seed_indexes = numpy.concatenate(seed_indexes)
+    order = numpy.lexsort((numpy.concatenate(step_indexes), seed_indexes))
+    seed_indexes = seed_indexes[order]
+    points = numpy.concatenate(points)[order]
+    nb_points = numpy.bincount(seed_indexes, minlength = len(seeds))
+    ends = numpy.cumsum(nb_points) - 1
+    starts = ends + 1 - nb_points
+    is_line = nb_points > 1
+    starts = starts[is_line]
+    ends = ends[is_line]
+    if(len(starts) == 0):
+      return
+    canvas_points = self._project_array_to_canvas(numpy, points)
+    is_kept = _simplify_polylines(numpy, canvas_points, starts, ends, tolerance)
+    kept_indexes = numpy.cumsum(is_kept) - 1
+    canvas_points = canvas_points[is_kept]
+    lines = [ canvas_points[start : end + 1] for start, end in zip(kept_indexes[starts].tolist(), kept_indexes[ends].tolist()) ]
+    self._add_svgwrite_element(self.svgwrite_object.path(d = self._make_polylines_d_string(lines), style = self._make_svg_style_string()))
+
+  def _integrate_streamlines(self, numpy, eval_field, seeds, step, nb_steps, field_params, domain):
+    # yields, for each step, the new points and the indexes of their seeds, the trajectories stop when they leave the domain (if not None)
+    (x_min, y_min), (x_max, y_max) = domain if(domain is not None) else ((- math.inf, - math.inf), (math.inf, math.inf))
+    min_move = 1e-3 / self.rescaling
+
+    def eval_vectors(points):
+      x_values = points[:, 0]
+      vector_coordinates = eval_field(x_values, points[:, 1], *field_params)
+      return numpy.stack(numpy.broadcast_arrays(vector_coordinates[0], vector_coordinates[1], x_values)[ : 2 ], axis = -1)
+
+    def is_inside(points):
+      return (points[:, 0] >= x_min) & (points[:, 0] <= x_max) & (points[:, 1] >= y_min) & (points[:, 1] <= y_max)
+    seed_indexes = numpy.flatnonzero(is_inside(seeds))
+    points = seeds[seed_indexes]
+    for step_index in range(1, nb_steps + 1):
+      if(len(points) == 0):
+        break
+      k1 = eval_vectors(points)
+      k2 = eval_vectors(points + (0.5 * step) * k1)
+      k3 = eval_vectors(points + (0.5 * step) * k2)
+      k4 = eval_vectors(points + step * k3)
+      new_points = points + (step / 6.) * (k1 + 2. * k2 + 2. * k3 + k4)
+      moves = numpy.hypot(new_points[:, 0] - points[:, 0], new_points[:, 1] - points[:, 1])
+      is_moving = numpy.isfinite(moves) & (moves >= min_move)
+      # the first point out of the domain is drawn, then the trajectory stops
+      yield step_index, (new_points[is_moving], seed_indexes[is_moving])
+      is_going_on = is_moving & is_inside(new_points)
+      points = new_points[is_going_on]
+      seed_indexes = seed_indexes[is_going_on]
+
+  @_recorded_call()
+  def draw_implicit_curve(self, eval_function, levels, resolution, *function_params, curve_type = "polyline", domain = None):
+    """Draws the level sets *f (x, y) = c* of a function *f* of two variables, inside a rectangle (by default the part of the plane drawn inside the view window), all of them in one SVG path.
+
+    The function is computed once with numpy (which has to be installed) on a regular grid covering the rectangle, for all the levels. The curves are then found by marching squares: in each cell of the grid where *f - c* changes sign, the points where the curve crosses the sides of the cell are found by linear interpolation and joined by a segment. The segments are then joined into curves.
+
+    Args:
+      * ``eval_function``: a function (or lambda) that takes the numpy arrays of the *x* and *y* coordinates of the nodes of the grid and returns the array of the values of *f*. The function will be called with ``eval_function (x, y, * function_params)``.
+      * ``levels`` (``float`` or ``list``): the level *c*, or the list of levels
+      * ``resolution`` (``int`` or ``tuple``): number of cells of the grid along the horizontal and vertical axes, a single number is used for both
+      * ``function_params`` (variadic arguments): optionally, arguments to pass to ``eval_function`` in addition to the coordinates
+      * ``curve_type`` (``str``): if ``"polyline"`` then the points are interpolated by line segments, if ``"autosmooth"`` the interpolation is smoother
+      * ``domain`` (``tuple``): the rectangle covered by the grid, given as ``((x_min, y_min), (x_max, y_max))``. By default this is the smallest rectangle containing the points drawn inside the view window (through the transforms pushed with ``push_transform``), it has to be given with ``auto_fit``.
+
+    Example::
+
+      image = mathsvg.SvgImage(pixel_density = 100, view_window = (( -2, -2 ), ( 2, 2 )))
+      cassini_oval = lambda x, y : ((x - 1)**2 + y**2) * ((x + 1)**2 + y**2)
+      image.draw_implicit_curve(cassini_oval, [ 0.5, 1, 1.5 ], 200, curve_type = "autosmooth")
+      image.save("draw-implicit-curve-example.svg")
+    """
+    if(curve_type not in ("polyline", "autosmooth")):
+      raise Exception("curve_type not in ('polyline', 'autosmooth')")
+    numpy = _import_numpy()
+    nb_columns, nb_rows = (resolution, resolution) if(numpy.ndim(resolution) == 0) else resolution
+    domain = self._compute_visible_domain() if(domain is None) else domain
+    if(domain is None):
+      raise Exception("draw_implicit_curve: the domain has to be given with auto_fit")
+    (x_min, y_min), (x_max, y_max) = domain
+    x_values, y_values = numpy.meshgrid(numpy.linspace(x_min, x_max, nb_columns + 1), numpy.linspace(y_min, y_max, nb_rows + 1))
+    values = numpy.broadcast_to(numpy.asarray(eval_function(x_values, y_values, *function_params), dtype = float), x_values.shape)
+    nodes = numpy.stack([ x_values.reshape(-1), y_values.reshape(-1) ], axis = -1)
+    flat_values = values.reshape(-1)
+    nb_horizontal_edges = (nb_rows + 1) * nb_columns
+    lines = []
+    for level in numpy.atleast_1d(numpy.asarray(levels, dtype = float)).tolist():
+      segments = _compute_contour_segments(numpy, values, level)
+      if(len(segments) == 0):
+        continue
+      edge_lines = _join_segments(numpy, segments)
+      edges = numpy.array([ edge for edge_line in edge_lines for edge in edge_line ])
+      # ends of the edges (as indexes of nodes) and position of the crossing between them
+      is_vertical = edges >= nb_horizontal_edges
+      edge_rows, edge_columns = numpy.divmod(edges, nb_columns)
+      vertical_rows, vertical_columns = numpy.divmod(edges - nb_horizontal_edges, nb_columns + 1)
+      first_nodes = numpy.where(is_vertical, vertical_rows * (nb_columns + 1) + vertical_columns, edge_rows * (nb_columns + 1) + edge_columns)
+      second_nodes = first_nodes + numpy.where(is_vertical, nb_columns + 1, 1)
+      first_values = flat_values[first_nodes]
+      positions = (level - first_values) / (flat_values[second_nodes] - first_values)
+      points = nodes[first_nodes] + positions[:, numpy.newaxis] * (nodes[second_nodes] - nodes[first_nodes])
+      lines += numpy.split(self._project_array_to_canvas(numpy, points), numpy.cumsum([ len(edge_line) for edge_line in edge_lines ])[ : -1 ])
+    if(len(lines) == 0):
+      return
+    if(curve_type == "polyline"):
+      d_string = self._make_polylines_d_string(lines)
+    else:
+      d_strings = []
+      for line in lines:
+        # the last point of a closed line is the same as its first point
+        is_closed = (len(line) > 3) and (line[0] == line[-1]).all()
+        points = line[ : -1 ].tolist() if(is_closed) else line.tolist()
+        control_vectors = self._compute_autosmooth_control_vectors(points, is_path_closed = is_closed)
+        d_strings.append(self._make_svg_path_d_string(self._make_smooth_path(points, control_vectors, is_path_closed = is_closed)))
+      d_string = ' '.join(d_strings)
+    self._add_svgwrite_element(self.svgwrite_object.path(d = d_string, style = self._make_svg_style_string()))
+
+  @_recorded_call()
+  def draw_mapped_grid(self, eval_map, domain, nb_lines, nb_samples, *map_params, nb_refinements = 0, max_step_length = 2.):
+    """Draws the image of a grid of horizontal and vertical lines under a map *f* of the complex plane (for example a conformal map), as two SVG paths: one for the images of the vertical lines and one for the images of the horizontal lines.
+
+    The map is computed with numpy (which has to be installed) in one call on all the points of all the lines. The images of the lines are interpolated by line segments, they are cut at the points where *f* is not finite (poles, for example).
+    Where *f* moves the points fast (where *|f'|* is large), the segments can be refined: the segments longer than ``max_step_length`` pixels are cut in two by computing *f* in the middle of the corresponding segment of the grid, this is repeated at most ``nb_refinements`` times.
+
+    Args:
+      * ``eval_map``: a function (or lambda) that takes a numpy array of complex numbers *z* and returns the array of the *f (z)*. The function will be called with ``eval_map (z, * map_params)``.
+      * ``domain`` (``tuple``): the rectangle covered by the grid, given as the coordinates of its bottom left and top right corners, ``((x_min, y_min), (x_max, y_max))``
+      * ``nb_lines`` (``int`` or ``tuple``): number of vertical and horizontal lines of the grid (including the sides of the domain), a single number is used for both
+      * ``nb_samples`` (``int``): number of points computed on each line (before refinement)
+      * ``map_params`` (variadic arguments): optionally, arguments to pass to ``eval_map`` in addition to *z*
+      * ``nb_refinements`` (``int``): largest number of refinements
+      * ``max_step_length`` (``float``): length (in pixels) of the longest segments that are not refined
+
+    Example::
+
+      image = mathsvg.SvgImage(pixel_density = 100, view_window = (( -2, -2 ), ( 2, 2 )))
+      image.draw_mapped_grid(lambda z : z + 0.5 / z, (( -1.5, 0.1 ), ( 1.5, 1.5 )), (31, 15), 100, nb_refinements = 5)
+      image.save("draw-mapped-grid-example.svg")
+    """
+    numpy = _import_numpy()
+    nb_vertical_lines, nb_horizontal_lines = (nb_lines, nb_lines) if(numpy.ndim(nb_lines) == 0) else nb_lines
+    (x_min, y_min), (x_max, y_max) = domain
+    # all the points of the vertical lines then of the horizontal lines, one line per row
+    z_values = numpy.concatenate([ numpy.linspace(x_min, x_max, nb_vertical_lines)[:, numpy.newaxis] + 1j * numpy.linspace(y_min, y_max, nb_samples),
+                                   numpy.linspace(x_min, x_max, nb_samples) + 1j * numpy.linspace(y_min, y_max, nb_horizontal_lines)[:, numpy.newaxis] ])
+    image_values = numpy.broadcast_to(numpy.asarray(eval_map(z_values, *map_params), dtype = complex), z_values.shape).reshape(-1)
+    z_values = z_values.reshape(-1)
+    line_indexes = numpy.repeat(numpy.arange(nb_vertical_lines + nb_horizontal_lines), nb_samples)
+    for refinement_index in range(nb_refinements):
+      step_lengths = self.rescaling * numpy.abs(numpy.diff(image_values))
+      cut_indexes = numpy.flatnonzero(numpy.isfinite(step_lengths) & (step_lengths > max_step_length) & (line_indexes[1 : ] == line_indexes[ : -1 ]))
+      if(len(cut_indexes) == 0):
+        break
+      new_z_values = 0.5 * (z_values[cut_indexes] + z_values[cut_indexes + 1])
+      new_image_values = numpy.broadcast_to(numpy.asarray(eval_map(new_z_values, *map_params), dtype = complex), new_z_values.shape)
+      z_values = numpy.insert(z_values, cut_indexes + 1, new_z_values)
+      image_values = numpy.insert(image_values, cut_indexes + 1, new_image_values)
+      line_indexes = numpy.insert(line_indexes, cut_indexes + 1, line_indexes[cut_indexes])
+
+    # pieces of lines between the points where f is not finite, the pieces with less than two points are not drawn
+    positions = numpy.flatnonzero(numpy.isfinite(image_values))
+    line_indexes = line_indexes[positions]
+    is_piece_start = numpy.ones(len(positions), dtype = bool)
+    is_piece_start[1 : ] = (numpy.diff(positions) != 1) | (numpy.diff(line_indexes) != 0)
+    piece_lengths = numpy.diff(numpy.append(numpy.flatnonzero(is_piece_start), len(positions)))
+    is_drawn = piece_lengths > 1
+    is_drawn_point = numpy.repeat(is_drawn, piece_lengths)
+    positions = positions[is_drawn_point]
+    line_indexes = line_indexes[is_drawn_point]
+    piece_lengths = piece_lengths[is_drawn]
+    piece_ends = numpy.cumsum(piece_lengths)
+    piece_starts = piece_ends - piece_lengths
+    if(len(piece_starts) == 0):
+      return
+    # complex numbers seen as pairs of coordinates, without copy
+    points = numpy.ascontiguousarray(image_values).view(float).reshape(-1, 2)
+    if(len(positions) < len(points)):
+      points = points[positions]
+    canvas_points = self._project_array_to_canvas(numpy, points)
+    is_vertical_piece = line_indexes[piece_starts] < nb_vertical_lines
+    for is_in_family in [ is_vertical_piece, ~ is_vertical_piece ]:
+      lines = [ canvas_points[start : end] for start, end in zip(piece_starts[is_in_family].tolist(), piece_ends[is_in_family].tolist()) ]
+      if(len(lines) > 0):
+        self._add_svgwrite_element(self.svgwrite_object.path(d = self._make_polylines_d_string(lines), style = self._make_svg_style_string()))
+
+  def _draw_pixel_mask(self, numpy, pixel_columns, pixel_rows, style_string):
+    # a rectangle with the style, seen through a mask made of an image of the pixels
+    import base64
+    left = int(pixel_columns.min())
+    top = int(pixel_rows.min())
+    width = int(pixel_columns.max()) + 1 - left
+    height = int(pixel_rows.max()) + 1 - top
+    mask_array = numpy.zeros((height, width), dtype = bool)
+    mask_array[pixel_rows - top, pixel_columns - left] = True
+    png_data = base64.b64encode(_encode_png_mask(numpy, mask_array)).decode('ascii')
+    self._nb_masks += 1
+    mask_id = f'mathsvg-mask-{self._nb_masks}'
+    mask = self.svgwrite_object.mask(id = mask_id, maskUnits = "userSpaceOnUse", x = left, y = top, width = width, height = height)
+    mask.add(self.svgwrite_object.image('data:image/png;base64,' + png_data, insert = (left, top), size = (width, height), style = "image-rendering : pixelated"))
+    defs = svgwrite.container.Defs()
+    defs.add(mask)
+    self._add_svgwrite_element(defs)
+    self._add_svgwrite_element(self.svgwrite_object.rect(insert = (left, top), size = (width, height), style = style_string, mask = f'url(#{mask_id})'))
+
+
 
   def _compute_autosmooth_control_vectors(self, point_coordinates, is_path_closed = False, vectors_relative_size = 0.3):
 
@@ -1019,6 +3460,7 @@ If ``is_closed`` is set to ``True`` the two endpoints of the curve will be joine
     return [ [ cv.real, cv.imag ] for cv in control_vectors ]
 
 
+  @_recorded_call()
   def draw_smoothly_interpolated_open_curve(self, points):
     """Draws a smooth open curve that interpolates the points given as parameter.
 
@@ -1035,12 +3477,12 @@ If ``is_closed`` is set to ``True`` the two endpoints of the curve will be joine
       image.save("draw-smoothly-interpolated-open-curve-example.svg")
     """
 
-    control_points = [ self.project_point_to_canvas(point) for point in points ]
+    control_points = self._project_points_to_canvas(points)
     control_vectors = self._compute_autosmooth_control_vectors(control_points, is_path_closed = False)
-    path_command = self._make_svg_path_M_and_C_command(control_points, control_vectors)
-    self.insert_svg_path_command(path_command)
+    self.draw_path(self._make_smooth_path(control_points, control_vectors))
     return
 
+  @_recorded_call()
   def draw_smoothly_interpolated_closed_curve(self, points):
     """Draws a smooth closed curve that interpolates the points given as parameter.
 
@@ -1055,11 +3497,9 @@ If ``is_closed`` is set to ``True`` the two endpoints of the curve will be joine
       image.save("draw-smoothly-interpolated-closed-curve-example.svg")
     """
 
-    control_points = [ self.project_point_to_canvas(point) for point in points ]
+    control_points = self._project_points_to_canvas(points)
     control_vectors = self._compute_autosmooth_control_vectors(control_points, is_path_closed = True)
-    path_command = self._make_svg_path_M_and_C_command(control_points + [ control_points[0], ], control_vectors)
-    path_command += self._make_svg_path_Z_command()
-    self.insert_svg_path_command(path_command)
+    self.draw_path(self._make_smooth_path(control_points, control_vectors, is_path_closed = True))
     return
 
 
@@ -1075,6 +3515,7 @@ If ``is_closed`` is set to ``True`` the two endpoints of the curve will be joine
 
 
 
+  @_recorded_call(uses_random = True)
   def draw_planar_potato(self, center, inner_radius, outer_radius, nb_vertexes):
     """Draws some randomly generated smooth shape in the form of a smooth closed curve.
 
@@ -1098,21 +3539,17 @@ If ``is_closed`` is set to ``True`` the two endpoints of the curve will be joine
 
     complex_vertexes = self._generate_potato_complex_vertexes(z_center, inner_radius, outer_radius, nb_vertexes)
 
-    vertexes = [ self.project_complex_point_to_canvas(v) for v in complex_vertexes ]
+    vertexes = self._project_points_to_canvas([ [ v.real, v.imag ] for v in complex_vertexes ])
 
     control_vectors = self._compute_autosmooth_control_vectors(vertexes, is_path_closed = True)
 
-    vertexes.append(vertexes[0])
-    path_command = self._make_svg_path_M_and_C_command(vertexes, control_vectors)
-
-    path_command += self._make_svg_path_Z_command()
-
-    self.insert_svg_path_command(path_command)
+    self.draw_path(self._make_smooth_path(vertexes, control_vectors, is_path_closed = True))
 
     return
 
 
 
+  @_recorded_call(uses_random = True)
   def draw_random_wavy_line(self, start_point, end_point, wave_len, amplitude):
     """Draws a smooth line with randomly generated bumps perpendicularly to its direction.
 
@@ -1156,39 +3593,174 @@ If ``is_closed`` is set to ``True`` the two endpoints of the curve will be joine
 
     nb_points_to_compute = int(distance_from_start_to_end / wave_len)
 
-    points = [ self.project_point_to_canvas(start_point) ]
+    points = [ start_point ]
 
     for point_index in range(nb_points_to_compute):
       center = line_direction * wave_len * (point_index + 1) + z_start
       perturbation = random.uniform(- amplitude, amplitude) * perp_direction
       next_point = center + perturbation
-      points.append(self.project_complex_point_to_canvas(next_point))
+      points.append([ next_point.real, next_point.imag ])
 
-    points.append(self.project_complex_point_to_canvas(z_end))
+    points.append(end_point)
 
     #nb_points = len(points) # = nb_points_to_compute + 2
 
+    points = self._project_points_to_canvas(points)
+
     control_vectors = self._compute_autosmooth_control_vectors(points)
 
-    path_command = self._make_svg_path_M_and_C_command(points, control_vectors)
+    self.draw_path(self._make_smooth_path(points, control_vectors))
+
+    return
+
 
-    self.insert_svg_path_command(path_command)
+  @_recorded_call()
+  def draw_bezier_curve(self, path_points, control_vectors):
+    """Draws a curve made of cubic Bézier curves joining consecutive points, the control points being given by vectors attached to the points.
 
+    Each curve between two consecutive points uses two vectors: the first one is attached to its first point, the second one to its last point.
+
+    Args:
+      * ``path_points`` (``list``): coordinates of the points joined by the curve
+      * ``control_vectors`` (``list``): list of ``2 * (len(path_points) - 1)`` vectors
+
+    Example::
+
+      image = mathsvg.SvgImage(pixel_density = 20, view_window = (( -4, -4 ), ( 4, 4 )))
+      image.draw_bezier_curve([ [ -3, 0 ], [ 0, 0 ], [ 3, 0 ] ], [ [ 0, 2 ], [ -1, 0 ], [ 1, 0 ], [ 0, -2 ] ])
+      image.save("draw-bezier-curve-example.svg")
+    """
+    path = PathBuilder()
+    path.move_to(path_points[0])
+    curve_points = []
+    for point_index in range(1, len(path_points)):
+      start_point = path_points[point_index - 1]
+      end_point = path_points[point_index]
+      start_vector = control_vectors[2 * point_index - 2]
+      end_vector = control_vectors[2 * point_index - 1]
+      curve_points += [ [ start_point[0] + start_vector[0], start_point[1] + start_vector[1] ],
+                        [ end_point[0] + end_vector[0], end_point[1] + end_vector[1] ],
+                        end_point ]
+    path.curve_to(*curve_points)
+    self.draw_path(path)
     return
 
 
-#  #def draw_bezier_curve(self, path_points, control_vectors):
-#  #"""HERE...
-#  #"""
-#  #projected_points = [ self.project_point_to_canvas(p) for p in path_points ]
-#  #projected_vectors = [ self.project_vector_to_canvas(v) for v in control_vectors ]
-#  ## HERE...
-#  ## TODO: need to attach the vector to the points
-#  #path_command = self._make_svg_path_M_and_C_command(projected_points, projected_vectors)
-#  #self.insert_svg_path_command(path_command)
-#  #return
+  @_recorded_call()
+  def draw_path(self, path):
+    """Draws a path made with a ``PathBuilder`` as a single SVG path element, with the current style options.
+
+    Args:
+      * ``path`` (``PathBuilder``): the path to draw
+
+    Example::
+
+      image = mathsvg.SvgImage(pixel_density = 20, view_window = (( -4, -4 ), ( 4, 4 )))
+      path = mathsvg.PathBuilder().move_to((-2, -2)).line_to((2, -2), (2, 2)).quad_to((0, 3), (-2, 2)).close()
+      image.draw_path(path)
+      image.save("draw-path-example.svg")
+    """
+    d_string = self._make_svg_path_d_string(path)
+    if(len(d_string) == 0):
+      return
+    element = self.svgwrite_object.path(d = d_string, style = self._make_svg_style_string())
+    self._add_svgwrite_element(element)
+
+  def _make_polylines_d_string(self, canvas_points):
+    # canvas_points: array of shape (nb_polylines, nb_points, 2), or list of arrays of shape (nb_points, 2)
+    subpaths = []
+    if(hasattr(canvas_points, 'reshape')):
+      rows = canvas_points.reshape(len(canvas_points), -1).tolist()
+    else:
+      rows = [ points.reshape(-1).tolist() for points in canvas_points ]
+    for coordinates in rows:
+      point_strings = [ f'{x}, {y}' for x, y in zip(coordinates[0 : : 2], coordinates[1 : : 2]) ]
+      subpaths.append('M ' + point_strings[0] + ' L ' + ' '.join(point_strings[1 : ]))
+    return ' '.join(subpaths)
+
+  def _draw_line_segment_batch(self, numpy, start_points, end_points):
+    # all the segments in one path element, start_points and end_points: arrays of shape (n, 2)
+    if(len(start_points) == 0):
+      return
+    canvas_points = self._project_array_to_canvas(numpy, numpy.stack([ start_points, end_points ], axis = 1))
+    self._add_svgwrite_element(self.svgwrite_object.path(d = self._make_polylines_d_string(canvas_points), style = self._make_svg_style_string()))
+
+  @_recorded_call()
+  def draw_straight_brush(self, start_point, end_point, max_length = 1., smallest_interval = 0.0003, density = 0.5):
+    """Draws a straight brush: line segments (hairs) orthogonal to a base segment, whose lengths make a Cantor-like pattern. The hairs are drawn as one SVG path (numpy has to be installed).
+
+    The two ends of the base have hairs of length ``max_length``. Between two consecutive hairs, new hairs are added at distances ``density``, ``density^2``, etc. times half of their distance from each of them, with lengths going to 0 in the middle. This is repeated between all the consecutive hairs until they are closer than ``smallest_interval``.
+
+    Args:
+      * ``start_point``, ``end_point`` (``tuple``): ends of the base, the hairs are on the left side of the base (going from ``start_point`` to ``end_point``)
+      * ``max_length`` (``float``): length of the longest hairs
+      * ``smallest_interval`` (``float``): smallest distance between the hairs, relative to the length of the base
+      * ``density`` (``float``): between ``0`` and ``1``, larger values give hairs closer to each other
+
+    Example::
+
+      image = mathsvg.SvgImage(pixel_density = 800, view_window = (( -0.1, -0.1 ), ( 1.1, 1.1 )))
+      image.draw_straight_brush([ 0, 0 ], [ 1, 0 ])
+      image.save("straight-brush-example.svg")
+    """
+    numpy = _import_numpy()
+    positions, lengths = _compute_brush_hairs(numpy, smallest_interval, density)
+    start_point = numpy.asarray(start_point, dtype = float)
+    base_vector = numpy.asarray(end_point, dtype = float) - start_point
+    normal_vector = numpy.array([ - base_vector[1], base_vector[0] ]) / math.hypot(*base_vector)
+    hair_starts = start_point + positions[:, None] * base_vector
+    self._draw_line_segment_batch(numpy, hair_starts, hair_starts + (max_length * lengths)[:, None] * normal_vector)
+
+  def _draw_circular_brush(self, numpy, center, inner_radius, max_length, smallest_interval, density):
+    # hairs of a straight brush wrapped around a circle, the hair at the end of the base is the same as the first one
+    positions, lengths = _compute_brush_hairs(numpy, smallest_interval, density)
+    positions = positions[ : -1 ]
+    lengths = lengths[ : -1 ]
+    directions = numpy.stack([ numpy.cos(the_tau * positions), numpy.sin(the_tau * positions) ], axis = -1)
+    center = numpy.asarray(center, dtype = float)
+    hair_starts = center + inner_radius * directions
+    self._draw_line_segment_batch(numpy, hair_starts, hair_starts + (max_length * lengths)[:, None] * directions)
+
+  @_recorded_call()
+  def draw_cantor_bouquet(self, center, radius = 1., smallest_interval = 0.0003, density = 0.5):
+    """Draws a Cantor bouquet: the hairs of a straight brush (see ``draw_straight_brush``) going out of a point in all directions.
+
+    Args:
+      * ``center`` (``tuple``): point from where the hairs start
+      * ``radius`` (``float``): length of the longest hairs
+      * ``smallest_interval`` (``float``): smallest angle between the hairs, as a fraction of a whole turn
+      * ``density`` (``float``): between ``0`` and ``1``, larger values give hairs closer to each other
+
+    Example::
+
+      image = mathsvg.SvgImage(pixel_density = 800, view_window = (( -1.1, -1.1 ), ( 1.1, 1.1 )))
+      image.draw_cantor_bouquet([ 0, 0 ])
+      image.save("cantor-bouquet-example.svg")
+    """
+    self._draw_circular_brush(_import_numpy(), center, 0., radius, smallest_interval, density)
+
+  @_recorded_call()
+  def draw_hairy_circle(self, center, radius, hair_length, smallest_interval = 0.0003, density = 0.5):
+    """Draws a circle with the hairs of a straight brush (see ``draw_straight_brush``) on its outside.
+
+    Args:
+      * ``center`` (``tuple``): center of the circle
+      * ``radius`` (``float``): radius of the circle
+      * ``hair_length`` (``float``): length of the longest hairs
+      * ``smallest_interval`` (``float``): smallest angle between the hairs, as a fraction of a whole turn
+      * ``density`` (``float``): between ``0`` and ``1``, larger values give hairs closer to each other
+
+    Example::
+
+      image = mathsvg.SvgImage(pixel_density = 800, view_window = (( -1.1, -1.1 ), ( 1.1, 1.1 )))
+      image.draw_hairy_circle([ 0, 0 ], 0.5, 0.5)
+      image.save("hairy-circle-example.svg")
+    """
+    self.draw_circle(center, radius)
+    self._draw_circular_brush(_import_numpy(), center, radius, hair_length, smallest_interval, density)
 
 
+  @_recorded_call()
   def put_text(self, text, text_position, font_size = None, units = 'math'):
     """Insert text on the canvas at the given position
 
@@ -1221,11 +3793,14 @@ If ``is_closed`` is set to ``True`` the two endpoints of the curve will be joine
       font_size = self.font_size_svgpx
     else:
       font_size = self._convert_length_to_svg(units, font_size)
+    # rough estimate of the size of the text: its characters are less wide than high
+    self._extend_bounding_box([ text_canvas_position, [ text_canvas_position[0] + 0.6 * font_size * len(text), text_canvas_position[1] - font_size ] ])
     t = self.svgwrite_object.text(text, insert = text_canvas_position, font_size = font_size)
-    self.svgwrite_object.add(t)
+    self._add_svgwrite_element(t)
     return
 
 
+  @_recorded_call()
   def insert_svg_path_command(self, svg_path_command):
     """Insert a path command given in the form of a string into the SVG.
 
@@ -1260,7 +3835,7 @@ If ``is_closed`` is set to ``True`` the two endpoints of the curve will be joine
     # so that really anything can be added - no checking
     path = self.svgwrite_object.path(d = d_string,
                                      style = self._make_svg_style_string())
-    self.svgwrite_object.add(path)
+    self._add_svgwrite_element(path)
 
 
 
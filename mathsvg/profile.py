@@ -0,0 +1,259 @@
+# Author:  alexn11 (alexn11.gh@gmail.com)
+# Created: 2026-10-19
+# Copyright (C) 2026 Alexandre De Zotti
+# License: MIT License
+
+
+"""
+Profile a script using mathsvg and print where the time goes.
+
+Usage::
+
+  python -m mathsvg.profile [options] script.py [script arguments]
+
+The script is run as if called with ``python script.py [script arguments]``. The report has two parts:
+  * the time spent in each method of ``SvgImage``: number of calls, time spent in the method itself and cumulated time (including the functions it calls)
+  * the time spent in the user code (the script and the modules it imports), in the mathsvg library, in svgwrite and in the rest of Python
+
+By default the script runs under ``cProfile``. With ``--sampling``, a sampling profiler (included in this module) is used instead, it has a much smaller overhead but only gives approximate times.
+
+Options:
+  * ``--sampling``: use the sampling profiler
+  * ``--interval SECONDS``: time between two samples (default: ``0.001``)
+  * ``--collapsed FILE``: write the sampled stacks in the collapsed format used by flamegraph tools (implies ``--sampling``)
+  * ``--pstats FILE``: save the ``cProfile`` statistics (can be read with the ``pstats`` module)
+  * ``--limit N``: number of methods listed (default: ``30``)
+"""
+
+
+import argparse
+import collections
+import cProfile
+import functools
+import importlib.util
+import os
+import runpy
+import sys
+import threading
+import time
+
+
+library_path = os.path.dirname(os.path.abspath(__file__))
+profile_module_file = os.path.abspath(__file__)
+mathsvg_module_file = os.path.join(library_path, "mathsvg.py")
+python_paths = tuple(sorted({ os.path.abspath(p) for p in (sys.prefix, sys.exec_prefix, sys.base_prefix, os.path.dirname(os.__file__)) }))
+
+categories = ("user", "mathsvg", "svgwrite", "python")
+
+
+@functools.lru_cache(maxsize = None)
+def get_svgwrite_path():
+  # found without importing svgwrite
+  return os.path.dirname(os.path.abspath(importlib.util.find_spec("svgwrite").origin))
+
+
+@functools.lru_cache(maxsize = None)
+def get_svgimage_method_names():
+  from mathsvg.mathsvg import SvgImage
+  return frozenset(name for name in dir(SvgImage) if callable(getattr(SvgImage, name)))
+
+
+def classify_file(file_name):
+  """Returns the category of the code in a file: ``"user"``, ``"mathsvg"``, ``"svgwrite"`` or ``"python"`` (standard library, other installed packages, built-in functions and this module, which runs the script)."""
+  if(file_name.startswith(("<", "~"))):
+    return "python"
+  file_name = os.path.abspath(file_name)
+  if(file_name == profile_module_file):
+    return "python"
+  if(file_name.startswith(library_path + os.sep)):
+    return "mathsvg"
+  if(file_name.startswith(get_svgwrite_path() + os.sep)):
+    return "svgwrite"
+  if(file_name.startswith(python_paths)):
+    return "python"
+  return "user"
+
+
+def is_svgimage_method(file_name, function_name):
+  return (function_name in get_svgimage_method_names()) and (os.path.abspath(file_name) == mathsvg_module_file)
+
+
+def run_script(script_path, script_arguments):
+  """Runs a script as the main module, with the given command line arguments."""
+  script_path = os.path.abspath(script_path)
+  saved_argv = sys.argv
+  saved_path = sys.path[:]
+  sys.argv = [ script_path ] + list(script_arguments)
+  sys.path.insert(0, os.path.dirname(script_path))
+  try:
+    runpy.run_path(script_path, run_name = "__main__")
+  finally:
+    sys.argv = saved_argv
+    sys.path[:] = saved_path
+
+
+class SamplingProfiler:
+  """Records the call stack of a thread at regular intervals (from another thread).
+
+  The samples are kept in ``self.stacks``, a ``collections.Counter`` whose keys are tuples of ``(file_name, function_name)`` from the outermost to the innermost frame.
+  If ``root_code`` is the code object of a function (for example ``runpy.run_path.__code__``), only the samples taken in the code that this function calls through functions of its own file (the script run by ``runpy.run_path``) are kept, without these frames and the ones above them.
+  """
+
+  def __init__(self, interval = 0.001, thread_id = None, root_code = None):
+    self.interval = interval
+    self.thread_id = threading.get_ident() if thread_id is None else thread_id
+    self.root_code = root_code
+    self.stacks = collections.Counter()
+    self._stop_event = threading.Event()
+    self._thread = None
+    self._saved_switch_interval = None
+
+  def start(self):
+    # the sampling thread has to get the GIL often enough
+    self._saved_switch_interval = sys.getswitchinterval()
+    sys.setswitchinterval(min(self._saved_switch_interval, self.interval))
+    self._thread = threading.Thread(target = self._sample, name = "mathsvg-sampler", daemon = True)
+    self._thread.start()
+
+  def stop(self):
+    self._stop_event.set()
+    self._thread.join()
+    sys.setswitchinterval(self._saved_switch_interval)
+
+  def _sample(self):
+    while(not self._stop_event.wait(self.interval)):
+      frame = sys._current_frames().get(self.thread_id)
+      stack = []
+      while((frame is not None) and (frame.f_code is not self.root_code)):
+        stack.append((frame.f_code.co_filename, frame.f_code.co_name))
+        frame = frame.f_back
+      if(self.root_code is not None):
+        nb_frames = len(stack)
+        while((len(stack) > 0) and (stack[-1][0] == self.root_code.co_filename)):
+          stack.pop()
+        if((frame is None) or (len(stack) == 0) or (len(stack) == nb_frames)):
+          continue
+      stack.reverse()
+      self.stacks[tuple(stack)] += 1
+
+
+def make_report_from_cprofile(stats):
+  """Computes the times per ``SvgImage`` method and per category from ``pstats.Stats``.
+
+  Returns a tuple ``(methods, category_times)``: ``methods`` maps each method name to a list ``[ nb_calls, own_time, cumulated_time ]`` and ``category_times`` maps each category to a time in seconds.
+  Time spent in built-in functions is counted in the category of their callers.
+  """
+  methods = {}
+  category_times = dict.fromkeys(categories, 0.)
+  for (file_name, line_number, function_name), (primitive_calls, nb_calls, own_time, cumulated_time, callers) in stats.stats.items():
+    if(is_svgimage_method(file_name, function_name)):
+      method = methods.setdefault(function_name, [ 0, 0., 0. ])
+      method[0] += nb_calls
+      method[1] += own_time
+      method[2] += cumulated_time
+    if(file_name == "~"):
+      for (caller_file_name, caller_line, caller_name), caller_data in callers.items():
+        category_times[classify_file(caller_file_name)] += caller_data[2]
+      attributed_time = sum(caller_data[2] for caller_data in callers.values())
+      category_times["python"] += max(own_time - attributed_time, 0.)
+    else:
+      category_times[classify_file(file_name)] += own_time
+  return methods, category_times
+
+
+def make_report_from_samples(stacks, interval):
+  """Same as ``make_report_from_cprofile`` from the samples of a ``SamplingProfiler`` (the number of calls is replaced by the number of samples).
+
+  The own time of a method is the time when it is the innermost ``SvgImage`` method of the stack (including the time spent in svgwrite or in built-in functions called by the method).
+  """
+  methods = {}
+  category_times = dict.fromkeys(categories, 0.)
+  for stack, nb_samples in stacks.items():
+    if(len(stack) == 0):
+      continue
+    duration = nb_samples * interval
+    category_times[classify_file(stack[-1][0])] += duration
+    svgimage_methods = [ function_name for file_name, function_name in stack if is_svgimage_method(file_name, function_name) ]
+    for function_name in set(svgimage_methods):
+      method = methods.setdefault(function_name, [ 0, 0., 0. ])
+      method[0] += nb_samples
+      method[2] += duration
+    if(len(svgimage_methods) > 0):
+      methods[svgimage_methods[-1]][1] += duration
+  return methods, category_times
+
+
+def write_collapsed_stacks(stacks, output_file):
+  """Writes stacks in the collapsed format: one line per stack with the frames separated by ``;`` followed by the number of samples."""
+  for stack, nb_samples in sorted(stacks.items()):
+    frames = [ f'{function_name} ({os.path.basename(file_name)})' for file_name, function_name in stack ]
+    output_file.write(';'.join(frames) + f' {nb_samples}\n')
+
+
+def print_report(methods, category_times, total_time, limit = 30, calls_header = "calls", output_file = None):
+  if(output_file is None):
+    output_file = sys.stdout
+  print(f'Total time: {total_time:.3f} s\n', file = output_file)
+  print(f'{"SvgImage method":48} {calls_header:>10} {"own (s)":>10} {"cumul. (s)":>10}', file = output_file)
+  sorted_methods = sorted(methods.items(), key = lambda item : item[1][2], reverse = True)
+  for name, (nb_calls, own_time, cumulated_time) in sorted_methods[ : limit ]:
+    print(f'{name:48} {nb_calls:>10} {own_time:>10.3f} {cumulated_time:>10.3f}', file = output_file)
+  print(f'\n{"Time by origin":48} {"time (s)":>10} {"%":>10}', file = output_file)
+  category_total = max(sum(category_times.values()), 1e-12)
+  for category in categories:
+    category_time = category_times[category]
+    print(f'{category:48} {category_time:>10.3f} {100 * category_time / category_total:>10.1f}', file = output_file)
+
+
+def parse_command_line(arguments):
+  parser = argparse.ArgumentParser(prog = "python -m mathsvg.profile", description = "Profile a script using mathsvg.")
+  parser.add_argument("--sampling", action = "store_true", help = "use a sampling profiler instead of cProfile")
+  parser.add_argument("--interval", type = float, default = 0.001, help = "time between two samples in seconds (default: 0.001)")
+  parser.add_argument("--collapsed", default = None, help = "write the sampled stacks in collapsed format into this file (implies --sampling)")
+  parser.add_argument("--pstats", default = None, help = "save the cProfile statistics into this file")
+  parser.add_argument("--limit", type = int, default = 30, help = "number of methods listed (default: 30)")
+  parser.add_argument("script", help = "script to profile")
+  parser.add_argument("script_arguments", nargs = argparse.REMAINDER, help = "arguments passed to the script")
+  return parser.parse_args(arguments)
+
+
+def main(arguments = None):
+  """Entry point of ``python -m mathsvg.profile``, ``arguments`` defaults to ``sys.argv[1:]``."""
+  arguments = parse_command_line(sys.argv[1:] if arguments is None else arguments)
+  do_sample = arguments.sampling or (arguments.collapsed is not None)
+
+  start_time = time.perf_counter()
+  if(do_sample):
+    # the frames of this module and of runpy are not recorded
+    profiler = SamplingProfiler(interval = arguments.interval, root_code = runpy.run_path.__code__)
+    profiler.start()
+    try:
+      run_script(arguments.script, arguments.script_arguments)
+    finally:
+      profiler.stop()
+    total_time = time.perf_counter() - start_time
+    methods, category_times = make_report_from_samples(profiler.stacks, arguments.interval)
+    print_report(methods, category_times, total_time, limit = arguments.limit, calls_header = "samples")
+    if(arguments.collapsed is not None):
+      with open(arguments.collapsed, "w") as collapsed_file:
+        write_collapsed_stacks(profiler.stacks, collapsed_file)
+  else:
+    # pstats (with its dependencies) is slow to import
+    import pstats
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+      run_script(arguments.script, arguments.script_arguments)
+    finally:
+      profiler.disable()
+    total_time = time.perf_counter() - start_time
+    stats = pstats.Stats(profiler)
+    methods, category_times = make_report_from_cprofile(stats)
+    print_report(methods, category_times, total_time, limit = arguments.limit)
+    if(arguments.pstats is not None):
+      stats.dump_stats(arguments.pstats)
+
+
+if(__name__ == "__main__"):
+  main()
+
@@ -3,7 +3,6 @@
 # Copyright (C) 2021 Alexandre De Zotti
 # License: MIT License
 
-import math
 import mathsvg
 
 # ---------------------------------------------------------------------
@@ -43,35 +42,18 @@ def draw_graph(g, eval_map_function):
   g.draw_function_graph(eval_map_function, 0, 1, 50)
   
 def draw_iterations(g, eval_map_function, x0, n):
-
-  def draw_mid_point_arrows(x, x_next, both=True):
-    if(x_next > x):
-      arrow_direction_angles = (0.5*math.pi, 0)
-    else:
-      arrow_direction_angles = (-0.5*math.pi, math.pi)
-    g.draw_arrow_tip((x, mid_value), arrow_direction_angles[0])
-    if(both):
-      g.draw_arrow_tip((mid_value, x_next), arrow_direction_angles[1])
-
-  xs = [ x0 ]
-  for i in range(n):
-    xs.append(eval_map_function(xs[-1]))
-
   g.set_dash_dash_structure(12, 4, units='svg')
   g.set_dash_mode("dash")
   g.set_svg_options(stroke_width=iterations_stroke_w, units='svg')
   g.set_arrow_options(width = iteration_arrow_rel_size * arrow_size, curvature = 0, units='svg')
   g.set_point_size(0.01)
 
-  g.draw_line_segment((x0, 0), (x0, x0))
-  for i, x in enumerate(xs[:-2]):
-    x_next = xs[i+1]
-    g.draw_polyline([(x, x), (x, x_next), (x_next, x_next)])
-    mid_value = 0.5 * (x + x_next)
-    draw_mid_point_arrows(x, x_next)
-  g.draw_polyline([ (xs[-2], xs[-2]), (xs[-2], xs[-1]) ])
-  g.draw_point((xs[-2], xs[-1]))
-  draw_mid_point_arrows(xs[-2], xs[-1], both=False)
+  g.draw_cobweb(eval_map_function, x0, n, arrow_tips=True)
+
+  x = x0
+  for i in range(n - 1):
+    x = eval_map_function(x)
+  g.draw_point((x, eval_map_function(x)))
   g.reset_dash_and_dot_structures()
 
 # ---------------------------------------------------------------------
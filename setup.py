@@ -31,5 +31,9 @@ setuptools.setup(name = "mathsvg",
                  ],
                  install_requires = [
                       "svgwrite",
-                 ])
+                 ],
+                 extras_require = {
+                      # for the methods drawing many shapes at once
+                      "numpy": [ "numpy" ],
+                 })
 
@@ -0,0 +1,112 @@
+# Author:  alexn11 (alexn11.gh@gmail.com)
+# Created: 2026-10-19
+# Copyright (C) 2026 Alexandre De Zotti
+# License: MIT License
+
+"""Runs the example scripts and compares the images they produce with the models.
+
+The scripts are run in a pool of worker processes, each one in its own temporary directory, so that several of them can run at the same time (also when the tests themselves are run in parallel).
+Each image is first compared with the SVG model using ``mathsvg.compare``. Only when they differ, the image is rasterized (in memory) and compared visually with the model, the decoded models are cached by each worker.
+"""
+
+import concurrent.futures
+import functools
+import glob
+import io
+import multiprocessing
+import os
+import runpy
+import sys
+import tempfile
+
+import matplotlib.pylab as pylab
+import numpy
+
+import mathsvg.compare
+
+
+def rasterize_svg(svg_data):
+  # only needed when the structural comparison fails
+  import cairosvg
+  png_data = cairosvg.svg2png(bytestring = svg_data)
+  return pylab.imread(io.BytesIO(png_data), format = "png")
+
+
+@functools.lru_cache(maxsize = None)
+def load_model_image(models_path, image_name):
+  # models are given as SVG files, PNG files (generated by generate-pngs.py) are used when present
+  png_file_name = os.path.join(models_path, image_name + ".png")
+  if(os.path.exists(png_file_name)):
+    return pylab.imread(png_file_name)
+  with open(os.path.join(models_path, image_name + ".svg"), "rb") as svg_file:
+    return rasterize_svg(svg_file.read())
+
+
+def compare_with_model(svg_data, models_path, image_name):
+  """Returns ``None`` if the image is close to the model, otherwise a message describing the difference."""
+  model_svg_file_name = os.path.join(models_path, image_name + ".svg")
+  structural_difference = None
+  if(os.path.exists(model_svg_file_name)):
+    structural_difference = mathsvg.compare.compare_svg(svg_data, model_svg_file_name)
+    if(structural_difference is None):
+      return None
+  model_image = load_model_image(models_path, image_name)
+  image = rasterize_svg(svg_data)
+  if(image.shape != model_image.shape):
+    return f'image sizes mismatch ({image.shape} instead of {model_image.shape}), first structural difference: {structural_difference}'
+  if(not numpy.allclose(model_image, image)):
+    return f'image very different from model (max difference: {numpy.max(numpy.abs(model_image - image))}), first structural difference: {structural_difference}'
+  return None
+
+
+def run_script(script_path):
+  """Runs a script in a new temporary directory and returns the content of the SVG files it saved (as a ``dict`` file name -> ``bytes``)."""
+  current_dir = os.getcwd()
+  saved_argv = sys.argv
+  with tempfile.TemporaryDirectory(prefix = "mathsvg-example-") as run_dir:
+    os.chdir(run_dir)
+    sys.argv = [ script_path ]
+    try:
+      runpy.run_path(script_path, run_name = "__main__")
+      svg_files = {}
+      for svg_file_name in glob.glob("*.svg"):
+        with open(svg_file_name, "rb") as svg_file:
+          svg_files[svg_file_name] = svg_file.read()
+    finally:
+      sys.argv = saved_argv
+      os.chdir(current_dir)
+  return svg_files
+
+
+def check_script(script_path, models_path):
+  """Runs a script and compares each saved image with the model of the same name, returns a ``dict`` file name -> ``None`` or error message."""
+  return { svg_file_name : compare_with_model(svg_data, models_path, svg_file_name[ : -4 ])
+           for svg_file_name, svg_data in run_script(script_path).items() }
+
+
+class ExampleRunner:
+  """Checks example scripts in worker processes, the result of each script is computed once and kept."""
+
+  def __init__(self, models_path, max_workers = None):
+    self.models_path = models_path
+    self.max_workers = max_workers
+    self._executor = None
+    self._results = {}
+
+  def submit(self, script_paths):
+    if(self._executor is None):
+      # workers start from a new interpreter: nothing left over from the tests (threads, random state...)
+      self._executor = concurrent.futures.ProcessPoolExecutor(max_workers = self.max_workers, mp_context = multiprocessing.get_context("spawn"))
+    for script_path in script_paths:
+      script_path = os.path.abspath(script_path)
+      if(script_path not in self._results):
+        self._results[script_path] = self._executor.submit(check_script, script_path, self.models_path)
+
+  def get_result(self, script_path):
+    self.submit([ script_path ])
+    return self._results[os.path.abspath(script_path)].result()
+
+  def shutdown(self):
+    if(self._executor is not None):
+      self._executor.shutdown()
+      self._executor = None
@@ -5,19 +5,30 @@
 
 import unittest
 
+import base64
+import contextlib
+import gc
+import glob
+import io
+import math
 import os
+import random
 import re
 import subprocess
 import sys
 import tempfile
+import types
 
-import cairosvg
 import matplotlib.pylab as pylab
 import numpy
 import numpy.linalg
 
 sys.path.insert(0, os.path.abspath(os.path.pardir))
 import mathsvg
+import mathsvg.compare
+import mathsvg.profile
+
+import example_runner
 
 
 # TODO
@@ -34,20 +45,30 @@ default_drawing_options = "style *= *\"fill *: *.*; *stroke *: *black; *stroke-w
 number_list_re_pattern = r'[0-9\. ,\-]*'
 
 
+# the example scripts are all started at the first check, then run in parallel
+script_checker = example_runner.ExampleRunner(test_models_path)
+
+def get_example_results(script_path):
+  script_checker.submit(sorted(glob.glob(os.path.join(test_scripts_path, "*.py"))))
+  return script_checker.get_result(script_path)
+
+def tearDownModule():
+  # the worker processes would otherwise stay alive until the interpreter exits
+  script_checker.shutdown()
+
+
 def check_actual_image(test_object, svg_file_name, image_model_file_name, fail_message, max_dist = 0.001):
-  converted_file_name = "test.png"
-  f = open(svg_file_name, "rb")
-  cairosvg.svg2png(file_obj = f, write_to = converted_file_name)
-  f.close()
+  with open(svg_file_name, "rb") as svg_file:
+    svg_data = svg_file.read()
+  models_path, model_file_name = os.path.split(image_model_file_name)
+  error = example_runner.compare_with_model(svg_data, models_path, os.path.splitext(model_file_name)[0])
+  test_object.assertIsNone(error, f'{fail_message} ({error})')
 
-  model_image = pylab.imread(image_model_file_name)
-  converted_image = pylab.imread(converted_file_name)
-  test_object.assertEqual(converted_image.shape, model_image.shape, f'{fail_message} (image sizes mismatch)')
 
-  #try :
-  test_object.assertTrue(numpy.allclose(model_image, converted_image))  
-  #else :
-  os.remove(converted_file_name)
+def check_example_image(test_object, example_results, image_name, fail_message):
+  test_object.assertIn(image_name + ".svg", example_results, f'{fail_message} (image not saved)')
+  error = example_results[image_name + ".svg"]
+  test_object.assertIsNone(error, f'{fail_message} ({error})')
 
 
 
@@ -60,12 +81,8 @@ def check_file_content(test_object, file_name, regex, fail_message):
 
 
 def test_simple_example(test_object, example_name, example_dir, error_message_example_name):
-  subprocess.check_call([ "python3", os.path.join(example_dir, example_name + ".py") ])
-  check_actual_image(test_object,
-                     example_name + ".svg",
-                     os.path.join(test_models_path, example_name + ".png"),
-                     f'{error_message_example_name} example image very different from model')
-  os.remove(example_name + ".svg")
+  example_results = get_example_results(os.path.join(example_dir, example_name + ".py"))
+  check_example_image(test_object, example_results, example_name, f'{error_message_example_name} example image very different from model')
 
 def clean_files(file_list):
   if(type(file_list) is str):
@@ -74,6 +91,12 @@ def clean_files(file_list):
     if(os.path.exists(f)):
       os.remove(f)
 
+def get_path_lines(svg_string, by_path = False):
+  # the subpaths of the path elements of a SVG document as arrays of points of shape (nb_points, 2), in one list or in one list for each path
+  path_lines = [ [ numpy.array([ float(value) for value in re.findall(r'[-+0-9.e]+', subpath) ]).reshape(-1, 2) for subpath in d_string.split('M ')[1 : ] ]
+                 for d_string in re.findall(r'<path d="([^"]*)"', svg_string) ]
+  return path_lines if(by_path) else [ line for lines in path_lines for line in lines ]
+
 
 def prepare_simple_canvas(window_size = 1., pixel_density = 100) :
   return mathsvg.SvgImage(view_window = ((0, 0), (window_size, window_size)), pixel_density = pixel_density)
@@ -103,18 +126,961 @@ class TestMain(unittest.TestCase):
      
   def test_multiple_save(self):
     output_files = [ "save-1.svg", "save-2.svg" ]
-    clean_files(output_files)
-    subprocess.check_call([ "python3", os.path.join(test_scripts_path, "multiple-save.py") ])
-    self.assertTrue(os.path.exists(output_files[0]), "multiple-save failed at first save")
-    self.assertTrue(os.path.exists(output_files[1]), "multiple-save failed at second save")
-    clean_files(output_files)
+    saved_files = example_runner.run_script(os.path.join(test_scripts_path, "multiple-save.py"))
+    self.assertIn(output_files[0], saved_files, "multiple-save failed at first save")
+    self.assertIn(output_files[1], saved_files, "multiple-save failed at second save")
     
   def test_multiple_save_example(self):
-    output_files = [ "save-1", "save-2" ]
-    subprocess.check_call([ "python3", os.path.join(test_scripts_path, "multiple-save.py") ])
-    check_actual_image(self, output_files[0] + ".svg", os.path.join(test_models_path, output_files[0] + ".png"), "multiple-save example: first saved image very different from model")
-    check_actual_image(self, output_files[1] + ".svg", os.path.join(test_models_path, output_files[1] + ".png"), "multiple-save example: second saved image very different from model")
-    clean_files([ f + ".svg" for f in output_files ])
+    example_results = get_example_results(os.path.join(test_scripts_path, "multiple-save.py"))
+    check_example_image(self, example_results, "save-1", "multiple-save example: first saved image very different from model")
+    check_example_image(self, example_results, "save-2", "multiple-save example: second saved image very different from model")
+
+  def test_save_async(self):
+    output_files = [ "test-async.svg", "test-sync.svg" ]
+    clean_files(output_files)
+    image = mathsvg.SvgImage(pixel_density = 100, view_window = ( (-4, -4), (4, 4) ))
+    image.draw_arrow([ -2, -2 ], [ 2, 2 ])
+    future = image.save_async(output_files[0])
+    image.save(output_files[1])
+    image.draw_circle([ 0, 0 ], 1)
+    self.assertEqual(output_files[0], future.result())
+    mathsvg.flush_pending_saves()
+    with open(output_files[0]) as f0, open(output_files[1]) as f1:
+      self.assertEqual(f1.read(), f0.read(), "asynchronous save differs from synchronous save")
+    clean_files(output_files)
+
+  def test_save_async_overwrite_error(self):
+    clean_files(["test.svg",])
+    image = mathsvg.SvgImage(pixel_density = 100, view_window = ( (-4, -4), (4, 4) ))
+    image.save("test.svg")
+    future = image.save_async("test.svg")
+    self.assertIsInstance(future.exception(), Exception)
+    image.save_async("test.svg", do_overwrite = True).result()
+    os.remove("test.svg")
+
+  def test_incremental_save(self):
+    clean_files(["test.svg",])
+    image = mathsvg.SvgImage(pixel_density = 100, view_window = ( (-4, -4), (4, 4) ))
+    image.draw_arrow([ -2, -2 ], [ 2, 2 ])
+    image.save("test.svg")
+    serialized_elements = []
+    serialize_element = image._serialize_svgwrite_element
+    image._serialize_svgwrite_element = lambda element : serialized_elements.append(element) or serialize_element(element)
+    image.draw_circle([ 0, 0 ], 1)
+    image.draw_point([ 1, 1 ])
+    image.save("test.svg", do_overwrite = True)
+    # the two new elements and the defs
+    self.assertEqual(3, len(serialized_elements))
+    with open("test.svg") as svg_file:
+      content = svg_file.read()
+    self.assertEqual(content, '<?xml version="1.0" encoding="utf-8" ?>\n' + image.svgwrite_object.tostring())
+    os.remove("test.svg")
+
+  def test_fork(self):
+    image = mathsvg.SvgImage(pixel_density = 100, view_window = ( (-4, -4), (4, 4) ))
+    image.draw_arrow([ -2, -2 ], [ 2, 2 ])
+    forked_image = image.fork()
+    forked_image.set_svg_options(stroke_color = "red")
+    forked_image.draw_circle([ 0, 0 ], 1)
+    image.draw_point([ 1, 1 ])
+    self.assertEqual('black', image.stroke_color)
+    self.assertSequenceEqual([ 'defs', 'line', 'path', 'circle' ], [ xml.tag for xml in image.svgwrite_object.get_xml() ])
+    self.assertSequenceEqual([ 'defs', 'line', 'path', 'ellipse' ], [ xml.tag for xml in forked_image.svgwrite_object.get_xml() ])
+    forked_forked_image = forked_image.fork()
+    forked_forked_image.draw_point([ 1, 1 ])
+    self.assertSequenceEqual([ 'defs', 'line', 'path', 'ellipse', 'circle' ], [ xml.tag for xml in forked_forked_image.svgwrite_object.get_xml() ])
+    self.assertEqual(4, len(forked_image.svgwrite_object.elements))
+
+  def test_fork_reuses_serialization(self):
+    output_files = [ "test.svg", "test-fork.svg" ]
+    clean_files(output_files)
+    image = mathsvg.SvgImage(pixel_density = 100, view_window = ( (-4, -4), (4, 4) ))
+    image.draw_arrow([ -2, -2 ], [ 2, 2 ])
+    image.save(output_files[0])
+    forked_image = image.fork()
+    serialized_elements = []
+    serialize_element = forked_image._serialize_svgwrite_element
+    forked_image._serialize_svgwrite_element = lambda element : serialized_elements.append(element) or serialize_element(element)
+    forked_image.draw_circle([ 0, 0 ], 1)
+    forked_image.save(output_files[1])
+    # the new circle and the defs
+    self.assertEqual(2, len(serialized_elements))
+    with open(output_files[1]) as svg_file:
+      self.assertEqual(svg_file.read(), '<?xml version="1.0" encoding="utf-8" ?>\n' + forked_image.svgwrite_object.tostring())
+    clean_files(output_files)
+
+  def test_in_memory_output(self):
+    clean_files(["test.svg",])
+    image = mathsvg.SvgImage(pixel_density = 100, view_window = ( (-4, -4), (4, 4) ))
+    image.draw_arrow([ -2, -2 ], [ 2, 2 ])
+    image.put_text("é", (0, 0))
+    image.save("test.svg")
+    with open("test.svg", "rb") as svg_file:
+      content = svg_file.read()
+    os.remove("test.svg")
+    self.assertEqual(content.decode('utf-8'), image.to_string())
+    self.assertEqual(content, image.to_bytes())
+    self.assertIn(b'encoding="ascii"', image.to_bytes(encoding = 'ascii'))
+    self.assertIn(b'&#233;', image.to_bytes(encoding = 'ascii'))
+    stream = io.BytesIO()
+    image.write(stream)
+    self.assertEqual(content, stream.getvalue())
+    stream = io.StringIO()
+    image.write(stream)
+    self.assertEqual(content.decode('utf-8'), stream.getvalue())
+    chunks = image.iter_chunks(100)
+    image.draw_circle([ 0, 0 ], 1)
+    chunks = list(chunks)
+    self.assertTrue(all(len(chunk) == 100 for chunk in chunks[ : -1 ]))
+    self.assertEqual(content, b''.join(chunks))
+
+# functions using global variables, as in the example scripts
+graph_coefficient = 1.
+graph_settings = types.SimpleNamespace(coefficient = 1.)
+# module of parameters of a script
+graph_parameters = types.ModuleType("graph_parameters")
+graph_parameters.coefficient = 1.
+
+def scale_square(x):
+  return graph_coefficient * x * x
+
+def scale_square_with_settings(x):
+  return graph_settings.coefficient * x * x
+
+def scale_square_with_parameters(x):
+  return graph_parameters.coefficient * x * x
+
+class SquareScaling:
+  def __init__(self, coefficient):
+    self.coefficient = coefficient
+  def evaluate(self, x):
+    return self.coefficient * x * x
+
+class TestRenderCache(unittest.TestCase):
+
+  def _draw_image(self, cache_dir, graph_factor = 1., seed = 1):
+    random.seed(seed)
+    image = mathsvg.SvgImage(pixel_density = 100, view_window = ( (-4, -4), (4, 4) ), render_cache_dir = cache_dir)
+    image.set_svg_options(stroke_color = "blue")
+    image.draw_arrow([ -2, -2 ], [ 2, 2 ])
+    image.draw_function_graph(lambda x : graph_factor * x * x, -1, 1, 20)
+    image.draw_planar_potato([ 0, 0 ], 1, 2, 5)
+    return image
+
+  def _save_image(self, image, file_name):
+    written_files = []
+    write_svg_file = image._write_svg_file
+    image._write_svg_file = lambda drawing, file_name : written_files.append(file_name) or write_svg_file(drawing, file_name)
+    image.save(file_name, do_overwrite = True)
+    with open(file_name) as svg_file:
+      self.assertEqual(svg_file.read(), image.to_string())
+    return len(written_files) > 0
+
+  def test_render_cache(self):
+    with tempfile.TemporaryDirectory() as cache_dir:
+      file_name = os.path.join(cache_dir, "test.svg")
+      self.assertTrue(self._save_image(self._draw_image(cache_dir), file_name))
+      self.assertFalse(self._save_image(self._draw_image(cache_dir), file_name))
+      self.assertTrue(self._save_image(self._draw_image(cache_dir, graph_factor = 2.), file_name))
+      self.assertTrue(self._save_image(self._draw_image(cache_dir, seed = 2), file_name))
+      image = self._draw_image(cache_dir)
+      image.draw_point([ 0, 0 ])
+      forked_image = image.fork()
+      self.assertTrue(self._save_image(image, file_name))
+      self.assertFalse(self._save_image(forked_image, file_name))
+      forked_image.set_dash_mode("dash")
+      self.assertTrue(self._save_image(forked_image, file_name))
+
+  def test_global_variables(self):
+    global graph_coefficient
+    def draw_graph(cache_dir, function):
+      image = mathsvg.SvgImage(pixel_density = 100, view_window = ( (-4, -4), (4, 4) ), render_cache_dir = cache_dir)
+      image.draw_function_graph(function, -1, 1, 20)
+      return image
+    with tempfile.TemporaryDirectory() as cache_dir:
+      file_name = os.path.join(cache_dir, "test.svg")
+      try:
+        self.assertTrue(self._save_image(draw_graph(cache_dir, scale_square), file_name))
+        self.assertFalse(self._save_image(draw_graph(cache_dir, scale_square), file_name))
+        graph_coefficient = 2.
+        self.assertTrue(self._save_image(draw_graph(cache_dir, scale_square), file_name))
+      finally:
+        graph_coefficient = 1.
+      # the attributes of an object cannot be followed: the image is not cached
+      self.assertTrue(self._save_image(draw_graph(cache_dir, scale_square_with_settings), file_name))
+      self.assertTrue(self._save_image(draw_graph(cache_dir, scale_square_with_settings), file_name))
+      # nor the attributes of a module of the script
+      self.assertTrue(self._save_image(draw_graph(cache_dir, scale_square_with_parameters), file_name))
+      graph_parameters.coefficient = 2.
+      try:
+        self.assertTrue(self._save_image(draw_graph(cache_dir, scale_square_with_parameters), file_name))
+      finally:
+        graph_parameters.coefficient = 1.
+      # nor the methods of objects
+      self.assertTrue(self._save_image(draw_graph(cache_dir, SquareScaling(1.).evaluate), file_name))
+      self.assertTrue(self._save_image(draw_graph(cache_dir, SquareScaling(2.).evaluate), file_name))
+
+  def test_random_numbers(self):
+    def draw_graph(cache_dir, function, seed):
+      random.seed(seed)
+      numpy.random.seed(seed)
+      image = mathsvg.SvgImage(pixel_density = 100, view_window = ( (-4, -4), (4, 4) ), render_cache_dir = cache_dir)
+      image.draw_function_graph(function, -1, 1, 20)
+      return image
+    from random import random as random_number
+    with tempfile.TemporaryDirectory() as cache_dir:
+      file_name = os.path.join(cache_dir, "test.svg")
+      for function in [ lambda x : random.random(), lambda x : numpy.random.random(), lambda x : random_number() ]:
+        self.assertTrue(self._save_image(draw_graph(cache_dir, function, 1), file_name))
+        self.assertTrue(self._save_image(draw_graph(cache_dir, function, 2), file_name))
+
+class TestStats(unittest.TestCase):
+
+  def test_stats(self):
+    image = mathsvg.SvgImage(pixel_density = 100, view_window = ( (-4, -4), (4, 4) ))
+    self.assertRaises(Exception, image.stats)
+    calls = []
+    image.enable_stats(callback = lambda method_name, duration : calls.append(method_name))
+    image.draw_function_graph(lambda x : x * x, -1, 1, 20, curve_type = "autosmooth")
+    image.draw_arrow([ -2, -2 ], [ 2, 2 ])
+    svg_bytes = image.to_bytes()
+    stats = image.stats()
+    self.assertSequenceEqual([ "draw_function_graph", "draw_arrow", "to_bytes" ], calls)
+    self.assertEqual(1, stats["methods"]["draw_line_segment"]["calls"])
+    self.assertEqual(20, stats["stages"]["user_callbacks"]["calls"])
+    self.assertEqual(1, stats["stages"]["autosmooth"]["calls"])
+    self.assertDictEqual({ "path" : 2, "line" : 1 }, stats["elements"])
+    # graph, line and arrow tip
+    self.assertEqual(20 + 2 + 1, stats["points"])
+    self.assertEqual(len(svg_bytes), stats["bytes"])
+    for stage in [ "projection", "path_string", "style_string", "serialization" ]:
+      self.assertGreater(stats["stages"][stage]["time"], 0)
+
+  def test_callbacks_of_batch_methods(self):
+    image = mathsvg.SvgImage(pixel_density = 100, view_window = ( (-1, -1), (1, 1) ))
+    image.enable_stats()
+    image.draw_cobweb(lambda x : 0.5 * x, [ 0.1, 0.2 ], 5)
+    image.draw_orbit_diagram(lambda x, r : r * x * (1 - x), 0, 1, 10, 2, 3)
+    image.draw_streamlines(lambda x, y : (- y, x), [ [ 0.5, 0 ] ], 0.1, 4)
+    image.draw_implicit_curve(lambda x, y : x * x + y * y, 0.25, 10)
+    image.draw_mapped_grid(lambda z : z * z, ( (0, 0), (1, 1) ), 2, 5)
+    # 10 points of the cobweb, 5 iterations of the orbit diagram, 4 steps of 4 evaluations, 1 grid evaluation for each of the last two
+    self.assertEqual(10 + 5 + 16 + 1 + 1, image.stats()["stages"]["user_callbacks"]["calls"])
+    # one smooth path string for each circle
+    image = mathsvg.SvgImage(pixel_density = 100, view_window = ( (-1, -1), (1, 1) ))
+    image.enable_stats()
+    image.draw_implicit_curve(lambda x, y : x * x + y * y, [ 0.25, 0.5 ], 10, curve_type = "autosmooth")
+    self.assertEqual(2, image.stats()["stages"]["path_string"]["calls"])
+
+  def test_disable_stats(self):
+    image = mathsvg.SvgImage(pixel_density = 100, view_window = ( (-4, -4), (4, 4) ))
+    image.enable_stats()
+    forked_image = image.fork()
+    forked_image.draw_point([ 0, 0 ])
+    self.assertDictEqual({ "circle" : 1 }, forked_image.stats()["elements"])
+    self.assertDictEqual({}, image.stats()["elements"])
+    image.disable_stats()
+    self.assertSequenceEqual([], [ name for name in image.__dict__ if name.startswith("draw_") ])
+    self.assertRaises(Exception, image.stats)
+
+class TestMemoryLimit(unittest.TestCase):
+
+  def _draw(self, image, nb_lines):
+    for k in range(nb_lines):
+      image.draw_line_segment([ -3, k / nb_lines ], [ 3, - k / nb_lines ])
+      image.draw_point([ 0, k / nb_lines ])
+
+  def test_memory_usage(self):
+    image = mathsvg.SvgImage(pixel_density = 100, view_window = ( (-4, -4), (4, 4) ))
+    self._draw(image, 3)
+    memory_usage = image.memory_usage()
+    self.assertEqual(3, memory_usage["elements"]["line"]["count"])
+    self.assertEqual(3, memory_usage["elements"]["circle"]["count"])
+    self.assertGreater(memory_usage["elements"]["line"]["bytes"], 0)
+    self.assertEqual(memory_usage["elements"]["line"]["bytes"] + memory_usage["elements"]["circle"]["bytes"], memory_usage["bytes"])
+    self.assertEqual(0, memory_usage["spilled_elements"])
+
+  def test_memory_limit(self):
+    clean_files([ "memory-limit.svg" ])
+    image = mathsvg.SvgImage(pixel_density = 100, view_window = ( (-4, -4), (4, 4) ), memory_limit = 20000)
+    reference_image = mathsvg.SvgImage(pixel_density = 100, view_window = ( (-4, -4), (4, 4) ))
+    for drawn_image in [ image, reference_image ]:
+      self._draw(drawn_image, 200)
+    memory_usage = image.memory_usage()
+    self.assertGreater(memory_usage["spilled_elements"], 0)
+    self.assertLessEqual(memory_usage["bytes"], 20000)
+    self.assertEqual(400, memory_usage["spilled_elements"] + sum(usage["count"] for usage in memory_usage["elements"].values()))
+    self.assertEqual(reference_image.to_string(), image.to_string())
+    image.save("memory-limit.svg")
+    for drawn_image in [ image, reference_image ]:
+      drawn_image.put_text("spilled", [ 0, 0 ])
+      self._draw(drawn_image, 100)
+    image.save("memory-limit.svg", do_overwrite = True)
+    with open("memory-limit.svg") as svg_file:
+      self.assertEqual(reference_image.to_string(), svg_file.read())
+    forked_image = image.fork()
+    forked_reference_image = reference_image.fork()
+    for drawn_image in [ forked_image, forked_reference_image ]:
+      self._draw(drawn_image, 100)
+    self.assertEqual(forked_reference_image.to_string(), forked_image.to_string())
+    self.assertEqual(reference_image.to_string(), image.to_string())
+    self.assertRaises(Exception, image.svgwrite_object.tostring)
+    os.remove("memory-limit.svg")
+
+  def test_spill_file_closing(self):
+    image = mathsvg.SvgImage(pixel_density = 100, view_window = ( (-4, -4), (4, 4) ), memory_limit = 20000)
+    self._draw(image, 200)
+    spill_file = image._spill_file._file
+    forked_image = image.fork()
+    del image
+    self.assertFalse(spill_file.closed)
+    # the file is closed with the last image using it
+    del forked_image
+    gc.collect()
+    self.assertTrue(spill_file.closed)
+
+class TestCompare(unittest.TestCase):
+
+  def test_compare_svg(self):
+    image = mathsvg.SvgImage(pixel_density = 100, view_window = ( (-4, -4), (4, 4) ))
+    image.draw_arrow([ -2, -2 ], [ 2, 2 ])
+    image.put_text("text", [ 0, 0 ])
+    svg_data = image.to_string()
+    self.assertIsNone(mathsvg.compare.compare_svg(svg_data, image.to_bytes()))
+    self.assertIsNone(mathsvg.compare.compare_svg(svg_data, svg_data.replace("M ", "M").replace(", ", " ")))
+    self.assertIsNone(mathsvg.compare.compare_svg(svg_data, svg_data.replace('y2="201"', 'y2="201.0000001"')))
+    difference = mathsvg.compare.compare_svg(svg_data, svg_data.replace('y2="201"', 'y2="201.1"'))
+    self.assertRegex(difference, '^element 2 <line>: attribute "y2"')
+    self.assertIsNone(mathsvg.compare.compare_svg(svg_data, svg_data.replace('y2="201"', 'y2="201.1"'), tolerance = 0.001))
+    self.assertRegex(mathsvg.compare.compare_svg(svg_data, svg_data.replace(">text<", ">test<")), "^element 4 <text>: text")
+    self.assertRegex(mathsvg.compare.compare_svg(svg_data, svg_data.replace("<line ", "<polyline ")), "^element 2: different tags")
+    image.draw_point([ 0, 0 ])
+    self.assertRegex(mathsvg.compare.compare_svg(svg_data, image.to_string()), "^element 5 <circle>: missing in the first document")
+
+class TestLazyImport(unittest.TestCase):
+
+  def test_lazy_import(self):
+    code = "import sys, mathsvg ; print('svgwrite' in sys.modules, 'mathsvg.mathsvg' in sys.modules) ; mathsvg.SvgImage().draw_point([ 0, 0 ]) ; print('svgwrite' in sys.modules)"
+    environment = dict(os.environ, PYTHONPATH = os.path.abspath(os.path.pardir))
+    output = subprocess.check_output([ sys.executable, "-c", code ], env = environment, text = True)
+    self.assertEqual("False False\nTrue\n", output)
+
+class TestBackends(unittest.TestCase):
+
+  def _draw(self, image):
+    random.seed(1)
+    image.draw_function_graph(lambda x : x * x, -1, 1, 100)
+    image.draw_arrow([ -2, -2 ], [ 2, 2 ], curvedness = 0.3)
+    image.draw_planar_potato([ 0, 0 ], 1, 2, 7)
+    image.put_text("text", [ 0, 0 ])
+    for k in range(20):
+      image.draw_point([ k / 10, 1 ])
+
+  def test_count_backend(self):
+    image = mathsvg.SvgImage(pixel_density = 100, view_window = ( (-4, -4), (4, 4) ))
+    image.enable_stats()
+    self._draw(image)
+    counted_image = mathsvg.SvgImage(pixel_density = 100, view_window = ( (-4, -4), (4, 4) ), backend = "count")
+    self._draw(counted_image)
+    output_counts = counted_image.output_counts()
+    self.assertDictEqual(image.stats()["elements"], output_counts["elements"])
+    self.assertEqual(image.stats()["points"], output_counts["vertices"])
+    self.assertAlmostEqual(1, output_counts["bytes"] / len(image.to_bytes()), places = 2)
+    self.assertRaises(Exception, image.output_counts)
+
+  def test_null_backend(self):
+    clean_files([ "test-null.svg" ])
+    image = mathsvg.SvgImage(pixel_density = 100, view_window = ( (-4, -4), (4, 4) ), backend = "null")
+    self._draw(image)
+    image.save("test-null.svg")
+    image.save_async("test-null.svg").result()
+    self.assertFalse(os.path.exists("test-null.svg"))
+    self.assertEqual(mathsvg.SvgImage(pixel_density = 100, view_window = ( (-4, -4), (4, 4) )).to_string(), image.to_string())
+    self.assertRaises(Exception, image.output_counts)
+    self.assertRaises(Exception, mathsvg.SvgImage, backend = "png")
+
+class TestPathBuilder(unittest.TestCase):
+
+  def _get_path_d(self, image):
+    return re.findall(r'<path d="([^"]*)"', image.to_string())
+
+  def test_path_string(self):
+    image = mathsvg.SvgImage(pixel_density = 10, view_window = ( (0, 0), (4, 4) ))
+    image.enable_stats()
+    path = mathsvg.PathBuilder().move_to((1, 1)).line_to((2, 1)).line_to((3, 1), (3, 2))
+    path.curve_to((3, 3), (2, 3), (1, 3)).quad_to((0, 2), (1, 1)).arc_to((2, 2), (0.5, 1), large_arc = True).close()
+    image.draw_path(path)
+    self.assertListEqual([ "M 10, 31 L 20, 31 30, 31 30, 21 C 30, 11 20, 11 10, 11 Q 0, 21 10, 31 A 5.0, 10.0 0.0 1 0 20, 21 Z" ], self._get_path_d(image))
+    self.assertEqual(10, image.stats()["points"])
+    svg_path = mathsvg.PathBuilder(units = "svg").move_to((1, 2)).arc_to((3, 4), (5, 6), rotation = math.pi / 2, counterclockwise = False)
+    image.draw_path(svg_path)
+    self.assertEqual("M 1, 2 A 5, 6 -90.0 0 1 3, 4", self._get_path_d(image)[-1])
+
+  def test_path_errors(self):
+    self.assertRaises(Exception, mathsvg.PathBuilder, units = "pixels")
+    self.assertRaises(Exception, mathsvg.PathBuilder().line_to, (0, 0))
+    self.assertRaises(Exception, mathsvg.PathBuilder().close)
+    self.assertRaises(Exception, mathsvg.PathBuilder().move_to((0, 0)).curve_to, (0, 0), (1, 1))
+
+  def test_smooth_curves(self):
+    # same paths as the ones built from the path commands
+    points = [ [ 0.3, 0.2 ], [ 1.5, 2.1 ], [ 3.2, 1.7 ], [ 2., 3.8 ] ]
+    image = mathsvg.SvgImage(pixel_density = 10, view_window = ( (0, 0), (4, 4) ))
+    image.draw_smoothly_interpolated_closed_curve(points)
+    image.draw_bezier_curve(points[ : 2 ], [ [ 1, 0 ], [ 0, -1 ] ])
+    model_image = mathsvg.SvgImage(pixel_density = 10, view_window = ( (0, 0), (4, 4) ))
+    canvas_points = [ model_image.project_point_to_canvas(point) for point in points ]
+    control_vectors = model_image._compute_autosmooth_control_vectors(canvas_points, is_path_closed = True)
+    model_image.insert_svg_path_command(model_image._make_svg_path_M_and_C_command(canvas_points + [ canvas_points[0] ], control_vectors) + ' Z')
+    model_image.insert_svg_path_command(model_image._make_svg_path_M_and_C_command(canvas_points[ : 2 ], [ model_image.project_point_to_canvas(p) for p in ([ 1.3, 0.2 ], [ 1.5, 1.1 ]) ]))
+    self.assertIsNone(mathsvg.compare.compare_svg(model_image.to_bytes(), image.to_bytes()))
+
+class TestBatchShapes(unittest.TestCase):
+
+  def test_ellipse_and_circle_arcs(self):
+    # same arcs as the ones drawn one by one
+    random.seed(2)
+    focuses_array = numpy.random.default_rng(2).uniform(-3, 3, size = (30, 2, 2))
+    semi_minor_axes = numpy.random.default_rng(3).uniform(0.1, 1, size = 30)
+    angles = numpy.random.default_rng(4).uniform(-7, 7, size = (30, 2))
+    image = mathsvg.SvgImage(pixel_density = 10, view_window = ( (-4, -4), (4, 4) ))
+    for focuses, semi_minor_axis, (start_angle, end_angle) in zip(focuses_array.tolist(), semi_minor_axes.tolist(), angles.tolist()):
+      image.draw_ellipse_arc(focuses, semi_minor_axis, start_angle, end_angle)
+    for focuses, (start_angle, end_angle) in zip(focuses_array.tolist(), angles.tolist()):
+      image.draw_circle_arc(focuses[0], 0.5, start_angle, end_angle)
+    batch_image = mathsvg.SvgImage(pixel_density = 10, view_window = ( (-4, -4), (4, 4) ))
+    batch_image.enable_stats()
+    batch_image.draw_ellipse_arcs(focuses_array, semi_minor_axes, angles[:, 0], angles[:, 1], merge = False)
+    batch_image.draw_circle_arcs(focuses_array[:, 0], 0.5, angles[:, 0], angles[:, 1], merge = False)
+    self.assertIsNone(mathsvg.compare.compare_svg(image.to_bytes(), batch_image.to_bytes()))
+    self.assertEqual(120, batch_image.stats()["points"])
+
+  def test_merged_shapes(self):
+    image = mathsvg.SvgImage(pixel_density = 10, view_window = ( (0, 0), (4, 4) ))
+    image.draw_circles([ [ 1, 1 ], [ 2, 2 ] ], [ 1, 0.5 ])
+    image.draw_ellipses([ [ [ 1, 2 ], [ 3, 2 ] ] ], 1., merge = False)
+    image.draw_circles([], 1.)
+    image.draw_circle_arcs([ [ 2, 2 ] ], 1., 0., math.pi / 2)
+    paths = re.findall(r'<path d="([^"]*)"', image.to_string())
+    self.assertListEqual([ "M 20.0, 31.0 A 10.0, 10.0 0.0 0 0 0.0, 31.0 A 10.0, 10.0 0.0 0 0 20.0, 31.0 Z M 25.0, 21.0 A 5.0, 5.0 0.0 0 0 15.0, 21.0 A 5.0, 5.0 0.0 0 0 25.0, 21.0 Z",
+                           f"M {20 + 10 * math.sqrt(2)}, 21.0 A {10 * math.sqrt(2)}, 10.0 0.0 0 0 {20 - 10 * math.sqrt(2)}, 21.0 A {10 * math.sqrt(2)}, 10.0 0.0 0 0 {20 + 10 * math.sqrt(2)}, 21.0 Z",
+                           "M 30.0, 21.0 A 10.0, 10.0 0.0 0 0 20.0, 11.0" ], paths)
+
+class TestAutoFit(unittest.TestCase):
+
+  def _assert_window_almost_equal(self, expected_window, window):
+    for expected_point, point in zip(expected_window, window):
+      for expected_value, value in zip(expected_point, point):
+        self.assertAlmostEqual(expected_value, value)
+
+  def test_fitted_view_window(self):
+    image = mathsvg.SvgImage(pixel_density = 10, auto_fit = True, fit_padding = 0.5)
+    self.assertEqual(image.view_window, image.fitted_view_window())
+    image.draw_circle([ 3, 2 ], 0.5)
+    # stroke width: 1 pixel
+    self._assert_window_almost_equal(((1.95, 0.95), (4.05, 3.05)), image.fitted_view_window())
+    self.assertIn('viewBox="29.5,-19.5,21.0,21.0"', image.to_string())
+    image.draw_path(mathsvg.PathBuilder().move_to((-4, 0)).line_to((-3, 1)))
+    image.draw_circles([ [ 0, -3 ] ], 1.)
+    self._assert_window_almost_equal(((-4.55, -4.55), (4.05, 3.05)), image.fitted_view_window())
+    image.set_point_size(0.2)
+    image.draw_point([ 5, 5 ])
+    self._assert_window_almost_equal(((-4.55, -4.55), (5.75, 5.75)), image.fitted_view_window())
+    self.assertEqual(((-1, -1), (1, 1)), mathsvg.SvgImage().fitted_view_window())
+
+  def test_auto_fit_save(self):
+    clean_files([ "test-auto-fit.svg" ])
+    image = mathsvg.SvgImage(pixel_density = 10, auto_fit = True)
+    image.draw_line_segment([ 0, 0 ], [ 1, 1 ])
+    image.save("test-auto-fit.svg")
+    image.draw_line_segment([ 0, 0 ], [ -2, 3 ])
+    image.save("test-auto-fit.svg", do_overwrite = True)
+    with open("test-auto-fit.svg") as svg_file:
+      self.assertEqual(image.to_string(), svg_file.read())
+    self.assertIn('viewBox="-10.5,-19.5,31.0,31.0"', image.to_string())
+    clean_files([ "test-auto-fit.svg" ])
+
+class TestTransforms(unittest.TestCase):
+
+  def _draw_figure(self, image, center, angle, scaling):
+    # the figure transformed by hand
+    rotation = complex(math.cos(angle), math.sin(angle)) * scaling
+    def transform(point):
+      z = rotation * complex(point[0], point[1]) + complex(center[0], center[1])
+      return [ z.real, z.imag ]
+    image.draw_polygon([ transform(p) for p in [ [ 0, 0 ], [ 1, 0 ], [ 0.5, 0.8 ] ] ])
+    image.draw_circle(transform([ 0.5, 0.3 ]), 0.2 * scaling)
+    image.draw_ellipse([ transform([ 0.2, 0.5 ]), transform([ 0.8, 0.5 ]) ], 0.1 * scaling)
+    image.draw_circle_arc(transform([ 0, 1 ]), 0.3 * scaling, 0.2 + angle, 2. + angle)
+    image.draw_arrow(transform([ 0, -0.2 ]), transform([ 1, -0.2 ]))
+
+  def test_fused_transform(self):
+    image = mathsvg.SvgImage(pixel_density = 50, view_window = ( (-4, -4), (4, 4) ))
+    for k in range(5):
+      self._draw_figure(image, [ k - 2, 0.5 * k ], 0.7 * k, 0.5 + 0.2 * k)
+    transformed_image = mathsvg.SvgImage(pixel_density = 50, view_window = ( (-4, -4), (4, 4) ))
+    for k in range(5):
+      with transformed_image.transform(mathsvg.make_affine_transform(translation = (k - 2, 0.5 * k), rotation = 0.7 * k, scaling = 0.5 + 0.2 * k)):
+        self._draw_figure(transformed_image, [ 0, 0 ], 0., 1.)
+    self.assertIsNone(mathsvg.compare.compare_svg(image.to_bytes(), transformed_image.to_bytes(), tolerance = 1e-9))
+
+  def test_nested_and_group_transforms(self):
+    image = mathsvg.SvgImage(pixel_density = 10, view_window = ( (0, 0), (4, 4) ), auto_fit = True)
+    image.push_transform([ [ 1, 0, 1 ], [ 0, 1, 0 ] ])
+    image.push_transform([ [ 2, 0, 0 ], [ 0, 2, 0 ], [ 0, 0, 1 ] ])
+    image.draw_line_segment([ 0, 0 ], [ 1, 1 ])
+    image.pop_transform()
+    self.assertEqual([ 20, 31 ], image.project_point_to_canvas([ 1, 1 ]))
+    image.push_transform([ [ 0, -1, 0 ], [ 1, 0, 0 ] ], as_group = True)
+    image.draw_line_segment([ 1, 1 ], [ 2, 1 ])
+    self.assertRaises(Exception, image.fork)
+    self.assertNotIn("<g", image.to_string())
+    image.pop_transform()
+    image.pop_transform()
+    self.assertRaises(Exception, image.pop_transform)
+    svg_string = image.to_string()
+    self.assertIn('x1="10.0" x2="30.0" y1="41.0" y2="21.0"', svg_string)
+    # rotation of a quarter of turn around (1, 0) in math coordinates, i.e. around (10, 41) on the canvas
+    group = re.search(r'<g transform="matrix\(([^)]*)\)">(.*)</g>', svg_string)
+    numpy.testing.assert_allclose([ 0., -1., 1., 0., -31., 51. ], [ float(value) for value in group.group(1).split(',') ])
+    self.assertIn('x1="20.0" x2="30.0" y1="31.0" y2="31.0"', group.group(2))
+    # the line of the group goes from (20, 31) to (20, 21) on the canvas
+    view_box = re.search(r'viewBox="([^"]*)"', svg_string).group(1)
+    numpy.testing.assert_allclose([ -0.5, 20.5, 31., 21. ], [ float(value) for value in view_box.split(',') ])
+  def test_reflections(self):
+    def get_arcs(image):
+      # start point, sweep flag and end point of the arcs
+      arcs = re.findall(r'M ([-0-9.]+), ([-0-9.]+) A [-0-9.]+,? [-0-9.]+ [-0-9.]+ [01][ ,]([01]) ([-0-9.]+),? ([-0-9.]+)', image.to_string())
+      return [ (float(x0), float(y0), int(sweep_flag), float(x1), float(y1)) for x0, y0, sweep_flag, x1, y1 in arcs ]
+    def draw_arcs(image):
+      image.draw_circle_arc([ 0, 0 ], 1, 0, math.pi / 2)
+      image.draw_circle_arcs([ [ 0, 0 ] ], [ 1 ], [ 0 ], [ math.pi / 2 ])
+      image.draw_path(mathsvg.PathBuilder().move_to((1, 0)).arc_to((0, 1), (1, 1)))
+    # the mirror image of the arcs, drawn directly, is the arc from angle pi / 2 to pi
+    image = mathsvg.SvgImage(pixel_density = 10, view_window = ( (-2, -2), (2, 2) ))
+    image.draw_circle_arc([ 0, 0 ], 1, math.pi / 2, math.pi)
+    x0, y0, sweep_flag, x1, y1 = get_arcs(image)[0]
+    # the same arc in the other direction
+    mirrored_arc = (x1, y1, 1 - sweep_flag, x0, y0)
+    image = mathsvg.SvgImage(pixel_density = 10, view_window = ( (-2, -2), (2, 2) ))
+    with image.transform(mathsvg.make_affine_transform(scaling = (-1, 1))):
+      draw_arcs(image)
+    self.assertEqual(3 * [ mirrored_arc ], get_arcs(image))
+    # two reflections give a rotation
+    image = mathsvg.SvgImage(pixel_density = 10, view_window = ( (-2, -2), (2, 2) ))
+    with image.transform([ [ -1, 0, 0 ], [ 0, 1, 0 ] ]):
+      with image.transform([ [ 1, 0, 0 ], [ 0, -1, 0 ] ]):
+        draw_arcs(image)
+    self.assertEqual([ 0, 0, 0 ], [ arc[2] for arc in get_arcs(image) ])
+
+
+class TestComponents(unittest.TestCase):
+
+  def _draw_component(self, image):
+    image.draw_polygon([ [ 0, 0 ], [ 1, 0 ], [ 0.5, 0.8 ] ])
+    image.draw_circle([ 0.5, 0.3 ], 0.2)
+
+  def test_symbol_and_uses(self):
+    image = mathsvg.SvgImage(pixel_density = 20, view_window = ( (-4, -4), (4, 4) ), auto_fit = True)
+    with image.define_component("triangle"):
+      self._draw_component(image)
+    self.assertEqual(( (-4, -4), (4, 4) ), image.fitted_view_window())
+    for k in range(4):
+      image.place_component("triangle", [ k - 2, 0.5 * k ], scale = 0.5 + 0.2 * k, rotation = 0.7 * k)
+    image.place_components("triangle", [ [ k - 2, 0.5 * k ] for k in range(4) ], scales = [ 0.5 + 0.2 * k for k in range(4) ], rotations = [ 0.7 * k for k in range(4) ])
+    svg_string = image.to_string()
+    self.assertEqual(1, svg_string.count("<symbol"))
+    self.assertEqual(1, svg_string.count("<polygon"))
+    uses = re.findall(r'<use transform="matrix\(([^)]*)\)"', svg_string)
+    self.assertEqual(8, len(uses))
+    numpy.testing.assert_allclose([ [ float(value) for value in use.split(',') ] for use in uses[ : 4 ] ], [ [ float(value) for value in use.split(',') ] for use in uses[ 4 : ] ])
+    # same matrix as a group transform
+    image.push_transform(mathsvg.make_affine_transform(translation = (-1, 0.5), rotation = 0.7, scaling = 0.7), as_group = True)
+    image.pop_transform()
+    group_matrix = re.search(r'<g transform="matrix\(([^)]*)\)"', image.to_string()).group(1)
+    numpy.testing.assert_allclose([ float(value) for value in group_matrix.split(',') ], [ float(value) for value in uses[1].split(',') ], atol = 1e-9)
+    ((x_min, y_min), (x_max, y_max)) = image.fitted_view_window()
+    self.assertTrue((x_min <= -2) and (y_min <= 0) and (x_max >= 1) and (y_max >= 1.5))
+    self.assertRaises(Exception, image.place_component, "square", [ 0, 0 ])
+    with self.assertRaises(Exception):
+      with image.define_component("triangle"):
+        pass
+
+  def test_component_in_transform(self):
+    image = mathsvg.SvgImage(pixel_density = 20, view_window = ( (-4, -4), (4, 4) ))
+    with image.define_component("triangle"):
+      self._draw_component(image)
+    image.place_component("triangle", [ 1, 1 ], scale = 2.)
+    with image.transform(mathsvg.make_affine_transform(translation = (1, 1))):
+      image.place_component("triangle", [ 0, 0 ], scale = 2.)
+    uses = re.findall(r'<use transform="matrix\(([^)]*)\)"', image.to_string())
+    self.assertEqual(uses[0], uses[1])
+    forked_image = image.fork()
+    forked_image.place_component("triangle", [ 0, 0 ])
+
+
+class TestIfs(unittest.TestCase):
+
+  def _make_image(self):
+    image = mathsvg.SvgImage(pixel_density = 100, view_window = ( (-1, -1), (1, 1) ), auto_fit = True)
+    with image.define_component("triangle"):
+      image.draw_polygon([ [ 0, 1 ], [ -0.866, -0.5 ], [ 0.866, -0.5 ] ])
+    return image
+
+  def test_flat_and_nested(self):
+    maps = [ mathsvg.make_affine_transform(translation = (0.5 * x, 0.5 * y), rotation = 0.1, scaling = 0.5) for x, y in [ (0, 1), (-0.866, -0.5), (0.866, -0.5) ] ]
+    flat_image = self._make_image()
+    flat_image.draw_ifs("triangle", maps, 2, nested = False, min_size = 0.)
+    uses = re.findall(r'<use transform="matrix\(([^)]*)\)"', flat_image.to_string())
+    self.assertEqual(9, len(uses))
+    # same copies as with nested group transforms
+    group_image = self._make_image()
+    for first_map in maps:
+      with group_image.transform(first_map, as_group = True):
+        for second_map in maps:
+          with group_image.transform(second_map, as_group = True):
+            group_image.place_component("triangle", [ 0, 0 ])
+    expected_uses = re.findall(r'<use transform="matrix\(([^)]*)\)"', group_image.to_string())
+    group_matrices = re.findall(r'<g transform="matrix\(([^)]*)\)"', group_image.to_string())
+    def to_matrix(values):
+      a, b, c, d, e, f = [ float(value) for value in values.split(',') ]
+      return numpy.array([ [ a, c, e ], [ b, d, f ], [ 0, 0, 1 ] ])
+    # each outer group is followed by its inner groups
+    expected_matrices = []
+    for k in range(3):
+      for j in range(3):
+        expected_matrices.append(to_matrix(group_matrices[4 * k]) @ to_matrix(group_matrices[4 * k + 1 + j]) @ to_matrix(expected_uses[3 * k + j]))
+    numpy.testing.assert_allclose(expected_matrices, [ to_matrix(use) for use in uses ], atol = 1e-9)
+    nested_image = self._make_image()
+    nested_image.draw_ifs("triangle", maps, 2, min_size = 0.)
+    svg_string = nested_image.to_string()
+    self.assertEqual(3, svg_string.count("<symbol"))
+    self.assertEqual(7, svg_string.count("<use"))
+    # the boxes of the rotated components are transformed at each level: the nested box can only be larger
+    ((x_min, y_min), (x_max, y_max)) = flat_image.fitted_view_window()
+    ((nested_x_min, nested_y_min), (nested_x_max, nested_y_max)) = nested_image.fitted_view_window()
+    self.assertTrue((nested_x_min <= x_min) and (nested_y_min <= y_min) and (x_max <= nested_x_max) and (y_max <= nested_y_max))
+
+  def test_min_size(self):
+    maps = [ mathsvg.make_affine_transform(scaling = 0.5), mathsvg.make_affine_transform(translation = (0.5, 0), scaling = 0.5) ]
+    # the triangle is 173 pixels wide: the copies stop at depth 7 (1.35 pixels)
+    image = self._make_image()
+    image.draw_ifs("triangle", maps, 20, nested = False, min_size = 2.)
+    self.assertEqual(2**7, image.to_string().count("<use"))
+    image = self._make_image()
+    image.draw_ifs("triangle", maps, 20, min_size = 2.)
+    self.assertEqual(8, image.to_string().count("<symbol"))
+
+
+class TestBrushes(unittest.TestCase):
+
+  def _get_segments(self, svg_string):
+    # segments of the first path, one row (x0, y0, x1, y1) for each
+    return numpy.array([ line.reshape(-1) for line in get_path_lines(svg_string, by_path = True)[0] ])
+
+  def test_straight_brush(self):
+    image = mathsvg.SvgImage(pixel_density = 100, view_window = ( (0, 0), (1, 1) ))
+    image.draw_straight_brush([ 0, 0 ], [ 1, 0 ], smallest_interval = 0.1)
+    segments = self._get_segments(image.to_string())
+    numpy.testing.assert_allclose([ 0, 12.5, 25, 37.5, 62.5, 75, 87.5, 100 ], segments[:, 0])
+    numpy.testing.assert_allclose(segments[:, 0], segments[:, 2])
+    numpy.testing.assert_allclose([ 100, 75, 50, 25, 25, 50, 75, 100 ], segments[:, 1] - segments[:, 3])
+    self.assertRaises(Exception, image.draw_straight_brush, [ 0, 0 ], [ 1, 0 ], density = 1.)
+
+  def test_bouquet_and_hairy_circle(self):
+    image = mathsvg.SvgImage(pixel_density = 100, view_window = ( (-2, -2), (2, 2) ))
+    image.draw_cantor_bouquet([ 0, 0 ], radius = 2., smallest_interval = 0.1)
+    segments = self._get_segments(image.to_string())
+    # the hair at the end of the base is the same as the first one
+    self.assertEqual(7, len(segments))
+    numpy.testing.assert_allclose(200 * numpy.array([ 1, 0.75, 0.5, 0.25, 0.25, 0.5, 0.75 ]), numpy.hypot(segments[:, 2] - segments[:, 0], segments[:, 3] - segments[:, 1]))
+    image = mathsvg.SvgImage(pixel_density = 100, view_window = ( (-2, -2), (2, 2) ), auto_fit = True)
+    image.draw_hairy_circle([ 0, 0 ], 1., 0.5, smallest_interval = 0.1)
+    svg_string = image.to_string()
+    self.assertEqual(1, svg_string.count("<ellipse"))
+    self.assertEqual(1, svg_string.count("<path"))
+    # no hair at half a turn, a hair of length 0.25 at three quarters of a turn (plus half of the stroke width)
+    numpy.testing.assert_allclose([ -1.005, -1.255 ], image.fitted_view_window()[0])
+
+
+class TestCobweb(unittest.TestCase):
+
+  def test_orbits(self):
+    logistic_map = lambda x, r : r * x * (1 - x)
+    images = []
+    for is_vectorized in [ True, False ]:
+      image = mathsvg.SvgImage(pixel_density = 100, view_window = ( (0, 0), (1, 1) ))
+      image.draw_cobweb(logistic_map, [ 0.1, 0.3 ], 3, 4., is_vectorized = is_vectorized)
+      images.append(image.to_string())
+    self.assertEqual(images[0], images[1])
+    d_string = re.search(r'<path d="([^"]*)"', images[0]).group(1)
+    subpaths = [ [ float(value) for value in re.findall(r'[-+0-9.e]+', subpath) ] for subpath in d_string.split('M ')[1 : ] ]
+    x_values = [ 0.3, 0.84, 0.5376, 0.99434496 ]
+    expected_points = [ [ 0.3, 0 ] ] + sum([ [ [ x, x ], [ x, x_next ] ] for x, x_next in zip(x_values[ : -1 ], x_values[1 : ]) ], [])
+    numpy.testing.assert_allclose([ [ 100 * x, 101 - 100 * y ] for x, y in expected_points ], numpy.reshape(subpaths[1], (-1, 2)))
+
+  def test_arrow_tips(self):
+    image = mathsvg.SvgImage(pixel_density = 100, view_window = ( (0, 0), (1, 1) ))
+    image.draw_cobweb(lambda x : 0.5 * x, 0.8, 2, from_axis = False, arrow_tips = True)
+    # two vertical steps and one horizontal step
+    tips_d_string = re.findall(r'<path d="([^"]*)"', image.to_string())[1]
+    self.assertEqual(3, tips_d_string.count('Z'))
+    # same as the tip drawn by draw_arrow_tip, with its transform applied
+    image.draw_arrow_tip([ 0.6, 0.4 ], math.pi)
+    tip = re.search(r'<path d="([^"]*)" style="[^"]*" transform="translate\(([^)]*)\) rotate\(([^)]*)\)"', image.to_string())
+    tip_points = numpy.array([ float(value) for value in re.findall(r'[-+0-9.e]+', tip.group(1)) ]).reshape(-1, 2)
+    translation = [ float(value) for value in re.findall(r'[-+0-9.e]+', tip.group(2)) ]
+    angle = math.radians(float(tip.group(3).split(',')[0]))
+    expected_points = [ [ translation[0] + math.cos(angle) * x - math.sin(angle) * y, translation[1] + math.sin(angle) * x + math.cos(angle) * y ] for x, y in tip_points ]
+    batch_points = [ float(value) for value in re.findall(r'[-+0-9.e]+', tips_d_string.split('M ')[3]) ]
+    numpy.testing.assert_allclose(expected_points, numpy.reshape(batch_points, (-1, 2)), atol = 1e-9)
+
+
+class TestOrbitDiagram(unittest.TestCase):
+
+  def _get_expected_pixels(self, image):
+    pixels = set()
+    for r in numpy.linspace(2.8, 4, 50).tolist():
+      x = 0.5
+      for iteration_index in range(100):
+        x = r * x * (1 - x)
+        if(iteration_index >= 80):
+          pixels.add(tuple(math.floor(value) for value in image.project_point_to_canvas([ r, x ])))
+    return pixels
+
+  def test_path(self):
+    for chunk_size in [ 7, 1000 ]:
+      image = mathsvg.SvgImage(pixel_density = 50, view_window = ( (2.8, 0), (4, 1) ))
+      image.draw_orbit_diagram(lambda x, r : r * x * (1 - x), 2.8, 4, 50, 80, 20, chunk_size = chunk_size)
+      pixels = set()
+      for x, y, length in re.findall(r'M (-?\d+), (-?\d+) h (\d+) v 1 h -\d+ Z', image.to_string()):
+        pixels.update((int(x) + k, int(y)) for k in range(int(length)))
+      self.assertEqual(self._get_expected_pixels(image), pixels)
+
+  def test_image(self):
+    image = mathsvg.SvgImage(pixel_density = 50, view_window = ( (2.8, 0), (4, 1) ))
+    image.draw_orbit_diagram(lambda x, r : r * x * (1 - x), 2.8, 4, 50, 80, 20, as_image = True)
+    svg_string = image.to_string()
+    rectangle = re.search(r'<rect height="(\d+)" mask="url\(#(mathsvg-mask-1)\)" [^>]*x="(-?\d+)" y="(-?\d+)"', svg_string)
+    self.assertIn('<mask height="%s" id="%s"' % rectangle.group(1, 2), svg_string)
+    png_data = re.search(r'data:image/png;base64,([^"]*)"', svg_string).group(1)
+    mask = pylab.imread(io.BytesIO(base64.b64decode(png_data)), format = "png")
+    left, top = int(rectangle.group(3)), int(rectangle.group(4))
+    self.assertEqual(self._get_expected_pixels(image), { (left + i, top + j) for j, i in zip(*numpy.nonzero(mask[:, :, 3])) })
+
+  def test_escaping_orbits(self):
+    # for r > 4 most orbits escape to - infinity, the points out of the window are dropped
+    for as_image in [ False, True ]:
+      image = mathsvg.SvgImage(pixel_density = 50, view_window = ( (3.5, 0), (4.2, 1) ))
+      with numpy.errstate(over = "ignore", invalid = "ignore"):
+        image.draw_orbit_diagram(lambda x, r : r * x * (1 - x), 3.5, 4.2, 70, 3, 20, as_image = as_image)
+      svg_string = image.to_string()
+      if(as_image):
+        rectangle = re.search(r'<rect height="(\d+)" [^>]*width="(\d+)" x="(-?\d+)" y="(-?\d+)"', svg_string)
+        left, top, width, height = [ int(value) for value in rectangle.group(3, 4, 2, 1) ]
+        corners = [ (left, top), (left + width, top + height) ]
+      else:
+        runs = [ [ int(value) for value in run ] for run in re.findall(r'M (-?\d+), (-?\d+) h (\d+)', svg_string) ]
+        corners = [ (min(x for x, y, length in runs), min(y for x, y, length in runs)), (max(x + length for x, y, length in runs), max(y for x, y, length in runs) + 1) ]
+      self.assertLessEqual((0, 0), corners[0])
+      self.assertLessEqual(corners[1][0], image.view_box[0] + 1)
+      self.assertLessEqual(corners[1][1], image.view_box[1] + 1)
+    image = mathsvg.SvgImage(pixel_density = 50, view_window = ( (0, 0), (1, 1) ), auto_fit = True)
+    self.assertRaisesRegex(Exception, "auto_fit", image.draw_orbit_diagram, lambda x, r : r * x * (1 - x), 2.8, 4, 50, 80, 20)
+
+
+class TestStreamlines(unittest.TestCase):
+
+  def test_simplification(self):
+    def simplify(points, start, end, is_kept):
+      # usual recursive version
+      if(end - start < 2):
+        return
+      segment = points[end] - points[start]
+      distances = numpy.abs(segment[0] * (points[start + 1 : end, 1] - points[start, 1]) - segment[1] * (points[start + 1 : end, 0] - points[start, 0])) / numpy.hypot(*segment)
+      farthest_index = start + 1 + numpy.argmax(distances)
+      if(distances.max() > 0.5):
+        is_kept[farthest_index] = True
+        simplify(points, start, farthest_index, is_kept)
+        simplify(points, farthest_index, end, is_kept)
+    random_generator = numpy.random.default_rng(3)
+    points = numpy.cumsum(random_generator.normal(size = (300, 2)), axis = 0)
+    starts = numpy.array([ 0, 100, 101, 150 ])
+    ends = numpy.array([ 99, 100, 149, 299 ])
+    expected_is_kept = numpy.zeros(len(points), dtype = bool)
+    for start, end in zip(starts, ends):
+      expected_is_kept[[ start, end ]] = True
+      simplify(points, start, end, expected_is_kept)
+    numpy.testing.assert_array_equal(expected_is_kept, mathsvg.mathsvg._simplify_polylines(numpy, points, starts, ends, 0.5))
+
+  def test_circle(self):
+    image = mathsvg.SvgImage(pixel_density = 100, view_window = ( (-2, -2), (2, 2) ))
+    image.draw_streamlines(lambda x, y : (- y, x), [ [ 1, 0 ], [ 3, 0 ] ], 0.01, 600)
+    lines = get_path_lines(image.to_string())
+    # the seed out of the window gives no line
+    self.assertEqual(1, len(lines))
+    self.assertLess(len(lines[0]), 100)
+    numpy.testing.assert_allclose(100., numpy.hypot(lines[0][:, 0] - 200, lines[0][:, 1] - 201), atol = 1e-6)
+    numpy.testing.assert_allclose([ 100 * math.cos(6), 100 * math.sin(6) ], [ lines[0][-1, 0] - 200, 201 - lines[0][-1, 1] ], atol = 1e-6)
+
+  def test_window_and_stall(self):
+    image = mathsvg.SvgImage(pixel_density = 100, view_window = ( (-1, -1), (1, 1) ))
+    image.draw_streamlines(lambda x, y : (1, 0), [ [ 0, 0.5 ] ], 0.03, 1000, both_directions = True)
+    image.draw_streamlines(lambda x, y : (- x, - y), [ [ 0.5, 0 ] ], 0.1, 10**6)
+    lines = get_path_lines(image.to_string())
+    # the lines stop at the first point out of the window
+    numpy.testing.assert_allclose([ [ 100 - 102, 51 ], [ 100 + 102, 51 ] ], lines[0])
+    # the second line stops close to the center
+    self.assertEqual(2, len(lines[1]))
+    self.assertLess(abs(lines[1][-1, 0] - 100), 0.1)
+
+  def test_domain(self):
+    # the window shows the points -12 <= x <= -8 of the translated drawings
+    for as_group in [ False, True ]:
+      image = mathsvg.SvgImage(pixel_density = 100, view_window = ( (-2, -2), (2, 2) ))
+      image.push_transform(mathsvg.make_affine_transform(translation = (10, 0)), as_group = as_group)
+      image.draw_streamlines(lambda x, y : (1, 0), [ [ -10.95, 0 ] ], 0.1, 100)
+      image.draw_streamlines(lambda x, y : (1, 0), [ [ -10.95, 0 ] ], 0.1, 100, domain = ( (-12, -1), (-10, 1) ))
+      image.pop_transform()
+      lines = get_path_lines(image.to_string())
+      if(as_group):
+        lines = [ line + [ 1000, 0 ] for line in lines ]
+      self.assertEqual(2, len(lines))
+      # the lines stop at the first point out of the domain
+      numpy.testing.assert_allclose([ [ 105, 201 ], [ 405, 201 ] ], lines[0][[ 0, -1 ]], atol = 1e-6)
+      numpy.testing.assert_allclose([ [ 105, 201 ], [ 205, 201 ] ], lines[1][[ 0, -1 ]], atol = 1e-6)
+    # with auto_fit, the trajectory goes on until the last step
+    image = mathsvg.SvgImage(pixel_density = 100, view_window = ( (-2, -2), (2, 2) ), auto_fit = True)
+    image.push_transform(mathsvg.make_affine_transform(translation = (10, 0)))
+    image.draw_streamlines(lambda x, y : (1, 0), [ [ -10.95, 0 ] ], 0.1, 100)
+    numpy.testing.assert_allclose([ [ -0.95, 0 ], [ 9.05, 0 ] ], image.fitted_view_window(), atol = 0.01)
+
+
+class TestImplicitCurve(unittest.TestCase):
+
+  def test_join_segments(self):
+    # a closed line 1-2-3-4 and an open line 5-6-7, segments in any order and direction
+    segments = numpy.array([ [ 3, 2 ], [ 6, 7 ], [ 4, 1 ], [ 1, 2 ], [ 6, 5 ], [ 3, 4 ] ])
+    lines = mathsvg.mathsvg._join_segments(numpy, segments)
+    self.assertEqual(2, len(lines))
+    open_line = [ line for line in lines if(line[0] != line[-1]) ][0]
+    closed_line = [ line for line in lines if(line[0] == line[-1]) ][0]
+    self.assertIn(open_line, [ [ 5, 6, 7 ], [ 7, 6, 5 ] ])
+    self.assertEqual(5, len(closed_line))
+    self.assertEqual({ 1, 2, 3, 4 }, set(closed_line))
+
+  def test_circles(self):
+    image = mathsvg.SvgImage(pixel_density = 100, view_window = ( (-2, -2), (2, 2) ))
+    image.draw_implicit_curve(lambda x, y, a : a * (x**2 + y**2), [ 0.25, 1, 9 ], 40, 1.)
+    lines = get_path_lines(image.to_string())
+    # no circle of radius 3 in the window
+    self.assertEqual(2, len(lines))
+    for line, radius in zip(lines, [ 50, 100 ]):
+      numpy.testing.assert_allclose(line[0], line[-1])
+      distances = numpy.hypot(line[:, 0] - 200, line[:, 1] - 201)
+      self.assertLess(numpy.max(numpy.abs(distances - radius)), 0.02 * radius)
+
+  def test_open_curve_and_smoothing(self):
+    for curve_type in [ "polyline", "autosmooth" ]:
+      image = mathsvg.SvgImage(pixel_density = 10, view_window = ( (-1, -1), (1, 1) ))
+      image.draw_implicit_curve(lambda x, y : x - 0.05 * y, 0.5, (10, 20), curve_type = curve_type)
+      lines = get_path_lines(image.to_string())
+      self.assertEqual(1, len(lines))
+      # the curve crosses the window from bottom to top
+      self.assertEqual([ 1, 21 ], sorted([ lines[0][0, 1], lines[0][-1, 1] ]))
+      numpy.testing.assert_allclose(10 + 10 * (0.5 + 0.05 * (11 - lines[0][:, 1]) / 10), lines[0][:, 0])
+    self.assertRaises(Exception, image.draw_implicit_curve, lambda x, y : x, 0, 10, curve_type = "spline")
+    image = mathsvg.SvgImage(pixel_density = 10, view_window = ( (-1, -1), (1, 1) ))
+    image.draw_implicit_curve(lambda x, y : x, 3, 10)
+    self.assertEqual([], get_path_lines(image.to_string()))
+
+  def test_domain(self):
+    # the window shows the points of the rotated and translated drawings around (3, 0)
+    image = mathsvg.SvgImage(pixel_density = 100, view_window = ( (-2, -2), (2, 2) ))
+    image.push_transform(mathsvg.make_affine_transform(translation = (0, -3), rotation = math.pi / 2))
+    image.draw_implicit_curve(lambda x, y : (x - 3)**2 + y**2, 1, 40)
+    image.draw_implicit_curve(lambda x, y : (x - 3)**2 + y**2, 1, 40, domain = ( (3, -2), (5, 2) ))
+    image.pop_transform()
+    lines = get_path_lines(image.to_string())
+    self.assertEqual(2, len(lines))
+    numpy.testing.assert_allclose(lines[0][0], lines[0][-1])
+    self.assertLess(numpy.max(numpy.abs(numpy.hypot(lines[0][:, 0] - 200, lines[0][:, 1] - 201) - 100)), 2)
+    # half of the circle, above the center on the canvas
+    self.assertLessEqual(numpy.max(lines[1][:, 1]), 201 + 1e-6)
+    image = mathsvg.SvgImage(pixel_density = 100, view_window = ( (-2, -2), (2, 2) ), auto_fit = True)
+    self.assertRaisesRegex(Exception, "auto_fit", image.draw_implicit_curve, lambda x, y : x**2 + y**2, 1, 40)
+    image.draw_implicit_curve(lambda x, y : x**2 + y**2, 1, 40, domain = ( (-5, -5), (5, 5) ))
+    numpy.testing.assert_allclose([ [ -1, -1 ], [ 1, 1 ] ], image.fitted_view_window(), atol = 0.01)
+
+
+class TestMappedGrid(unittest.TestCase):
+
+  def test_square_map(self):
+    image = mathsvg.SvgImage(pixel_density = 10, view_window = ( (-2, -2), (2, 2) ))
+    image.draw_mapped_grid(lambda z, c : z**2 + c, ( (0, 0), (1, 1) ), (3, 2), 5, 0.5j)
+    vertical_lines, horizontal_lines = get_path_lines(image.to_string(), by_path = True)
+    self.assertEqual([ 3, 2 ], [ len(vertical_lines), len(horizontal_lines) ])
+    t_values = numpy.linspace(0, 1, 5)
+    for lines, grid_lines in [ (vertical_lines, [ x + 1j * t_values for x in [ 0, 0.5, 1 ] ]), (horizontal_lines, [ t_values + 1j * y for y in [ 0, 1 ] ]) ]:
+      for line, grid_line in zip(lines, grid_lines):
+        image_values = grid_line**2 + 0.5j
+        numpy.testing.assert_allclose(numpy.stack([ 20 + 10 * image_values.real, 21 - 10 * image_values.imag ], axis = -1), line, atol = 1e-9)
+
+  def test_refinement_and_poles(self):
+    image = mathsvg.SvgImage(pixel_density = 100, view_window = ( (-3, -3), (3, 3) ))
+    image.draw_mapped_grid(lambda z : numpy.exp(z), ( (0, 0), (1, 3) ), 2, 3, nb_refinements = 10, max_step_length = 3.)
+    for lines in get_path_lines(image.to_string(), by_path = True):
+      for line in lines:
+        self.assertLessEqual(numpy.max(numpy.hypot(*numpy.diff(line, axis = 0).T)), 3.)
+    image = mathsvg.SvgImage(pixel_density = 10, view_window = ( (-2, -2), (2, 2) ))
+    with numpy.errstate(divide = "ignore", invalid = "ignore"):
+      image.draw_mapped_grid(lambda z : 1 / z, ( (-1, -1), (1, 1) ), 3, 5)
+    vertical_lines, horizontal_lines = get_path_lines(image.to_string(), by_path = True)
+    # the lines through the pole are cut in two
+    self.assertEqual([ 4, 4 ], [ len(vertical_lines), len(horizontal_lines) ])
+    self.assertNotIn("nan", image.to_string())
+
+
+class TestProfile(unittest.TestCase):
+
+  def test_profile_report(self):
+    clean_files([ "lines.svg", "stacks.txt" ])
+    for options in [ [], [ "--collapsed", "stacks.txt" ] ]:
+      report = io.StringIO()
+      with contextlib.redirect_stdout(report):
+        mathsvg.profile.main(options + [ os.path.join(test_scripts_path, "lines.py") ])
+      os.remove("lines.svg")
+      report = report.getvalue()
+      for category in mathsvg.profile.categories:
+        self.assertRegex(report, f'\\n{category} +[0-9.]+ +[0-9.]+\\n')
+    with open("stacks.txt") as stacks_file:
+      for stack in stacks_file.read().splitlines():
+        # the stacks start in the script
+        self.assertRegex(stack, "^<module> \\(lines.py\\)(;.*)? [0-9]+$")
+    self.assertEqual("python", mathsvg.profile.classify_file(mathsvg.profile.__file__))
+    os.remove("stacks.txt")
+
+  def test_sampling_profiler(self):
+    image = mathsvg.SvgImage(pixel_density = 100, view_window = ( (-4, -4), (4, 4) ))
+    profiler = mathsvg.profile.SamplingProfiler(interval = 0.001)
+    profiler.start()
+    while(sum(profiler.stacks.values()) < 5):
+      image.draw_line_segment([ -1, -1 ], [ 1, 1 ])
+    profiler.stop()
+    methods, category_times = mathsvg.profile.make_report_from_samples(profiler.stacks, profiler.interval)
+    self.assertIn("draw_line_segment", methods)
+    self.assertGreater(category_times["mathsvg"] + category_times["svgwrite"], 0)
+    collapsed_stacks = io.StringIO()
+    mathsvg.profile.write_collapsed_stacks(profiler.stacks, collapsed_stacks)
+    self.assertRegex(collapsed_stacks.getvalue(), ";draw_line_segment \\(mathsvg.py\\);.* [0-9]+\\n")
+
+  def test_cprofile_method_report(self):
+    clean_files([ "lines.svg" ])
+    report = io.StringIO()
+    with contextlib.redirect_stdout(report):
+      mathsvg.profile.main([ os.path.join(test_scripts_path, "lines.py") ])
+    os.remove("lines.svg")
+    self.assertRegex(report.getvalue(), "\\ndraw_line_segment +11 ")
 
 class TestArrows(unittest.TestCase):
 